@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+"""
+Microbenchmark: writing LinkML instances as OME-XML with the streaming
+writer and with an ElementTree built in memory.
+
+Both write the same synthetic Image records (one Pixels each, holding
+--planes Planes) to a file. "stream" serializes each record as it is written
+with OmeXmlWriter; "tree" builds the whole document as an ElementTree, as a
+DOM-based serializer does, and then writes it. The peak memory reported is
+the Python allocations (tracemalloc) made while writing, measured in a
+separate run so it does not slow down the timed one.
+
+Usage:
+    python benchmarks/bench_linkmltoxml.py ome_schema.yaml [--planes 100000] [--images 1]
+"""
+
+import os
+import sys
+import time
+import argparse
+import logging
+import tempfile
+import tracemalloc
+import xml.etree.ElementTree as ElementTree
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from linkmltoxml import OME_NAMESPACE, write_instance, _format_value  # noqa: E402
+from xmltolinkml import InstanceMapping, TYPE_KEY, TEXT_KEY  # noqa: E402
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def make_records(mapping, images, planes):
+    """Return synthetic Image records with one Pixels holding the given number of Planes."""
+    slot = {class_name: {attribute: slot_name for slot_name, attribute in mapping.slot_attributes(class_name).items()}
+            for class_name in ("Image", "Pixels", "Channel", "Plane")}
+    records = []
+    for i in range(images):
+        plane_records = [
+            {TYPE_KEY: "Plane", slot["Plane"]["TheZ"]: z, slot["Plane"]["TheC"]: 0, slot["Plane"]["TheT"]: 0,
+             slot["Plane"]["DeltaT"]: z * 0.5, slot["Plane"]["PositionX"]: 1.0, slot["Plane"]["PositionY"]: 2.0}
+            for z in range(planes)
+        ]
+        pixels = {
+            TYPE_KEY: "Pixels", slot["Pixels"]["ID"]: f"Pixels:{i}", slot["Pixels"]["DimensionOrder"]: "XYZCT",
+            slot["Pixels"]["Type"]: "uint16", slot["Pixels"]["SizeX"]: 512, slot["Pixels"]["SizeY"]: 512,
+            slot["Pixels"]["SizeZ"]: planes, slot["Pixels"]["SizeC"]: 1, slot["Pixels"]["SizeT"]: 1,
+            "Channel": [{TYPE_KEY: "Channel", slot["Channel"]["ID"]: f"Channel:{i}:0",
+                         slot["Channel"]["SamplesPerPixel"]: 1}],
+            "MetadataOnly": [{TYPE_KEY: "MetadataOnly"}],
+            "Plane": plane_records,
+        }
+        records.append({TYPE_KEY: "Image", slot["Image"]["ID"]: f"Image:{i}", slot["Image"]["Name"]: f"image{i}",
+                        "Pixels": [pixels]})
+    return records
+
+
+def write_stream(records, mapping, output_path):
+    """Write the records with the streaming writer."""
+    with open(output_path, 'wb') as stream:
+        write_instance(records, stream, mapping)
+
+
+def write_tree(records, mapping, output_path):
+    """Build the document as an ElementTree and write it."""
+    def build(parent, element, obj):
+        slot_attributes = mapping.slot_attributes(obj.get(TYPE_KEY, element))
+        node = ElementTree.SubElement(parent, element, {
+            slot_attributes[key]: _format_value(value) for key, value in obj.items() if key in slot_attributes
+        })
+        node.text = obj.get(TEXT_KEY)
+        for key, value in obj.items():
+            if isinstance(value, list):
+                for child in value:
+                    build(node, key, child)
+
+    root = ElementTree.Element("OME", {"xmlns": OME_NAMESPACE})
+    for record in records:
+        build(root, record[TYPE_KEY], record)
+    ElementTree.ElementTree(root).write(output_path, encoding="UTF-8", xml_declaration=True,
+                                        short_empty_elements=True)
+
+
+def measure(name, write, records, mapping, output_path):
+    """Log the time, throughput and peak memory of one writer."""
+    start = time.perf_counter()
+    write(records, mapping, output_path)
+    seconds = time.perf_counter() - start
+    size = os.path.getsize(output_path)
+
+    tracemalloc.start()
+    write(records, mapping, output_path)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    logger.info(f"{name:>6}: {size / 1e6:.1f} MB in {seconds:.2f} s, {size / 1e6 / seconds:.1f} MB/s, "
+                f"peak memory {peak / 2 ** 20:.1f} MB")
+    return seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark writing LinkML instances as OME-XML")
+    parser.add_argument("schema", help="Generated LinkML schema file, or directory of partitioned schemas")
+    parser.add_argument("--planes", type=int, default=100000, help="Planes per Image (default: 100000)")
+    parser.add_argument("--images", type=int, default=1, help="Number of Images (default: 1)")
+    args = parser.parse_args()
+
+    logging.getLogger('xmltolinkml').setLevel(logging.ERROR)
+    mapping = InstanceMapping.load(args.schema)
+    records = make_records(mapping, args.images, args.planes)
+    logger.info(f"Writing {args.images} Images with {args.planes} Planes each")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        output_path = os.path.join(tmp_dir, "image.ome")
+        tree = measure("tree", write_tree, records, mapping, output_path)
+        stream = measure("stream", write_stream, records, mapping, output_path)
+    logger.info(f"Speed-up: {tree / stream:.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+"""
+Microbenchmark: per-file schema validation latency with and without the
+shared validator pool.
+
+"per-file" compiles the LinkML metamodel validator for every file, as a new
+JsonSchemaValidator per file does; "pooled" compiles it once per process
+and reuses it. Both parse every file once and run the same structural
+checks, so the difference is the cost of recompiling the metamodel.
+
+Usage:
+    python benchmarks/bench_validator_pool.py ome_schemas [--limit N]
+"""
+
+import os
+import sys
+import time
+import argparse
+import logging
+from pathlib import Path
+
+import yaml
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from validator_pool import ValidatorPool, compile_metamodel_validator, find_metamodel_schema  # noqa: E402
+import validate_schema  # noqa: E402
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def run(file_paths, metamodel_path, pooled):
+    """Validate every file and return the latency of each in seconds."""
+    pool = ValidatorPool(metamodel_path)
+    latencies = []
+    for file_path in file_paths:
+        start = time.perf_counter()
+        with open(file_path, 'r') as f:
+            schema = yaml.safe_load(f)
+        validate_schema._check_schema_structure(schema, file_path)
+        if pooled:
+            pool.metamodel_errors(schema)
+        else:
+            list(compile_metamodel_validator(metamodel_path).iter_errors(schema))
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def summarize(name, latencies):
+    """Log mean, median and total latency."""
+    ordered = sorted(latencies)
+    mean = sum(latencies) / len(latencies)
+    logger.info(f"{name:>8}: {len(latencies)} files, mean {mean * 1000:.1f} ms/file, "
+                f"median {ordered[len(ordered) // 2] * 1000:.1f} ms/file, total {sum(latencies):.2f} s")
+    return mean
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark per-file validation latency")
+    parser.add_argument("directory", help="Directory of generated LinkML schema files")
+    parser.add_argument("--limit", type=int, default=20, help="Number of files to validate (default: 20)")
+    args = parser.parse_args()
+
+    logging.getLogger('validate_schema').setLevel(logging.WARNING)
+    metamodel_path = find_metamodel_schema()
+    if metamodel_path is None:
+        logger.error("linkml-runtime's metamodel JSON Schema was not found; install linkml-runtime")
+        return 1
+
+    file_paths = sorted(str(p) for p in Path(args.directory).glob('*.yaml'))[:args.limit]
+    if not file_paths:
+        logger.error(f"No YAML files found in {args.directory}")
+        return 1
+
+    before = summarize("per-file", run(file_paths, metamodel_path, pooled=False))
+    after = summarize("pooled", run(file_paths, metamodel_path, pooled=True))
+    logger.info(f"Speed-up: {before / after:.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
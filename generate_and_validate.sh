@@ -9,6 +9,7 @@ OUTPUT_DIR="ome_schemas"
 VALIDATE=true
 PARTITION=true
 VERBOSE=false
+JOBS=0
 
 # Function to display usage
 usage() {
@@ -20,6 +21,7 @@ usage() {
     echo "  -o, --output DIR     Output directory for schemas (default: ome_schemas)"
     echo "  -s, --single         Generate a single schema file instead of partitioned schemas"
     echo "  -n, --no-validate    Skip schema validation"
+    echo "  -j, --jobs N         Validation worker processes (default: 0 = one per CPU)"
     echo "  -v, --verbose        Enable verbose output"
     echo "  -h, --help           Display this help message"
     echo
@@ -45,6 +47,10 @@ while [[ $# -gt 0 ]]; do
             VALIDATE=false
             shift
             ;;
+        -j|--jobs)
+            JOBS="$2"
+            shift 2
+            ;;
         -v|--verbose)
             VERBOSE=true
             shift
@@ -101,45 +107,49 @@ if [ "$VERBOSE" = true ]; then
     VERBOSE_FLAG="--verbose"
 fi
 
-# Step 1: Generate LinkML schemas
-echo "Step 1: Generating LinkML schemas..."
+VALIDATION_REPORT="validation_report.md"
+
 if [ "$PARTITION" = true ]; then
     echo "Generating partitioned schemas in $OUTPUT_DIR"
+    OUTPUT_ARGS="--output $OUTPUT_DIR"
     GENERATE_CMD="python -m src.generator $XSD_FILE --output $OUTPUT_DIR --partition $VERBOSE_FLAG"
 else
     echo "Generating single schema in $OUTPUT_DIR/ome.yaml"
+    OUTPUT_ARGS="--output $OUTPUT_DIR/ome.yaml --single"
     GENERATE_CMD="python -m src.generator $XSD_FILE --output $OUTPUT_DIR/ome.yaml $VERBOSE_FLAG"
 fi
 
-echo "Command: $GENERATE_CMD"
-if ! eval "$GENERATE_CMD"; then
-    echo "Error: Schema generation failed."
-    exit 1
-fi
-
-echo "Schema generation completed successfully"
-
-# Step 2: Validate schemas (if validation is enabled)
-if [ "$VALIDATE" = true ]; then
-    echo "Step 2: Validating generated schemas..."
-    VALIDATION_REPORT="validation_report.md"
-    VALIDATE_CMD="python -m src.validate_schema $OUTPUT_DIR --output $VALIDATION_REPORT $VERBOSE_FLAG"
-    
-    echo "Command: $VALIDATE_CMD"
-    if eval "$VALIDATE_CMD"; then
-        echo "Schema validation completed successfully"
-        echo "All schemas are valid!"
-        echo "See validation report at $VALIDATION_REPORT for details"
-        echo "Pipeline completed successfully"
-        exit 0
-    else
-        echo "Schema validation completed with errors"
-        echo "See validation report at $VALIDATION_REPORT for details"
-        echo "Pipeline completed with validation errors"
+# Skipping validation: only run the generator
+if [ "$VALIDATE" != true ]; then
+    echo "Command: $GENERATE_CMD"
+    if ! eval "$GENERATE_CMD"; then
+        echo "Error: Schema generation failed."
         exit 1
     fi
-else
+    echo "Schema generation completed successfully"
     echo "Schema validation skipped as requested"
     echo "Pipeline completed successfully"
     exit 0
-fi 
\ No newline at end of file
+fi
+
+# Generate and validate in one process: each schema is validated as soon as it is written
+echo "Generating and validating LinkML schemas..."
+PIPELINE_CMD="python -m src.pipeline $XSD_FILE $OUTPUT_ARGS --report $VALIDATION_REPORT --jobs $JOBS $VERBOSE_FLAG"
+
+echo "Command: $PIPELINE_CMD"
+rm -f "$VALIDATION_REPORT"
+if eval "$PIPELINE_CMD"; then
+    echo "Schema validation completed successfully"
+    echo "All schemas are valid!"
+    echo "See validation report at $VALIDATION_REPORT for details"
+    echo "Pipeline completed successfully"
+    exit 0
+elif [ ! -f "$VALIDATION_REPORT" ]; then
+    echo "Error: Schema generation failed."
+    exit 1
+else
+    echo "Schema validation completed with errors"
+    echo "See validation report at $VALIDATION_REPORT for details"
+    echo "Pipeline completed with validation errors"
+    exit 1
+fi
@@ -0,0 +1,152 @@
+"""
+Compact YAML emission for generated LinkML schemas.
+
+The generated schemas repeat identical description strings, slot definitions
+and attribute maps many times. The compact mode runs a hash-consing pass that
+makes structurally identical subtrees share a single Python object, and a
+dumper that writes shared objects once with a YAML anchor and refers back to
+them with aliases. Loading the compact output yields the same data as the
+default output.
+"""
+
+import io
+import time
+import logging
+import yaml
+from typing import Any, Dict, Optional, TextIO
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Strings shorter than this are cheaper to repeat than to alias
+DEFAULT_MIN_ALIAS_LENGTH = 32
+
+
+def hash_cons(obj: Any, min_string_length: int = DEFAULT_MIN_ALIAS_LENGTH) -> Any:
+    """
+    Return a copy of obj in which structurally identical subtrees are shared.
+
+    Non-empty dicts and lists with equal content (including key order) and
+    strings of at least min_string_length characters are replaced by a single
+    canonical object. The input is not modified.
+
+    Args:
+        obj: A YAML-serializable structure of dicts, lists and scalars
+        min_string_length: Minimum length for strings to be shared
+
+    Returns:
+        The hash-consed copy
+    """
+    # Structural key -> (node id, canonical object). Child nodes are keyed by
+    # their small integer id so that building a parent's key stays linear.
+    table = {}
+
+    def intern(key, value):
+        entry = table.get(key)
+        if entry is None:
+            entry = (len(table), value)
+            table[key] = entry
+        return entry
+
+    def visit(node):
+        if isinstance(node, dict):
+            items = [(k, visit(v)) for k, v in node.items()]
+            key = ("d", tuple((k, node_id) for k, (node_id, _) in items))
+            if not items:
+                return intern(key, {})[0], {}
+            return intern(key, {k: value for k, (_, value) in items})
+        if isinstance(node, (list, tuple)):
+            items = [visit(item) for item in node]
+            key = ("l", tuple(node_id for node_id, _ in items))
+            if not items:
+                return intern(key, [])[0], []
+            return intern(key, [value for _, value in items])
+        if isinstance(node, str) and len(node) >= min_string_length:
+            return intern(("s", node), node)
+        # Other scalars are keyed by type as well so that 1, 1.0 and True stay distinct
+        return intern(("v", type(node).__name__, node), node)
+
+    return visit(obj)[1]
+
+
+class CompactDumper(yaml.SafeDumper):
+    """SafeDumper that emits anchors/aliases for shared containers and long strings."""
+
+    min_alias_length = DEFAULT_MIN_ALIAS_LENGTH
+
+    def ignore_aliases(self, data):
+        if isinstance(data, str):
+            return len(data) < self.min_alias_length
+        if isinstance(data, (dict, list)):
+            return not data
+        return True
+
+
+def dump_compact(schema: Dict, stream: Optional[TextIO] = None,
+                 min_string_length: int = DEFAULT_MIN_ALIAS_LENGTH) -> Optional[str]:
+    """
+    Dump a schema as YAML, writing repeated subtrees once with anchors/aliases.
+
+    Args:
+        schema: The schema dictionary
+        stream: Stream to write to (if None, the YAML text is returned)
+        min_string_length: Minimum length for strings to be aliased
+
+    Returns:
+        The YAML text if no stream was given
+    """
+    dumper = type("CompactDumper", (CompactDumper,), {"min_alias_length": min_string_length})
+    return yaml.dump(hash_cons(schema, min_string_length), stream, Dumper=dumper,
+                     sort_keys=False, default_flow_style=False)
+
+
+def compare_emission_modes(schema: Dict, repeat: int = 3) -> Dict[str, Dict[str, float]]:
+    """
+    Measure output size, dump time and parse time of default vs compact emission.
+
+    Args:
+        schema: The schema dictionary
+        repeat: Number of timing runs (the best run is reported)
+
+    Returns:
+        Dictionary with 'default' and 'compact' entries holding 'bytes',
+        'dump_seconds' and 'load_seconds'
+    """
+    def default_dump():
+        return yaml.dump(schema, sort_keys=False, default_flow_style=False)
+
+    def best_time(func):
+        best = None
+        result = None
+        for _ in range(max(1, repeat)):
+            start = time.perf_counter()
+            result = func()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best, result
+
+    comparison = {}
+    for mode, dump in (("default", default_dump), ("compact", lambda: dump_compact(schema))):
+        dump_seconds, text = best_time(dump)
+        load_seconds, _ = best_time(lambda: yaml.safe_load(io.StringIO(text)))
+        comparison[mode] = {
+            "bytes": len(text.encode("utf-8")),
+            "dump_seconds": dump_seconds,
+            "load_seconds": load_seconds,
+        }
+    return comparison
+
+
+def log_emission_comparison(schema: Dict, repeat: int = 3) -> Dict[str, Dict[str, float]]:
+    """Measure default vs compact emission and log the comparison."""
+    comparison = compare_emission_modes(schema, repeat)
+    default, compact = comparison["default"], comparison["compact"]
+    logger.info(
+        f"Default YAML: {default['bytes']} bytes, dump {default['dump_seconds']:.3f}s, "
+        f"parse {default['load_seconds']:.3f}s"
+    )
+    logger.info(
+        f"Compact YAML: {compact['bytes']} bytes ({compact['bytes'] / max(default['bytes'], 1):.0%}), "
+        f"dump {compact['dump_seconds']:.3f}s, parse {compact['load_seconds']:.3f}s"
+    )
+    return comparison
@@ -1,57 +1,564 @@
 import requests
 import os
+import io
+import re
+import json
+import time
+import hashlib
 import argparse
 import logging
+import posixpath
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from urllib.parse import urljoin, urldefrag, urlsplit, unquote
+from xml.sax.saxutils import escape, unescape
+from urllib3.util.retry import Retry
+
+# Fix import for both module and direct script usage
+try:
+    from src.xsd_catalog import SchemaCatalog, CATALOG_FILE
+except ImportError:
+    from xsd_catalog import SchemaCatalog, CATALOG_FILE
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+OME_SCHEMAS_BASE_URL = "https://www.openmicroscopy.org/Schemas/OME"
 OME_XSD_URL = "https://www.openmicroscopy.org/Schemas/OME/2016-06/ome.xsd"
 
-def download_xsd(url, output_path, verbose=False):
+# Published OME schema releases, oldest first
+KNOWN_VERSIONS = (
+    "2008-02", "2008-09", "2009-09", "2010-04", "2010-06", "2011-06",
+    "2012-06", "2013-06", "2015-01", "2016-06",
+)
+
+XSD_NAMESPACE = "http://www.w3.org/2001/XMLSchema"
+
+# Schema elements whose schemaLocation refers to another schema document
+REFERENCE_TAGS = {f"{{{XSD_NAMESPACE}}}{tag}" for tag in ("include", "import", "redefine", "override")}
+
+DEFAULT_MIRROR_JOBS = 8
+DEFAULT_TIMEOUT = 30
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 0.5
+CHUNK_SIZE = 1 << 16
+
+# Sidecar manifest written next to each downloaded file
+MANIFEST_SUFFIX = ".manifest.json"
+PARTIAL_SUFFIX = ".part"
+
+# Directory of a mirror holding the documents as downloaded, before their
+# schemaLocation values are rewritten
+DOWNLOAD_DIR = ".downloads"
+
+# Transient HTTP statuses that are retried
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+_SCHEMA_LOCATION_RE = re.compile(rb"""(\bschemaLocation\s*=\s*)(["'])(.*?)\2""", re.DOTALL)
+
+def download_xsd(url, output_path, verbose=False, session=None, force=False):
     """
     Download the OME XSD file from the specified URL.
     
+    The download is conditional, streamed, resumable and atomic (see
+    download_file), so running it again when the file is current costs a
+    single 304 round trip.
+    
     Args:
         url (str): URL of the XSD file
         output_path (str): Path to save the downloaded file
         verbose (bool): Whether to output verbose logs
+        session (requests.Session, optional): Session to use (default: a new retrying session)
+        force (bool): Whether to download even if the local file is current
+        
+    Returns:
+        dict: The download record (see download_file)
     """
     if verbose:
         logger.setLevel(logging.DEBUG)
         logger.debug(f"Downloading XSD from {url}")
     
+    own_session = session is None
+    if own_session:
+        session = create_session(1)
+    try:
+        record = download_file(session, url, output_path, force=force)
+    except requests.exceptions.RequestException as e:
+        logger.error(f"Error downloading XSD: {str(e)}")
+        raise
+    finally:
+        if own_session:
+            session.close()
+    
+    if record["status"] == "not-modified":
+        logger.info(f"OME XSD at {output_path} is up to date")
+    else:
+        logger.debug(f"XSD file saved to {output_path}")
+        logger.info(f"Successfully downloaded OME XSD to {output_path}")
+    return record
+
+def _manifest_path(output_path):
+    """Get the path of the sidecar manifest of a downloaded file."""
+    return output_path + MANIFEST_SUFFIX
+
+def read_manifest(output_path):
+    """
+    Read the sidecar manifest of a downloaded file.
+    
+    Args:
+        output_path (str): Path of the downloaded file
+        
+    Returns:
+        dict: The manifest, or an empty dict if there is none or it cannot be read
+    """
+    try:
+        with open(_manifest_path(output_path), "r") as f:
+            manifest = json.load(f)
+        return manifest if isinstance(manifest, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+def _write_atomic(path, data):
+    """Write data to a temporary file and rename it over path."""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+def _write_manifest(output_path, manifest):
+    _write_atomic(_manifest_path(output_path), json.dumps(manifest, indent=2, sort_keys=True).encode("utf-8"))
+
+def file_sha256(path):
+    """
+    Compute the SHA-256 of a file.
+    
+    Args:
+        path (str): Path of the file
+        
+    Returns:
+        str: Hex digest, or None if the file cannot be read
+    """
+    digest = hashlib.sha256()
     try:
-        response = requests.get(url)
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+                digest.update(chunk)
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+def _validators(response):
+    """Get the validators (ETag, Last-Modified) of a response."""
+    return {"etag": response.headers.get("ETag"), "last_modified": response.headers.get("Last-Modified")}
+
+def download_file(session, url, output_path, force=False, timeout=DEFAULT_TIMEOUT):
+    """
+    Download a file conditionally, streamed, resumable and atomically.
+    
+    The sidecar manifest (<output_path>.manifest.json) records the URL,
+    ETag, Last-Modified, size and SHA-256 of the file. If the file on disk
+    still has that SHA-256, the request is made conditional (If-None-Match /
+    If-Modified-Since) and a 304 answer leaves it untouched. Otherwise the
+    body is streamed in chunks to <output_path>.part, hashed on the way, and
+    renamed over the file once complete. If a previous transfer was cut
+    short, the .part file is resumed with a Range request, guarded by
+    If-Range so that a changed file is downloaded again in full. A 416
+    answer whose Content-Range reports the size of the .part file means the
+    transfer was complete and the .part file is renamed into place; any
+    other 416 discards the .part file and downloads the file in full.
+    
+    Args:
+        session (requests.Session): Session to use
+        url (str): URL of the file
+        output_path (str): Path to save the file to
+        force (bool): Whether to ignore the manifest and download in full
+        timeout (float): Timeout of each request in seconds
+        
+    Returns:
+        dict: Download record with url, path, status ("downloaded", "resumed"
+        or "not-modified"), size, sha256, bytes_transferred and seconds
+        
+    Raises:
+        requests.exceptions.RequestException: If the download fails
+        IOError: If fewer bytes than announced were received
+    """
+    start = time.perf_counter()
+    manifest = {} if force else read_manifest(output_path)
+    partial_path = output_path + PARTIAL_SUFFIX
+    # Byte ranges and sizes refer to the file itself, not to a compressed body
+    headers = {"Accept-Encoding": "identity"}
+    
+    current = (manifest.get("url") == url and manifest.get("sha256") is not None
+               and file_sha256(output_path) == manifest["sha256"])
+    if current:
+        if manifest.get("etag"):
+            headers["If-None-Match"] = manifest["etag"]
+        if manifest.get("last_modified"):
+            headers["If-Modified-Since"] = manifest["last_modified"]
+    
+    partial = manifest.get("partial") or {}
+    resume_from = 0
+    if partial.get("url") == url and os.path.exists(partial_path):
+        validator = partial.get("etag") or partial.get("last_modified")
+        if validator:
+            resume_from = os.path.getsize(partial_path)
+            if resume_from:
+                headers["Range"] = f"bytes={resume_from}-"
+                headers["If-Range"] = validator
+    
+    with session.get(url, headers=headers, stream=True, timeout=timeout) as response:
+        if response.status_code == 304:
+            logger.debug(f"{url} not modified")
+            return dict(manifest, path=output_path, status="not-modified", bytes_transferred=0,
+                        seconds=time.perf_counter() - start)
+        if response.status_code == 416 and resume_from:
+            if response.headers.get("Content-Range") == f"bytes */{resume_from}":
+                logger.debug(f"{partial_path} is already complete")
+                os.replace(partial_path, output_path)
+                record = dict(etag=partial.get("etag"), last_modified=partial.get("last_modified"), url=url,
+                              size=resume_from, sha256=file_sha256(output_path))
+                _write_manifest(output_path, record)
+                return dict(record, path=output_path, status="resumed", bytes_transferred=0,
+                            seconds=time.perf_counter() - start)
+            logger.debug(f"Cannot resume {url} at byte {resume_from}; downloading it in full")
+            os.remove(partial_path)
+            manifest.pop("partial")
+            _write_manifest(output_path, manifest)
+            return download_file(session, url, output_path, force, timeout)
         response.raise_for_status()
         
-        # Create output directory if it doesn't exist
+        digest = hashlib.sha256()
+        if response.status_code == 206 and resume_from:
+            with open(partial_path, "rb") as f:
+                for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+                    digest.update(chunk)
+            mode = "ab"
+            logger.debug(f"Resuming {url} at byte {resume_from}")
+        else:
+            resume_from = 0
+            mode = "wb"
+        
+        # Remember the validators so that an interrupted transfer can be resumed
+        manifest["partial"] = dict(_validators(response), url=url)
         os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+        _write_manifest(output_path, manifest)
         
-        # Save the XSD file
-        with open(output_path, "wb") as f:
-            f.write(response.content)
+        transferred = 0
+        with open(partial_path, mode) as f:
+            for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                f.write(chunk)
+                digest.update(chunk)
+                transferred += len(chunk)
+            f.flush()
+            os.fsync(f.fileno())
         
-        if verbose:
-            logger.debug(f"XSD file saved to {output_path}")
-        logger.info(f"Successfully downloaded OME XSD to {output_path}")
+        expected = response.headers.get("Content-Length")
+        if expected is not None and transferred != int(expected):
+            raise IOError(f"Incomplete download of {url}: received {transferred} of {expected} bytes")
+        
+        os.replace(partial_path, output_path)
+        record = dict(_validators(response), url=url, size=resume_from + transferred, sha256=digest.hexdigest())
+        _write_manifest(output_path, record)
+    
+    return dict(record, path=output_path, status="resumed" if resume_from else "downloaded",
+                bytes_transferred=transferred, seconds=time.perf_counter() - start)
+
+def create_session(pool_size=DEFAULT_MIRROR_JOBS, retries=DEFAULT_RETRIES, backoff_factor=DEFAULT_BACKOFF):
+    """
+    Create an HTTP session whose connection pool is shared by all downloads.
+    
+    Connection errors and transient HTTP statuses (429, 5xx) are retried
+    with exponential backoff.
+    
+    Args:
+        pool_size (int): Number of connections kept open per host
+        retries (int): Number of retries per request
+        backoff_factor (float): Base delay in seconds of the exponential backoff
+        
+    Returns:
+        requests.Session: The session
+    """
+    retry = Retry(total=retries, backoff_factor=backoff_factor, status_forcelist=RETRY_STATUSES,
+                  allowed_methods=frozenset(["GET", "HEAD"]), raise_on_status=False)
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+def find_schema_references(content):
+    """
+    Find the schema documents an XSD includes, imports, redefines or overrides.
+    
+    Args:
+        content (bytes): The XSD document
+        
+    Returns:
+        list: schemaLocation values in document order, without duplicates
+    """
+    locations = []
+    for _, element in ET.iterparse(io.BytesIO(content), events=("start",)):
+        if element.tag in REFERENCE_TAGS:
+            location = (element.get("schemaLocation") or "").strip()
+            if location and location not in locations:
+                locations.append(location)
+    return locations
+
+def mirror_path(url, mirror_dir):
+    """
+    Get the local path of a URL in a mirror directory (<mirror_dir>/<host>/<path>).
+    
+    Args:
+        url (str): URL of a schema document
+        mirror_dir (str): Mirror directory
         
+    Returns:
+        str: Local path of the document
+    """
+    parts = urlsplit(url)
+    path = posixpath.normpath("/" + unquote(parts.path)).lstrip("/")
+    if not path or path.endswith("/"):
+        path = posixpath.join(path, "index.xsd")
+    host = parts.netloc.replace(":", "_") or "localhost"
+    return os.path.join(mirror_dir, host, *path.split("/"))
+
+def rewrite_schema_locations(content, replacements):
+    """
+    Replace schemaLocation values in an XSD document, leaving the rest of it untouched.
+    
+    Args:
+        content (bytes): The XSD document
+        replacements (dict): Mapping of original to new schemaLocation values
+        
+    Returns:
+        bytes: The rewritten document
+    """
+    def replace(match):
+        location = unescape(match.group(3).decode("utf-8")).strip()
+        if location not in replacements:
+            return match.group(0)
+        value = escape(replacements[location], {'"': "&quot;", "'": "&apos;"})
+        return match.group(1) + match.group(2) + value.encode("utf-8") + match.group(2)
+    return _SCHEMA_LOCATION_RE.sub(replace, content)
+
+def _fetch(session, url, download_path, timeout):
+    """Download a schema document (see download_file) and return its content and download record."""
+    record = download_file(session, url, download_path, timeout=timeout)
+    with open(download_path, "rb") as f:
+        return f.read(), record
+
+def mirror_schemas(roots, jobs=DEFAULT_MIRROR_JOBS, session=None, timeout=DEFAULT_TIMEOUT, verbose=False,
+                   download_dir=None):
+    """
+    Mirror several root XSDs, each with the schemas it transitively includes or imports.
+    
+    All documents are fetched concurrently on one thread pool over one
+    pooled session. A document needed by several roots (such as a schema
+    shared by several releases) is fetched once and written to each of
+    their mirrors. See mirror_xsd for the layout of a mirror.
+    
+    Each document is downloaded with download_file into the download
+    directory, as served, and the mirrored copy with rewritten schemaLocation
+    values is written from it. Mirroring again therefore makes conditional
+    requests, and an interrupted transfer is resumed.
+    
+    Args:
+        roots (dict): Mapping of root XSD URL to the directory to mirror it into
+        jobs (int): Number of concurrent downloads
+        session (requests.Session, optional): Session to use (default: a new pooled session)
+        timeout (float): Timeout of each request in seconds
+        verbose (bool): Whether to output verbose logs
+        download_dir (str, optional): Directory the documents are downloaded
+            to (default: <mirror_dir>/.downloads of the first root needing each)
+        
+    Returns:
+        dict: Mapping of each root URL to {url: record} for the files of its
+        mirror, starting with the root; a record has the url, path, size,
+        seconds (download time) and status ("downloaded", "resumed" or
+        "not-modified" as returned by download_file, or "reused" when the
+        document was fetched for another root)
+    """
+    if verbose:
+        logger.setLevel(logging.DEBUG)
+    
+    jobs = max(1, jobs)
+    own_session = session is None
+    if own_session:
+        session = create_session(jobs)
+    
+    roots = {urldefrag(url)[0]: mirror_dir for url, mirror_dir in roots.items()}
+    results = {root: {} for root in roots}
+    wanted = {}      # url -> roots whose mirror needs it
+    fetched = {}     # url -> (content, download record)
+    references = {}  # url -> schemaLocation values in the document
+    ready = []       # (url, root) pairs whose content is available
+    
+    try:
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            pending = {}
+            
+            def need(url, root):
+                if root in wanted.setdefault(url, []):
+                    return
+                wanted[url].append(root)
+                if url in fetched:
+                    ready.append((url, root))
+                elif url not in pending.values():
+                    download_path = mirror_path(url, download_dir or os.path.join(roots[root], DOWNLOAD_DIR))
+                    pending[executor.submit(_fetch, session, url, download_path, timeout)] = url
+            
+            def store(url, root):
+                content, download = fetched[url]
+                mirror_dir = roots[root]
+                local_path = mirror_path(url, mirror_dir)
+                if url not in references:
+                    references[url] = find_schema_references(content)
+                
+                # Fetch the referenced documents while this one is written
+                replacements = {}
+                for location in references[url]:
+                    reference_url = urldefrag(urljoin(url, location))[0]
+                    need(reference_url, root)
+                    relative = os.path.relpath(mirror_path(reference_url, mirror_dir), os.path.dirname(local_path))
+                    replacements[location] = relative.replace(os.sep, "/")
+                
+                _write_atomic(local_path, rewrite_schema_locations(content, replacements))
+                first = not any(url in records for records in results.values())
+                results[root][url] = {
+                    "url": url, "path": local_path, "size": len(content), "seconds": download["seconds"],
+                    "status": download["status"] if first else "reused",
+                }
+                logger.debug(f"Saved {url} to {local_path}")
+            
+            try:
+                for root in roots:
+                    need(root, root)
+                while pending or ready:
+                    while ready:
+                        store(*ready.pop(0))
+                    if pending:
+                        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            url = pending.pop(future)
+                            fetched[url] = future.result()
+                            ready.extend((url, root) for root in wanted[url])
+            except BaseException:
+                for future in pending:
+                    future.cancel()
+                raise
     except requests.exceptions.RequestException as e:
-        logger.error(f"Error downloading XSD: {str(e)}")
+        logger.error(f"Error mirroring XSD: {str(e)}")
         raise
+    finally:
+        if own_session:
+            session.close()
+    
+    for root, mirror_dir in roots.items():
+        catalog_file = os.path.join(mirror_dir, CATALOG_FILE)
+        catalog = SchemaCatalog.load(catalog_file) if os.path.exists(catalog_file) else SchemaCatalog()
+        for url, record in results[root].items():
+            catalog.add(url, record["path"])
+        catalog.save(catalog_file)
+    return results
+
+def mirror_xsd(url, mirror_dir, jobs=DEFAULT_MIRROR_JOBS, session=None, timeout=DEFAULT_TIMEOUT, verbose=False):
+    """
+    Download an XSD and every schema it transitively includes or imports into a local mirror.
+    
+    Each document is parsed as soon as it arrives and the documents it
+    refers to are fetched concurrently over one pooled session. Every file
+    is stored under <mirror_dir>/<host>/<path> with its schemaLocation
+    values rewritten to relative paths of the mirrored files, so parsing the
+    mirrored root schema needs no network access. The URL of every file is
+    added to the mirror's catalog (<mirror_dir>/catalog.json), which lets
+    xmlschema resolve the original URLs offline (see xsd_catalog). The
+    documents as served are kept under <mirror_dir>/.downloads with their
+    manifests, so mirroring again makes only conditional requests.
+    
+    Args:
+        url (str): URL of the root XSD file
+        mirror_dir (str): Directory to mirror the schemas into
+        jobs (int): Number of concurrent downloads
+        session (requests.Session, optional): Session to use (default: a new pooled session)
+        timeout (float): Timeout of each request in seconds
+        verbose (bool): Whether to output verbose logs
+        
+    Returns:
+        dict: Mapping of each downloaded URL to its local path, starting with the root
+    """
+    url = urldefrag(url)[0]
+    records = mirror_schemas({url: mirror_dir}, jobs, session, timeout, verbose)[url]
+    logger.info(f"Mirrored {len(records)} schema files from {url} to {mirror_dir}")
+    return {document_url: record["path"] for document_url, record in records.items()}
+
+def fetch_versions(versions, output_dir, jobs=DEFAULT_MIRROR_JOBS, base_url=OME_SCHEMAS_BASE_URL, session=None,
+                   timeout=DEFAULT_TIMEOUT, verbose=False):
+    """
+    Mirror several OME schema releases, with their includes, into versioned directories.
+    
+    Args:
+        versions (list): Release names (e.g. ['2015-01', '2016-06'])
+        output_dir (str): Directory receiving one mirror per release (<output_dir>/<version>)
+        jobs (int): Number of concurrent downloads across all releases
+        base_url (str): URL the releases are published under (e.g. a local mirror server)
+        session (requests.Session, optional): Session to use (default: a new pooled session)
+        timeout (float): Timeout of each request in seconds
+        verbose (bool): Whether to output verbose logs
+        
+    Returns:
+        dict: Mapping of each version to the {url: record} of its files (see mirror_schemas)
+    """
+    roots = {get_ome_xsd_url(version, base_url): os.path.join(output_dir, version) for version in versions}
+    # One download directory, so that a shared schema is checked once on later runs
+    results = mirror_schemas(roots, jobs, session, timeout, verbose, os.path.join(output_dir, DOWNLOAD_DIR))
+    return {version: results[url] for version, url in zip(versions, roots)}
+
+def format_download_summary(results, elapsed=None):
+    """
+    Format a per-file size and timing summary of fetch_versions results.
+    
+    Args:
+        results (dict): Mapping of version to {url: record}
+        elapsed (float, optional): Wall-clock time of the whole run in seconds
+        
+    Returns:
+        list: Lines of the summary table
+    """
+    rows = [("Version", "File", "Size", "Time", "Status")]
+    downloads = 0
+    total_size = 0
+    for version, records in results.items():
+        for record in records.values():
+            rows.append((version, os.path.basename(record["path"]), f"{record['size']:,} B",
+                         f"{record['seconds'] * 1000:.0f} ms", record["status"]))
+            if record["status"] in ("downloaded", "resumed"):
+                downloads += 1
+                total_size += record["size"]
+    widths = [max(len(row[column]) for row in rows) for column in range(len(rows[0]))]
+    lines = ["  ".join(cell.ljust(width) for cell, width in zip(row, widths)).rstrip() for row in rows]
+    lines.insert(1, "  ".join("-" * width for width in widths))
+    total = f"{downloads} files downloaded ({total_size:,} B) for {len(results)} versions"
+    if elapsed is not None:
+        total += f" in {elapsed:.2f}s"
+    lines.append(total)
+    return lines
 
-def get_ome_xsd_url(version=None):
+def get_ome_xsd_url(version=None, base_url=OME_SCHEMAS_BASE_URL):
     """
     Get the URL for the OME XSD file.
     
     Args:
         version (str, optional): Version of the OME XSD (default is latest)
+        base_url (str, optional): URL the releases are published under
         
     Returns:
         str: URL of the OME XSD file
     """
     if version:
-        return f"https://www.openmicroscopy.org/Schemas/OME/{version}/ome.xsd"
+        return f"{(base_url or OME_SCHEMAS_BASE_URL).rstrip('/')}/{version}/ome.xsd"
     return OME_XSD_URL
 
 if __name__ == "__main__":
@@ -59,6 +566,17 @@ if __name__ == "__main__":
     parser.add_argument("--output", help="Output path for the XSD file", default="data/ome.xsd")
     parser.add_argument("--url", help="URL of the XSD file", default=OME_XSD_URL)
     parser.add_argument("--version", help="OME XSD version (e.g., '2016-06')")
+    parser.add_argument("--mirror", help="Download the XSD and all schemas it includes or imports into this directory")
+    parser.add_argument("--versions", help="Comma-separated OME releases to mirror (e.g. '2015-01,2016-06')")
+    parser.add_argument("--all-known", action="store_true",
+                        help=f"Mirror every known OME release ({', '.join(KNOWN_VERSIONS)})")
+    parser.add_argument("--output-dir", default="data/versions",
+                        help="Directory for --versions/--all-known, one subdirectory per release (default: data/versions)")
+    parser.add_argument("--base-url", default=OME_SCHEMAS_BASE_URL,
+                        help=f"URL the OME releases are published under (default: {OME_SCHEMAS_BASE_URL})")
+    parser.add_argument("--jobs", "-j", type=int, default=DEFAULT_MIRROR_JOBS,
+                        help=f"Number of concurrent downloads when mirroring (default: {DEFAULT_MIRROR_JOBS})")
+    parser.add_argument("--force", action="store_true", help="Download even if the local file is up to date")
     parser.add_argument("--verbose", "-v", action="store_true", help="Enable verbose output")
     
     args = parser.parse_args()
@@ -66,6 +584,15 @@ if __name__ == "__main__":
     # If version is specified, use it to generate the URL
     url = args.url
     if args.version:
-        url = get_ome_xsd_url(args.version)
+        url = get_ome_xsd_url(args.version, args.base_url)
     
-    download_xsd(url, args.output, args.verbose) 
\ No newline at end of file
+    if args.versions or args.all_known:
+        versions = list(KNOWN_VERSIONS) if args.all_known else [v.strip() for v in args.versions.split(",") if v.strip()]
+        start = time.perf_counter()
+        results = fetch_versions(versions, args.output_dir, args.jobs, args.base_url, verbose=args.verbose)
+        print("\n".join(format_download_summary(results, time.perf_counter() - start)))
+    elif args.mirror:
+        local_paths = mirror_xsd(url, args.mirror, args.jobs, verbose=args.verbose)
+        logger.info(f"Root schema: {local_paths[url]}")
+    else:
+        download_xsd(url, args.output, args.verbose, force=args.force)
@@ -1,6 +1,5 @@
 import argparse
 import os
-import xmlschema
 from typing import Dict, List, Optional, Union
 import yaml
 from pathlib import Path
@@ -10,16 +9,32 @@ from collections import defaultdict
 
 # Fix import for both module and direct script usage
 try:
-    from src.xsdtojson import xsd_to_json_schema
+    from src.xsdtojson import xsd_to_json_schema, build_type_index, intersect_patterns
+    from src.schema_bundle import get_bundle_path, write_schema_bundle
+    from src.compact_yaml import dump_compact, log_emission_comparison
+    from src.inheritance_index import InheritanceIndex
+    from src.xsd_catalog import load_xsd, load_catalog
 except ImportError:
-    from xsdtojson import xsd_to_json_schema
+    from xsdtojson import xsd_to_json_schema, build_type_index, intersect_patterns
+    from schema_bundle import get_bundle_path, write_schema_bundle
+    from compact_yaml import dump_compact, log_emission_comparison
+    from inheritance_index import InheritanceIndex
+    from xsd_catalog import load_xsd, load_catalog
 from linkml_runtime.utils.schemaview import SchemaView
 from linkml_runtime.dumpers import yaml_dumper
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-def generate_linkml_schema(ome_xsd_path, output_path=None, top_level_elements=None, partition=False):
+# JSON Schema facet keywords with a LinkML slot equivalent
+_JSON_FACETS_TO_LINKML = {
+    "minimum": "minimum_value",
+    "maximum": "maximum_value",
+    "pattern": "pattern"
+}
+
+def generate_linkml_schema(ome_xsd_path, output_path=None, top_level_elements=None, partition=False, bundle=False, compact=False,
+                           on_write=None, catalog=None):
     """
     Generate a LinkML schema from an OME XSD file.
     
@@ -28,16 +43,23 @@ def generate_linkml_schema(ome_xsd_path, output_path=None, top_level_elements=No
         output_path: Path to output the LinkML schema
         top_level_elements: List of top-level elements to include (if None, include all)
         partition: Whether to partition the schema into separate files
+        bundle: Whether to also write a compiled schema bundle next to the YAML output
+        compact: Whether to write repeated structures once using YAML anchors/aliases
+        on_write: Called with (file_path, schema) as soon as each schema file has been written
+        catalog: SchemaCatalog resolving the locations of included/imported schemas
     
     Returns:
         A dictionary containing the LinkML schema
     """
     try:
         # Parse the XSD using xmlschema
-        xsd = xmlschema.XMLSchema(ome_xsd_path)
+        xsd = load_xsd(ome_xsd_path, catalog)
+        
+        # Resolve all simple types once and share the index with both stages
+        type_index = build_type_index(xsd)
         
         # Convert to JSON Schema
-        json_schema = xsd_to_json_schema(ome_xsd_path)
+        json_schema = xsd_to_json_schema(ome_xsd_path, schema=xsd, type_index=type_index)
         
         # Filter top-level elements if specified
         if top_level_elements:
@@ -51,8 +73,9 @@ def generate_linkml_schema(ome_xsd_path, output_path=None, top_level_elements=No
                 
                 # Include associated definitions
                 if "definitions" in json_schema:
+                    referenced_defs = _collect_definition_refs(filtered_props.get(element, {}))
                     for def_name, def_value in json_schema["definitions"].items():
-                        if def_name.startswith(element) or def_name in [ref.split("/")[-1] for ref in filtered_props.get(element, {}).get("$ref", "").split()]:
+                        if def_name.startswith(element) or def_name in referenced_defs:
                             filtered_defs[def_name] = def_value
             
             # Update JSON schema with filtered values
@@ -61,10 +84,11 @@ def generate_linkml_schema(ome_xsd_path, output_path=None, top_level_elements=No
                 json_schema["definitions"] = filtered_defs
         
         # Convert JSON Schema to LinkML
-        linkml_schema = convert_json_schema_to_linkml(json_schema, xsd)
+        linkml_schema = convert_json_schema_to_linkml(json_schema, xsd, InheritanceIndex.from_xsd(xsd))
         
         # Output schema
         if output_path:
+            written_paths = []
             if partition and "classes" in linkml_schema:
                 # Create directory if it doesn't exist
                 if not os.path.exists(output_path):
@@ -103,7 +127,8 @@ def generate_linkml_schema(ome_xsd_path, output_path=None, top_level_elements=No
                             "Shape": linkml_schema["classes"]["Shape"],
                             "AffineTransform": linkml_schema["classes"]["AffineTransform"]
                         },
-                        "slots": {}
+                        "slots": {},
+                        "enums": {}
                     }
                     
                     # Add relevant slots
@@ -120,10 +145,24 @@ def generate_linkml_schema(ome_xsd_path, output_path=None, top_level_elements=No
                            "AffineTransform" in slot_def.get("description", ""):
                             partitioned_schema["slots"][slot_name] = slot_def
                     
+                    # Add enums used as slot ranges, globally or in the classes' slot_usage
+                    ranges = [slot_def.get("range") for slot_def in partitioned_schema["slots"].values()]
+                    ranges += [usage.get("range") for partition_class in partitioned_schema["classes"].values()
+                               for usage in partition_class.get("slot_usage", {}).values()]
+                    for range_name in ranges:
+                        if range_name in linkml_schema["enums"]:
+                            partitioned_schema["enums"][range_name] = linkml_schema["enums"][range_name]
+                    
                     # Write to file
                     class_file_path = os.path.join(output_path, f"{class_name}.yaml")
                     with open(class_file_path, 'w') as f:
-                        yaml.dump(partitioned_schema, f, sort_keys=False)
+                        if compact:
+                            dump_compact(partitioned_schema, f)
+                        else:
+                            yaml.dump(partitioned_schema, f, sort_keys=False)
+                    written_paths.append(class_file_path)
+                    if on_write is not None:
+                        on_write(class_file_path, partitioned_schema)
                 
                 logger.info(f"Successfully partitioned schema into {len(linkml_schema['classes'])} files in {output_path}")
             else:
@@ -137,9 +176,23 @@ def generate_linkml_schema(ome_xsd_path, output_path=None, top_level_elements=No
                 
                 # Use yaml_dumper for consistent YAML format
                 with open(output_path, 'w') as f:
-                    yaml.dump(linkml_schema, f, sort_keys=False, default_flow_style=False)
+                    if compact:
+                        dump_compact(linkml_schema, f)
+                    else:
+                        yaml.dump(linkml_schema, f, sort_keys=False, default_flow_style=False)
+                written_paths.append(output_path)
+                if on_write is not None:
+                    on_write(output_path, linkml_schema)
+                
+                if compact and logger.isEnabledFor(logging.DEBUG):
+                    log_emission_comparison(linkml_schema)
                 
                 logger.info(f"Successfully generated LinkML schema at {output_path}")
+            
+            # Compile a bundle that downstream tools can load without reparsing YAML
+            if bundle:
+                bundle_path = get_bundle_path(output_path, linkml_schema, partition and "classes" in linkml_schema)
+                write_schema_bundle(linkml_schema, written_paths, bundle_path)
         
         return linkml_schema
     
@@ -147,13 +200,14 @@ def generate_linkml_schema(ome_xsd_path, output_path=None, top_level_elements=No
         logger.error(f"Error generating LinkML schema: {str(e)}")
         raise
 
-def convert_json_schema_to_linkml(json_schema, xsd):
+def convert_json_schema_to_linkml(json_schema, xsd, inheritance=None):
     """
     Convert a JSON Schema to a LinkML schema.
     
     Args:
         json_schema: JSON Schema dictionary
         xsd: The original XMLSchema object for documentation and inheritance information
+        inheritance: InheritanceIndex built from xsd (built if None)
     
     Returns:
         A dictionary containing the LinkML schema
@@ -200,85 +254,46 @@ def convert_json_schema_to_linkml(json_schema, xsd):
             }
         },
         "classes": {},
-        "slots": {}
+        "slots": {},
+        "enums": {}
     }
     
-    # Get complex type hierarchy from XSD
-    complex_types = {}
-    inheritance_map = {}
+    # Build the inheritance index once; classes are created parents-first
+    if inheritance is None:
+        inheritance = InheritanceIndex.from_xsd(xsd)
     
-    # Extract complex types and their inheritance
+    # Collect the XSD definition behind each class (complex types take precedence over elements)
+    class_sources = {}
     for type_name, type_def in xsd.types.items():
         if type_def.is_complex() and not type_name.startswith('{'):
-            complex_types[type_name] = type_def
-            # Check for base types (inheritance)
-            if hasattr(type_def, 'content') and hasattr(type_def.content, 'base_type'):
-                base_type = type_def.content.base_type
-                if base_type and hasattr(base_type, 'name') and base_type.name:
-                    base_name = base_type.name.split("}")[-1]  # Remove namespace
-                    inheritance_map[type_name] = base_name
-    
-    # Create a class for each complex type
-    for type_name, type_def in complex_types.items():
-        if type_name in linkml_schema["classes"]:
-            continue
-            
-        linkml_schema["classes"][type_name] = {
-            "description": f"Complex type {type_name}",
-            "slots": [],
-            "attributes": {}
-        }
-        
-        # Get documentation if available
-        if hasattr(type_def, 'annotation') and type_def.annotation:
-            doc = _get_documentation(type_def.annotation)
-            if doc:
-                linkml_schema["classes"][type_name]["description"] = _ensure_serializable(doc)
-        
-        # Add inheritance (is_a)
-        if type_name in inheritance_map:
-            base_type = inheritance_map[type_name]
-            if base_type in linkml_schema["classes"]:
-                linkml_schema["classes"][type_name]["is_a"] = base_type
-        
-    # Process elements to create classes and slots
+            class_sources[type_name] = (f"Complex type {type_name}", type_def)
     for elem_name, elem_def in xsd.elements.items():
         element_name = elem_name.split("}")[-1]  # Remove namespace
-        
-        if element_name in linkml_schema["classes"]:
+        if element_name not in class_sources:
+            class_sources[element_name] = (f"The {element_name} element from the XML Schema.", elem_def)
+    
+    # Create a class for each complex type and element
+    for class_name in inheritance.order:
+        if class_name not in class_sources or class_name in linkml_schema["classes"]:
             continue
-            
-        # Create class for element
-        linkml_schema["classes"][element_name] = {
-            "description": f"The {element_name} element from the XML Schema.",
+        default_description, source_def = class_sources[class_name]
+        
+        linkml_schema["classes"][class_name] = {
+            "description": default_description,
             "slots": [],
             "attributes": {}
         }
         
         # Get documentation if available
-        if hasattr(elem_def, 'annotation') and elem_def.annotation:
-            doc = _get_documentation(elem_def.annotation)
+        if hasattr(source_def, 'annotation') and source_def.annotation:
+            doc = _get_documentation(source_def.annotation)
             if doc:
-                linkml_schema["classes"][element_name]["description"] = _ensure_serializable(doc)
+                linkml_schema["classes"][class_name]["description"] = _ensure_serializable(doc)
         
-        # Check if this element extends a complex type
-        if hasattr(elem_def, 'type') and hasattr(elem_def.type, 'content'):
-            type_content = elem_def.type.content
-            if hasattr(type_content, 'base_type') and type_content.base_type:
-                base_type = type_content.base_type
-                if hasattr(base_type, 'name'):
-                    base_name = base_type.name.split("}")[-1]
-                    if base_name in linkml_schema["classes"]:
-                        linkml_schema["classes"][element_name]["is_a"] = base_name
-                        
-                        # Inherit slots from base class
-                        base_slots = linkml_schema["classes"][base_name].get("slots", [])
-                        linkml_schema["classes"][element_name]["slots"].extend(base_slots)
-                        
-                        # Inherit attributes from base class
-                        base_attrs = linkml_schema["classes"][base_name].get("attributes", {})
-                        for attr_name, attr_slot in base_attrs.items():
-                            linkml_schema["classes"][element_name]["attributes"][attr_name] = attr_slot
+        # Add inheritance (is_a); the parent was created earlier in topological order
+        parent = inheritance.parent(class_name)
+        if parent in linkml_schema["classes"]:
+            linkml_schema["classes"][class_name]["is_a"] = parent
         
     # Add properties and attributes from JSON schema
     for prop_name, prop_def in json_schema.get("properties", {}).items():
@@ -296,35 +311,178 @@ def convert_json_schema_to_linkml(json_schema, xsd):
                 
                 # Check if slot already exists
                 if slot_name not in linkml_schema["slots"]:
+                    # List types range over their item type
+                    value_def = attr_def.get("items", {}) if attr_def.get("type") == "array" else attr_def
                     linkml_schema["slots"][slot_name] = {
                         "description": f"Attribute {attr_name} of {prop_name}",
-                        "range": _map_json_type_to_linkml_type(attr_def.get("type", "string"))
+                        "range": _map_json_type_to_linkml_type(value_def.get("type", "string"))
                     }
                     
                     # Add documentation if available
                     if "description" in attr_def:
                         linkml_schema["slots"][slot_name]["description"] = _ensure_serializable(attr_def["description"])
                     
-                    # Add enumerations if available
-                    if "enum" in attr_def:
-                        linkml_schema["slots"][slot_name]["enum_values"] = {
-                            enum_val: {"description": f"{enum_val} value"} 
-                            for enum_val in attr_def["enum"]
-                        }
-                    
                     # Add required flag
                     if "required" in prop_def and attr_name in prop_def["required"]:
                         linkml_schema["slots"][slot_name]["required"] = True
                 
+                # Slots are shared by name, but the same attribute has different facets (e.g. the
+                # pattern of ID) and enumerations (e.g. Type) in each class, so those go to the
+                # class's slot_usage
+                usage = {}
+                _add_slot_constraints(usage, attr_def, f"{prop_name}.{attr_name}")
+                if usage.get("range") == linkml_schema["slots"][slot_name]["range"]:
+                    del usage["range"]
+                enum_name = _add_enum(linkml_schema, attr_name, attr_def, json_schema, prop_name)
+                if enum_name:
+                    usage["range"] = enum_name
+                if usage:
+                    _add_slot_usage(linkml_schema["classes"][prop_name], slot_name, usage)
+                
                 # Add slot to class and track in attributes mapping
                 if slot_name not in linkml_schema["classes"][prop_name]["slots"]:
                     linkml_schema["classes"][prop_name]["slots"].append(slot_name)
                 linkml_schema["classes"][prop_name]["attributes"][attr_name] = slot_name
     
+    # Flatten inherited slots and attributes into each class, parents first
+    inheritance.attach(
+        slots={name: class_def["slots"] for name, class_def in linkml_schema["classes"].items()},
+        attributes={name: class_def["attributes"] for name, class_def in linkml_schema["classes"].items()}
+    )
+    for class_name in inheritance.order:
+        if class_name in linkml_schema["classes"]:
+            linkml_schema["classes"][class_name]["slots"] = list(inheritance.effective_slots(class_name))
+            linkml_schema["classes"][class_name]["attributes"] = dict(inheritance.effective_attributes(class_name))
+    
     _add_common_base_classes(linkml_schema)
     
     return _ensure_schema_serializable(linkml_schema)
 
+def _add_enum(linkml_schema, attr_name, attr_def, json_schema, class_name):
+    """
+    Register the enumeration used by an attribute as a named LinkML enum.
+    
+    Enumerations of named XSD simple types arrive as "$ref"s into the JSON
+    Schema definitions and are keyed by that type name; anonymous inline
+    enumerations are named after the attribute, or after the class and the
+    attribute when another class already has a different enumeration of the
+    same attribute name.
+    
+    Args:
+        linkml_schema: The LinkML schema being built
+        attr_name: Name of the attribute
+        attr_def: JSON Schema definition of the attribute
+        json_schema: JSON Schema dictionary holding the shared definitions
+        class_name: Name of the class holding the attribute
+    
+    Returns:
+        The enum name, or None if the attribute is not enumerated
+    """
+    # The items of XSD list types can be enumerated too
+    if attr_def.get("type") == "array":
+        attr_def = attr_def.get("items", {})
+    
+    if "$ref" in attr_def:
+        enum_name = attr_def["$ref"].split("/")[-1]
+        enum_def = json_schema.get("definitions", {}).get(enum_name, {})
+    elif "enum" in attr_def:
+        enum_name = f"{attr_name}Enum"
+        enum_def = attr_def
+        existing = linkml_schema["enums"].get(enum_name)
+        if existing and list(existing["permissible_values"]) != [str(value) for value in attr_def["enum"]]:
+            enum_name = f"{class_name}{attr_name}Enum"
+    else:
+        return None
+    
+    if "enum" not in enum_def:
+        return None
+    
+    if enum_name not in linkml_schema["enums"]:
+        linkml_schema["enums"][enum_name] = {}
+        if "description" in enum_def and "$ref" in attr_def:
+            linkml_schema["enums"][enum_name]["description"] = _ensure_serializable(enum_def["description"])
+        linkml_schema["enums"][enum_name]["permissible_values"] = {
+            str(enum_val): {} for enum_val in enum_def["enum"]
+        }
+    
+    return enum_name
+
+def _add_slot_usage(class_def, slot_name, usage):
+    """
+    Refine a shared slot for one class.
+    
+    Args:
+        class_def: The LinkML class definition to update
+        slot_name: Name of the slot
+        usage: Slot properties that only hold in this class
+    """
+    class_def.setdefault("slot_usage", {}).setdefault(slot_name, {}).update(usage)
+
+def _add_slot_constraints(slot_def, attr_def, label):
+    """
+    Copy the facets of a resolved attribute type onto a LinkML slot or slot usage.
+    
+    XSD list types arrive as JSON arrays and become multivalued slots ranging
+    over their item type. LinkML has no length or exclusive bound facets:
+    string lengths are folded into the pattern, exclusive integer bounds
+    become inclusive ones, and exclusive float bounds are relaxed to
+    inclusive ones with a warning.
+    
+    Args:
+        slot_def: The LinkML slot definition or slot usage to update
+        attr_def: JSON Schema definition of the attribute
+        label: Name of the attribute for log messages, e.g. "Pixels.PhysicalSizeX"
+    """
+    if attr_def.get("type") == "array":
+        attr_def = attr_def.get("items", {})
+        slot_def["range"] = _map_json_type_to_linkml_type(attr_def.get("type", "string"))
+        slot_def["multivalued"] = True
+    
+    for json_keyword, linkml_keyword in _JSON_FACETS_TO_LINKML.items():
+        if json_keyword in attr_def:
+            slot_def[linkml_keyword] = attr_def[json_keyword]
+    
+    for json_keyword, linkml_keyword, step in (("exclusiveMinimum", "minimum_value", 1),
+                                               ("exclusiveMaximum", "maximum_value", -1)):
+        if json_keyword not in attr_def:
+            continue
+        bound = attr_def[json_keyword]
+        if attr_def.get("type") == "integer":
+            slot_def[linkml_keyword] = bound + step
+        else:
+            logger.warning(f"{label}: LinkML cannot express the exclusive bound {json_keyword}={bound}; "
+                           f"using it as an inclusive {linkml_keyword}")
+            slot_def[linkml_keyword] = bound
+    
+    # Lexical patterns of numeric XSD types (e.g. OME's float syntax) do not apply to LinkML numbers
+    if attr_def.get("type") != "string":
+        slot_def.pop("pattern", None)
+    elif "minLength" in attr_def or "maxLength" in attr_def:
+        length = rf"^[\s\S]{{{attr_def.get('minLength', 0)},{attr_def.get('maxLength', '')}}}$"
+        slot_def["pattern"] = intersect_patterns(length, slot_def.get("pattern"))
+
+def _collect_definition_refs(json_def):
+    """
+    Collect the names of all JSON Schema definitions referenced within a definition.
+    
+    Args:
+        json_def: A JSON Schema (sub)dictionary
+    
+    Returns:
+        Set of referenced definition names
+    """
+    refs = set()
+    if isinstance(json_def, dict):
+        for key, value in json_def.items():
+            if key == "$ref" and isinstance(value, str):
+                refs.add(value.split("/")[-1])
+            else:
+                refs |= _collect_definition_refs(value)
+    elif isinstance(json_def, list):
+        for item in json_def:
+            refs |= _collect_definition_refs(item)
+    return refs
+
 def _get_documentation(annotation):
     """
     Extract documentation from an XSD annotation.
@@ -699,6 +857,10 @@ if __name__ == "__main__":
     parser.add_argument("--output", help="Output path for the LinkML schema")
     parser.add_argument("--elements", help="Comma-separated list of top-level elements to include")
     parser.add_argument("--partition", action="store_true", help="Partition the schema into separate files")
+    parser.add_argument("--bundle", action="store_true", help="Also write a compiled schema bundle for fast reloading")
+    parser.add_argument("--compact", action="store_true", help="Write repeated structures once using YAML anchors/aliases")
+    parser.add_argument("--catalog", help="Catalog file or schema mirror directory to resolve schema locations with")
+    parser.add_argument("--offline", action="store_true", help="Refuse network access when resolving schema locations")
     parser.add_argument("-v", "--verbose", action="store_true", help="Enable verbose logging")
     
     args = parser.parse_args()
@@ -708,4 +870,5 @@ if __name__ == "__main__":
     
     top_level_elements = args.elements.split(",") if args.elements else None
     
-    generate_linkml_schema(args.xsd_path, args.output, top_level_elements, args.partition)
\ No newline at end of file
+    generate_linkml_schema(args.xsd_path, args.output, top_level_elements, args.partition, args.bundle, args.compact,
+                           catalog=load_catalog(args.catalog, args.offline))
\ No newline at end of file
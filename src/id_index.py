@@ -0,0 +1,379 @@
+#!/usr/bin/env python
+"""
+Byte-offset ID index for random access into large OME-XML documents.
+
+Answering "give me Image:42" on a 500 MB OME-XML document otherwise means
+parsing the whole file. The indexer streams the document once with expat and
+records the byte offset of the start tag of every element with an ID
+attribute (Image, Pixels, Channel, ROI, Shape, Instrument, Annotation, ...).
+References such as ImageRef, and the settings elements (LightSourceSettings,
+DetectorSettings, ObjectiveSettings) and Leader and Pump elements, carry the
+ID of the element they point to and are not indexed. The index is persisted next to the document as
+"<document>.idx" and is rebuilt when the document's size or modification
+time no longer match the ones it recorded.
+
+Lookups memory-map the document and parse forward from the recorded offset
+only until the requested element is closed, so the cost of a lookup is the
+size of that element's subtree rather than of the document. The namespace
+declarations in scope at the indexed elements are recorded with the offsets
+and declared again around the subtree, so its elements get the same
+qualified tags as in a full parse.
+"""
+
+import os
+import sys
+import mmap
+import time
+import codecs
+import logging
+import marshal
+import argparse
+import bisect
+import xml.etree.ElementTree as ElementTree
+from xml.parsers import expat
+from typing import Dict, Iterator, List, Optional
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+INDEX_MAGIC = b"OMEXIDX\x00"
+INDEX_FORMAT_VERSION = 2
+INDEX_EXTENSION = ".idx"
+
+# marshal output is only stable within a Python minor version
+_PYTHON_TAG = "%d.%d" % sys.version_info[:2]
+
+# Bytes handed to expat at a time while indexing
+READ_SIZE = 1024 * 1024
+
+# First and largest chunk fed to the parser of a subtree; small elements are parsed from one small chunk
+SUBTREE_READ_SIZE = 4096
+MAX_SUBTREE_READ_SIZE = 1024 * 1024
+
+# Elements whose ID refers to another element, besides the *Ref elements (the
+# keyrefs of the OME schema)
+REFERENCE_ELEMENTS = frozenset(["LightSourceSettings", "DetectorSettings", "ObjectiveSettings", "Leader", "Pump"])
+
+# Element wrapping a subtree, carrying the namespace declarations of the document
+_WRAPPER = "_subtree"
+
+
+def get_index_path(xml_file: str) -> str:
+    """Return where the ID index of a document is persisted."""
+    return xml_file + INDEX_EXTENSION
+
+
+def _source_stamp(xml_file: str) -> Dict[str, int]:
+    """Return the size and modification time an index of a document is checked against."""
+    stat = os.stat(xml_file)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def build_id_index(xml_file: str) -> Dict:
+    """
+    Stream a document once and record the byte offset of every element with an ID.
+
+    Args:
+        xml_file: Path of the XML document
+
+    Returns:
+        Dictionary with 'offsets' (ID -> byte offset of the start tag),
+        'namespaces' ([offset, {prefix: URI}] pairs, in document order, giving
+        the declarations in scope from each offset on), 'encoding' and
+        'source' entries
+
+    Raises:
+        ElementTree.ParseError: If the document is not well-formed XML
+        ValueError: If the document's encoding is not ASCII-compatible
+    """
+    source = _source_stamp(xml_file)
+    parser = expat.ParserCreate(namespace_separator='}')
+    offsets = {}
+    namespaces = []
+    declaration = {}
+    duplicates = []
+    # Declarations in scope (replaced, never modified), and the scopes they shadow
+    scope = [{}]
+    shadowed = []
+
+    def start(name, attributes):
+        element_id = attributes.get('ID')
+        if element_id is None or name.endswith('Ref') or name.rpartition('}')[2] in REFERENCE_ELEMENTS:
+            return
+        if element_id in offsets:
+            duplicates.append(element_id)
+            return
+        offset = parser.CurrentByteIndex
+        offsets[element_id] = offset
+        if not namespaces or (namespaces[-1][1] is not scope[0] and namespaces[-1][1] != scope[0]):
+            namespaces.append([offset, scope[0]])
+
+    def start_namespace(prefix, uri):
+        # Declarations precede the start tag they are made on, and end after its end tag
+        shadowed.append(scope[0])
+        scope[0] = dict(scope[0], **{prefix or '': uri})
+
+    def end_namespace(prefix):
+        scope[0] = shadowed.pop()
+
+    def xml_declaration(version, encoding, standalone):
+        declaration['encoding'] = encoding
+
+    parser.StartElementHandler = start
+    parser.StartNamespaceDeclHandler = start_namespace
+    parser.EndNamespaceDeclHandler = end_namespace
+    parser.XmlDeclHandler = xml_declaration
+
+    with open(xml_file, 'rb') as f:
+        while True:
+            data = f.read(READ_SIZE)
+            try:
+                parser.Parse(data, not data)
+            except expat.ExpatError as e:
+                error = ElementTree.ParseError(f"{expat.ErrorString(e.code)}: line {e.lineno}, column {e.offset}")
+                error.code = e.code
+                error.position = (e.lineno, e.offset)
+                raise error from None
+            if not data:
+                break
+
+    encoding = declaration.get('encoding') or 'utf-8'
+    if codecs.lookup(encoding).name.startswith(('utf-16', 'utf-32')):
+        raise ValueError(f"{xml_file} is encoded in {encoding}; only ASCII-compatible encodings can be indexed")
+    if duplicates:
+        logger.warning(f"{len(duplicates)} elements of {xml_file} repeat an ID; the first element is indexed "
+                       f"(e.g. {duplicates[0]})")
+    return {"offsets": offsets, "namespaces": namespaces, "encoding": encoding, "source": source}
+
+
+def write_id_index(index: Dict, index_path: str) -> str:
+    """
+    Persist an ID index.
+
+    Args:
+        index: Index built by build_id_index
+        index_path: Path of the index file
+
+    Returns:
+        The index path
+    """
+    payload = dict(index, format_version=INDEX_FORMAT_VERSION, python=_PYTHON_TAG)
+    # Write to a temporary file first so readers never see a partial index
+    tmp_path = f"{index_path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(INDEX_MAGIC)
+        f.write(marshal.dumps(payload))
+    os.replace(tmp_path, index_path)
+    return index_path
+
+
+def load_id_index(index_path: str, xml_file: Optional[str] = None) -> Dict:
+    """
+    Load a persisted ID index.
+
+    Args:
+        index_path: Path of the index file
+        xml_file: Document the index must still match (None to skip the check)
+
+    Returns:
+        The index, as built by build_id_index
+
+    Raises:
+        ValueError: If the file is not an index readable by this Python/index
+            version, or the document has changed since it was indexed
+    """
+    with open(index_path, 'rb') as f:
+        data = f.read()
+
+    if not data.startswith(INDEX_MAGIC):
+        raise ValueError(f"Not an ID index: {index_path}")
+
+    try:
+        payload = marshal.loads(data[len(INDEX_MAGIC):])
+    except (ValueError, EOFError, TypeError) as e:
+        raise ValueError(f"Corrupt ID index {index_path}: {str(e)}")
+
+    if payload.get("format_version") != INDEX_FORMAT_VERSION or payload.get("python") != _PYTHON_TAG:
+        raise ValueError(
+            f"ID index {index_path} was written by an incompatible version "
+            f"(format {payload.get('format_version')}, Python {payload.get('python')})"
+        )
+
+    if xml_file is not None and payload.get("source") != _source_stamp(xml_file):
+        raise ValueError(f"ID index {index_path} is stale: {xml_file} has changed")
+
+    return payload
+
+
+class IdIndex:
+    """
+    Random access to the elements of an XML document by their ID.
+
+    Attributes:
+        xml_file: Path of the document
+        offsets: Mapping of ID to the byte offset of the element's start tag
+        namespaces: Namespace declarations in scope ([offset, {prefix: URI}]
+            pairs in document order, each applying from its offset on)
+        encoding: Encoding of the document
+    """
+
+    def __init__(self, xml_file: str, index: Dict):
+        self.xml_file = xml_file
+        self.offsets = index["offsets"]
+        self.namespaces = index["namespaces"]
+        self.encoding = index["encoding"]
+        self._file = None
+        self._data = None
+        self._scope_offsets = [offset for offset, _ in self.namespaces]
+        self._prologues = {}
+
+    def _prologue(self, offset: int) -> bytes:
+        """Return the start of the wrapper declaring the namespaces in scope at an offset."""
+        position = bisect.bisect_right(self._scope_offsets, offset) - 1
+        if position not in self._prologues:
+            scope = self.namespaces[position][1] if position >= 0 else {}
+            declarations = "".join(
+                f' xmlns:{prefix}="{uri}"' if prefix else f' xmlns="{uri}"'
+                for prefix, uri in scope.items()
+            )
+            self._prologues[position] = (f'<?xml version="1.0" encoding="{self.encoding}"?>'
+                                         f'<{_WRAPPER}{declarations}>').encode(self.encoding)
+        return self._prologues[position]
+
+    @classmethod
+    def open(cls, xml_file: str, index_path: Optional[str] = None, rebuild: bool = False) -> "IdIndex":
+        """
+        Open the index of a document, building and persisting it if it is missing or stale.
+
+        Args:
+            xml_file: Path of the XML document
+            index_path: Path of the index file (defaults to "<xml_file>.idx")
+            rebuild: Whether to rebuild the index even if a fresh one exists
+
+        Returns:
+            The index
+        """
+        index_path = index_path or get_index_path(xml_file)
+        if os.path.exists(index_path) and not rebuild:
+            try:
+                return cls(xml_file, load_id_index(index_path, xml_file))
+            except ValueError as e:
+                logger.info(f"Rebuilding ID index: {str(e)}")
+
+        start = time.perf_counter()
+        index = build_id_index(xml_file)
+        logger.info(f"Indexed {len(index['offsets'])} IDs of {xml_file} ({index['source']['size'] / 1e6:.1f} MB) "
+                    f"in {time.perf_counter() - start:.2f}s")
+        try:
+            write_id_index(index, index_path)
+        except OSError as e:
+            logger.warning(f"Cannot write ID index {index_path}: {str(e)}")
+        return cls(xml_file, index)
+
+    def __enter__(self) -> "IdIndex":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __contains__(self, element_id: str) -> bool:
+        return element_id in self.offsets
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.offsets)
+
+    def close(self):
+        """Unmap and close the document."""
+        if self._data is not None:
+            self._data.close()
+            self._file.close()
+            self._data = self._file = None
+
+    def _mapped(self) -> mmap.mmap:
+        if self._data is None:
+            self._file = open(self.xml_file, 'rb')
+            self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._data
+
+    def get(self, element_id: str) -> ElementTree.Element:
+        """
+        Parse the element with an ID, and its subtree, from the document.
+
+        Args:
+            element_id: Value of the element's ID attribute
+
+        Returns:
+            The element, equal to the one of a full parse except that its tail is None
+
+        Raises:
+            KeyError: If no element has the ID
+            ElementTree.ParseError: If the document has changed since it was indexed
+        """
+        offset = self.offsets[element_id]
+        data = self._mapped()
+        parser = ElementTree.XMLPullParser(events=('start', 'end'))
+        parser.feed(self._prologue(offset))
+        element = None
+        depth = 0
+        read_size = SUBTREE_READ_SIZE
+        while offset < len(data):
+            parser.feed(data[offset:offset + read_size])
+            offset += read_size
+            read_size = min(read_size * 2, MAX_SUBTREE_READ_SIZE)
+            for event, elem in parser.read_events():
+                if event == 'start':
+                    depth += 1
+                    if depth == 2 and element is None:
+                        element = elem
+                elif depth == 2:
+                    # The requested element is complete; the rest of the document is never parsed.
+                    # Text read ahead after it belongs to its parent.
+                    element.tail = None
+                    return element
+                else:
+                    depth -= 1
+        raise ElementTree.ParseError(f"Element {element_id} of {self.xml_file} ends after the end of the file; "
+                                     f"rebuild the ID index")
+
+
+def main():
+    """Main function to run the ID index from command line"""
+    parser = argparse.ArgumentParser(description="Index the IDs of an XML document and print elements by ID")
+    parser.add_argument("xml_file", help="OME-XML document")
+    parser.add_argument("ids", nargs="*", help="IDs of the elements to print, e.g. Image:42")
+    parser.add_argument("--rebuild", action="store_true", help="Rebuild the index even if it is up to date")
+    parser.add_argument("--verbose", "-v", action="store_true", help="Enable verbose output")
+    args = parser.parse_args()
+
+    if args.verbose:
+        logger.setLevel(logging.DEBUG)
+
+    start = time.perf_counter()
+    try:
+        index = IdIndex.open(args.xml_file, rebuild=args.rebuild)
+    except (ElementTree.ParseError, OSError, ValueError) as e:
+        logger.error(f"✗ Cannot index {args.xml_file}: {str(e)}")
+        return 1
+    logger.debug(f"Opened the index of {len(index)} IDs in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    missing: List[str] = []
+    with index:
+        for element_id in args.ids:
+            start = time.perf_counter()
+            try:
+                element = index.get(element_id)
+            except KeyError:
+                missing.append(element_id)
+                logger.error(f"✗ No element has the ID {element_id}")
+                continue
+            logger.debug(f"Parsed {element_id} in {(time.perf_counter() - start) * 1000:.1f} ms")
+            ElementTree.indent(element)
+            sys.stdout.write(ElementTree.tostring(element, encoding="unicode") + "\n")
+    return 1 if missing else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,239 @@
+"""
+Inheritance index for OME classes.
+
+The index is built once, either from the XSD (complex types and elements with
+their base types) or from a LinkML schema dictionary (is_a), and provides a
+topological class order, the ancestors of each class and the effective slots
+and attributes of each class with inheritance flattened. Ancestors and
+effective members are memoised, so flattening a whole schema is linear in the
+number of classes and does not depend on dictionary iteration order.
+"""
+
+import logging
+from typing import Dict, List, Optional
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def _local_name(name: Optional[str]) -> Optional[str]:
+    """Remove the namespace from a qualified XSD name."""
+    return name.split("}")[-1] if name else name
+
+
+def _xsd_base_name(type_def) -> Optional[str]:
+    """Return the local name of the complex base type of an XSD type, if any."""
+    base_type = getattr(type_def, 'base_type', None)
+    if base_type is None:
+        # Older xmlschema releases expose the base type on the content model
+        base_type = getattr(getattr(type_def, 'content', None), 'base_type', None)
+    if base_type is None or not getattr(base_type, 'name', None):
+        return None
+    if not base_type.is_complex():
+        return None
+    return _local_name(base_type.name)
+
+
+class InheritanceIndex:
+    """
+    Precomputed class hierarchy with memoised ancestors and effective members.
+
+    Attributes:
+        parents: Mapping of class name to parent class name (or None)
+        order: Class names in topological order (parents before children)
+        missing_parents: Mapping of class name to a parent that is not a known class
+        cycles: Class names that take part in an inheritance cycle
+    """
+
+    def __init__(self, parents: Dict[str, Optional[str]],
+                 slots: Optional[Dict[str, List[str]]] = None,
+                 attributes: Optional[Dict[str, Dict[str, str]]] = None):
+        self.parents = dict(parents)
+        self.missing_parents = {
+            name: parent for name, parent in self.parents.items()
+            if parent and parent not in self.parents
+        }
+        self.cycles = []
+        self.order = self._topological_order()
+        self._ancestors = {}
+        self.attach(slots, attributes)
+
+    @classmethod
+    def from_xsd(cls, xsd) -> "InheritanceIndex":
+        """
+        Build the index from a parsed XSD.
+
+        Named complex types inherit from their complex base type. Elements
+        inherit from their named complex type, or from the base type their
+        anonymous complex type extends.
+
+        Args:
+            xsd: The XMLSchema object
+
+        Returns:
+            The inheritance index (without slots)
+        """
+        parents = {}
+        for type_name, type_def in xsd.types.items():
+            if type_def.is_complex() and not type_name.startswith('{'):
+                parents[type_name] = _xsd_base_name(type_def)
+
+        for elem_name, elem_def in xsd.elements.items():
+            element_name = _local_name(elem_name)
+            if element_name in parents:
+                continue
+            elem_type = getattr(elem_def, 'type', None)
+            if elem_type is None or not elem_type.is_complex():
+                parents[element_name] = None
+            elif getattr(elem_type, 'name', None):
+                parents[element_name] = _local_name(elem_type.name)
+            else:
+                parents[element_name] = _xsd_base_name(elem_type)
+
+        # Only complex types known to the index can be parents
+        for name, parent in parents.items():
+            if parent is not None and parent not in parents:
+                parents[name] = None
+        return cls(parents)
+
+    @classmethod
+    def from_linkml(cls, linkml_schema: Dict) -> "InheritanceIndex":
+        """
+        Build the index from a LinkML schema dictionary.
+
+        Args:
+            linkml_schema: LinkML schema dictionary
+
+        Returns:
+            The inheritance index with the classes' own slots and attributes
+        """
+        classes = {
+            name: class_def for name, class_def in (linkml_schema.get("classes") or {}).items()
+            if isinstance(class_def, dict)
+        }
+        return cls(
+            {name: class_def.get("is_a") for name, class_def in classes.items()},
+            {name: class_def.get("slots") or [] for name, class_def in classes.items()
+             if isinstance(class_def.get("slots") or [], list)},
+            {name: class_def.get("attributes") or {} for name, class_def in classes.items()
+             if isinstance(class_def.get("attributes") or {}, dict)},
+        )
+
+    def attach(self, slots: Optional[Dict[str, List[str]]] = None,
+               attributes: Optional[Dict[str, Dict[str, str]]] = None):
+        """
+        Attach the classes' own slots and attributes, resetting the memoised members.
+
+        Args:
+            slots: Mapping of class name to its own slot names
+            attributes: Mapping of class name to its own attribute -> slot map
+        """
+        self._slots = slots or {}
+        self._attributes = attributes or {}
+        self._effective_slots = {}
+        self._effective_attributes = {}
+
+    def _topological_order(self) -> List[str]:
+        """Order classes so that every parent precedes its children."""
+        order = []
+        state = {}  # name -> 1 while visiting, 2 once placed
+
+        for root in sorted(self.parents):
+            stack = [root]
+            while stack:
+                name = stack[-1]
+                if state.get(name) == 2:
+                    stack.pop()
+                    continue
+                parent = self.parents.get(name)
+                if parent in self.parents and state.get(parent) != 2:
+                    if state.get(parent) == 1:
+                        # Parent is still being visited, so the chain loops back
+                        self.cycles.append(name)
+                    else:
+                        state[name] = 1
+                        stack.append(parent)
+                        continue
+                state[name] = 2
+                order.append(name)
+                stack.pop()
+        return order
+
+    def parent(self, name: str) -> Optional[str]:
+        """Return the parent of a class if it is a known class."""
+        parent = self.parents.get(name)
+        return parent if parent in self.parents else None
+
+    def ancestors(self, name: str) -> List[str]:
+        """
+        Return the ancestors of a class, nearest first.
+
+        Args:
+            name: Class name
+
+        Returns:
+            List of ancestor class names
+        """
+        if name in self._ancestors:
+            return self._ancestors[name]
+
+        # Walk up until a memoised ancestor (or the root) is reached
+        chain = []
+        seen = {name}
+        current = self.parent(name)
+        while current is not None and current not in self._ancestors and current not in seen:
+            chain.append(current)
+            seen.add(current)
+            current = self.parent(current)
+
+        ancestors = list(chain)
+        if current is not None and current in self._ancestors and current not in seen:
+            ancestors.append(current)
+            ancestors.extend(a for a in self._ancestors[current] if a not in seen)
+
+        self._ancestors[name] = ancestors
+        return ancestors
+
+    def effective_slots(self, name: str) -> List[str]:
+        """
+        Return the slots of a class including inherited ones, ancestors' first.
+
+        Args:
+            name: Class name
+
+        Returns:
+            List of slot names without duplicates
+        """
+        if name not in self._effective_slots:
+            self._effective_slots[name] = []  # guards against cycles
+            parent = self.parent(name)
+            slots = list(self.effective_slots(parent)) if parent else []
+            seen = set(slots)
+            for slot_name in self._slots.get(name, []):
+                if slot_name not in seen:
+                    slots.append(slot_name)
+                    seen.add(slot_name)
+            self._effective_slots[name] = slots
+        return self._effective_slots[name]
+
+    def effective_attributes(self, name: str) -> Dict[str, str]:
+        """
+        Return the attribute -> slot map of a class including inherited entries.
+
+        Args:
+            name: Class name
+
+        Returns:
+            Attribute map where a class's own entries override inherited ones
+        """
+        if name not in self._effective_attributes:
+            self._effective_attributes[name] = {}  # guards against cycles
+            parent = self.parent(name)
+            attributes = dict(self.effective_attributes(parent)) if parent else {}
+            attributes.update(self._attributes.get(name, {}))
+            self._effective_attributes[name] = attributes
+        return self._effective_attributes[name]
+
+    def ancestor_map(self) -> Dict[str, List[str]]:
+        """Return the ancestors of every class, in topological order."""
+        return {name: self.ancestors(name) for name in self.order}
@@ -0,0 +1,347 @@
+#!/usr/bin/env python
+"""
+LinkML instance to OME-XML writer.
+
+The inverse of xmltolinkml: writes LinkML instances of the generated schema
+(dictionaries with "@type" naming their class, as produced by xmltolinkml or
+by services emitting LinkML-shaped metadata) as an OME-XML document.
+
+Each record becomes one child of the root element. The `attributes` map of
+the record's class names the XML attribute every slot is written to; other
+keys are child elements, nested as xmltolinkml nests them (lists of objects,
+or scalars for elements that hold only text), and "value" is the text of the
+element.
+
+The document is written incrementally by a small streaming XML writer: each
+record is serialized as soon as it has been read and no element tree is
+ever built, so memory does not grow with the number of records written. A
+record is read whole, so memory grows with the size of the largest record
+(an Image with all its Planes, for instance).
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import re
+import io
+import datetime
+from xml.sax.saxutils import escape, quoteattr
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, TextIO, Union
+
+import yaml
+
+# Fix import for both module and direct script usage
+try:
+    from src.xmltolinkml import InstanceMapping, TYPE_KEY, TEXT_KEY, slot_name_for
+except ImportError:
+    from xmltolinkml import InstanceMapping, TYPE_KEY, TEXT_KEY, slot_name_for
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+OME_NAMESPACE = "http://www.openmicroscopy.org/Schemas/OME/2016-06"
+
+INPUT_FORMATS = ("jsonl", "yaml")
+
+# Characters quoteattr would escape; most attribute values (IDs, numbers, units) have none
+_NEEDS_QUOTING = re.compile(r'[&<>"\n\r\t]')
+
+# Prefix the generator gives the slots of XML attributes
+_SLOT_PREFIX = slot_name_for("")
+
+
+def _format_value(value: Any) -> str:
+    """Format a slot value as an XML attribute value."""
+    if value is True:
+        return "true"
+    if value is False:
+        return "false"
+    if isinstance(value, (datetime.date, datetime.time)):
+        # YAML loads unquoted timestamps as dates; xs:dateTime needs the ISO 8601 form
+        return value.isoformat()
+    return str(value)
+
+
+class _XmlStreamWriter:
+    """
+    Minimal streaming XML writer.
+
+    Each start tag is written with one write call, and quoteattr is only
+    called on values that need escaping, which about halves the time spent
+    writing elements with many attributes, such as Planes. Elements without
+    content are written as empty-element tags.
+    """
+
+    def __init__(self, stream: Union[TextIO, BinaryIO], encoding: str):
+        self.encoding = encoding
+        if isinstance(stream, io.TextIOBase):
+            self._wrapper = None
+            self._stream = stream
+        else:
+            # Characters the encoding lacks become character references
+            self._wrapper = io.TextIOWrapper(stream, encoding=encoding, errors="xmlcharrefreplace",
+                                             newline="\n", write_through=True)
+            self._stream = self._wrapper
+        self._pending_start = False
+
+    def start_document(self):
+        self._stream.write(f'<?xml version="1.0" encoding="{self.encoding}"?>\n')
+
+    def end_document(self):
+        self._stream.flush()
+        if self._wrapper is not None:
+            # Leave the caller's stream open
+            self._wrapper.detach()
+
+    def start_element(self, name: str, attrs: Dict[str, str]):
+        parts = [">" if self._pending_start else "", "<", name]
+        for attribute, value in attrs.items():
+            parts.append(f' {attribute}="{value}"' if _NEEDS_QUOTING.search(value) is None
+                         else f" {attribute}={quoteattr(value)}")
+        self._stream.write("".join(parts))
+        self._pending_start = True
+
+    def end_element(self, name: str):
+        if self._pending_start:
+            self._stream.write("/>")
+            self._pending_start = False
+        else:
+            self._stream.write(f"</{name}>")
+
+    def characters(self, text: str):
+        if text:
+            if self._pending_start:
+                self._stream.write(">")
+                self._pending_start = False
+            self._stream.write(escape(text))
+
+
+class OmeXmlWriter:
+    """
+    Incremental OME-XML writer for LinkML instances.
+
+    Attributes:
+        mapping: Mapping of the generated schema
+        records: Number of records written
+        elements: Number of elements written, the root included
+    """
+
+    def __init__(self, stream: Union[TextIO, BinaryIO], mapping: InstanceMapping, root_element: str = "OME",
+                 namespace: Optional[str] = OME_NAMESPACE, root_attributes: Optional[Dict[str, str]] = None,
+                 encoding: str = "UTF-8"):
+        """
+        Initialize the writer.
+
+        Args:
+            stream: Text or binary stream to write the document to
+            mapping: Mapping of the generated schema
+            root_element: Name of the root element
+            namespace: Default namespace of the document (None for no namespace)
+            root_attributes: XML attributes of the root element, e.g. {"Creator": "..."}
+            encoding: Encoding of the document
+        """
+        self.mapping = mapping
+        self.records = 0
+        self.elements = 0
+        self._xml = _XmlStreamWriter(stream, encoding)
+        self._root_element = root_element
+        self._root_attributes = {"xmlns": namespace} if namespace else {}
+        self._root_attributes.update(root_attributes or {})
+        self._skipped = set()
+
+    def __enter__(self) -> "OmeXmlWriter":
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.end()
+
+    def start(self):
+        """Write the XML declaration and the start tag of the root element."""
+        self._xml.start_document()
+        self._xml.start_element(self._root_element, self._root_attributes)
+        self._xml.characters("\n")
+        self.elements += 1
+
+    def end(self):
+        """Write the end tag of the root element."""
+        self._xml.end_element(self._root_element)
+        self._xml.characters("\n")
+        self._xml.end_document()
+
+    def write(self, record: Dict[str, Any]):
+        """
+        Write one record as a child of the root element.
+
+        Args:
+            record: LinkML instance, with "@type" naming its class
+
+        Raises:
+            ValueError: If the record does not name its class
+        """
+        element = record.get(TYPE_KEY)
+        if not element:
+            raise ValueError(f"Record {self.records + 1} has no {TYPE_KEY}")
+        self._write_object(element, record)
+        self._xml.characters("\n")
+        self.records += 1
+
+    def _write_object(self, element: str, obj: Dict[str, Any]):
+        class_name = obj.get(TYPE_KEY, element)
+        slot_attributes = self.mapping.slot_attributes(class_name)
+        attributes = {}
+        children = []
+        for key, value in obj.items():
+            if key == TYPE_KEY or key == TEXT_KEY or value is None:
+                continue
+            attribute = slot_attributes.get(key)
+            if attribute is not None:
+                attributes[attribute] = _format_value(value)
+            elif key.startswith(_SLOT_PREFIX) or key in self.mapping.slot_ranges:
+                # A slot no class maps to an XML attribute cannot be written back
+                if (class_name, key) not in self._skipped:
+                    self._skipped.add((class_name, key))
+                    logger.warning(f"Skipping {class_name}.{key}: no XML attribute is mapped to it")
+            else:
+                children.append((key, value))
+
+        xml = self._xml
+        xml.start_element(element, attributes)
+        self.elements += 1
+        text = obj.get(TEXT_KEY)
+        if text is not None:
+            xml.characters(_format_value(text))
+        for key, value in children:
+            for child in (value if isinstance(value, list) else [value]):
+                if isinstance(child, dict):
+                    self._write_object(key, child)
+                else:
+                    # Elements holding only text (Description, AcquisitionDate, ...)
+                    xml.start_element(key, {})
+                    xml.characters(_format_value(child))
+                    xml.end_element(key)
+                    self.elements += 1
+        xml.end_element(element)
+
+
+def iter_linkml_records(source: str, input_format: str = "jsonl") -> Iterator[Dict[str, Any]]:
+    """
+    Stream the LinkML instances of a file, one record at a time.
+
+    Args:
+        source: Path of the file
+        input_format: 'jsonl' for one JSON object per line, 'yaml' for one YAML document per record
+
+    Yields:
+        The records, in file order
+    """
+    if input_format not in INPUT_FORMATS:
+        raise ValueError(f"Unknown input format: {input_format}")
+    with open(source, 'r', encoding='utf-8') as f:
+        if input_format == "yaml":
+            for record in yaml.safe_load_all(f):
+                if record is not None:
+                    yield record
+        else:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def write_instance(records: Iterable[Dict[str, Any]], stream: Union[TextIO, BinaryIO], mapping: InstanceMapping,
+                   root_element: str = "OME", namespace: Optional[str] = OME_NAMESPACE,
+                   root_attributes: Optional[Dict[str, str]] = None) -> OmeXmlWriter:
+    """
+    Write LinkML instances as one OME-XML document.
+
+    Args:
+        records: The records, written as children of the root element in order
+        stream: Text or binary stream to write the document to
+        mapping: Mapping of the generated schema
+        root_element: Name of the root element
+        namespace: Default namespace of the document (None for no namespace)
+        root_attributes: XML attributes of the root element
+
+    Returns:
+        The writer, holding the numbers of records and elements written
+    """
+    with OmeXmlWriter(stream, mapping, root_element, namespace, root_attributes) as writer:
+        for record in records:
+            writer.write(record)
+    return writer
+
+
+def write_instance_file(record_files: List[str], output_file: str, mapping: InstanceMapping,
+                        input_format: str = "jsonl", root_attributes: Optional[Dict[str, str]] = None) -> int:
+    """
+    Write the LinkML instances of several files as one OME-XML document and log the throughput.
+
+    The document is written to "<output_file>.tmp" and renamed over output_file
+    once complete.
+
+    Args:
+        record_files: Paths of the record files, read in order
+        output_file: Path of the OME-XML document
+        mapping: Mapping of the generated schema
+        input_format: 'jsonl' or 'yaml'
+        root_attributes: XML attributes of the root element
+
+    Returns:
+        Number of records written
+    """
+    start = time.perf_counter()
+    records = (record for record_file in record_files for record in iter_linkml_records(record_file, input_format))
+    # Write to a temporary file first so a failed run never leaves a truncated document
+    tmp_path = f"{output_file}.tmp"
+    try:
+        with open(tmp_path, 'wb') as stream:
+            writer = write_instance(records, stream, mapping, root_attributes=root_attributes)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    os.replace(tmp_path, output_file)
+
+    seconds = max(time.perf_counter() - start, 1e-9)
+    size = os.path.getsize(output_file)
+    logger.info(f"Wrote {writer.records} records ({writer.elements} elements, {size / 1e6:.1f} MB) to "
+                f"{output_file} in {seconds:.2f}s: {writer.records / seconds:.0f} records/s, "
+                f"{writer.elements / seconds:.0f} elements/s, {size / 1e6 / seconds:.1f} MB/s")
+    return writer.records
+
+
+def main():
+    """Main function to run the writer from command line"""
+    parser = argparse.ArgumentParser(description="Write LinkML instances as an OME-XML document")
+    parser.add_argument("schema", help="Generated single-file LinkML schema (or its bundle)")
+    parser.add_argument("records", nargs="+", help="Files of LinkML instances, e.g. written by xmltolinkml")
+    parser.add_argument("--output", "-o", required=True, help="OME-XML document to write")
+    parser.add_argument("--format", "-f", choices=INPUT_FORMATS, default="jsonl",
+                        help="jsonl: one JSON object per line; yaml: one YAML document per record (default: jsonl)")
+    parser.add_argument("--creator", help="Creator attribute of the OME element")
+    parser.add_argument("--verbose", "-v", action="store_true", help="Enable verbose output")
+    args = parser.parse_args()
+
+    if args.verbose:
+        logger.setLevel(logging.DEBUG)
+
+    try:
+        mapping = InstanceMapping.load(args.schema)
+    except (OSError, ValueError, yaml.YAMLError) as e:
+        logger.error(f"✗ Cannot load {args.schema}: {str(e)}")
+        return 1
+    root_attributes = {"Creator": args.creator} if args.creator else None
+    try:
+        write_instance_file(args.records, args.output, mapping, args.format, root_attributes)
+    except (OSError, ValueError, yaml.YAMLError) as e:
+        logger.error(f"✗ Cannot write {args.output}: {str(e)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
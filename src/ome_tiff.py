@@ -0,0 +1,274 @@
+#!/usr/bin/env python
+"""
+OME-XML extraction from OME-TIFF files.
+
+An OME-TIFF stores its OME-XML in the ImageDescription tag of the first
+image file directory (IFD). This module reads that tag with a small
+pure-Python TIFF/BigTIFF parser over a read-only memory map: only the
+header, the first IFD and the description itself are read, so the pages
+holding pixel data are never touched however large the file is.
+
+The extracted document can be written out (one .xml file per TIFF, in a
+pool of worker processes for directories), and is what validate_instance
+and xmltolinkml read when they are given a TIFF file.
+"""
+
+import io
+import os
+import sys
+import mmap
+import time
+import struct
+import logging
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+TIFF_EXTENSIONS = ('.tif', '.tiff', '.btf', '.tf2', '.tf8')
+
+IMAGE_DESCRIPTION_TAG = 270
+
+# Field types the description may be stored as: BYTE, ASCII and UNDEFINED, all one byte per value
+_BYTE_TYPES = (1, 2, 7)
+
+
+class TiffFormatError(ValueError):
+    """Raised when a file is not a TIFF or BigTIFF file or its first IFD is damaged."""
+
+
+def is_tiff_file(file_path: str) -> bool:
+    """Return whether a path names a TIFF file, judging by its extension."""
+    return file_path.lower().endswith(TIFF_EXTENSIONS)
+
+
+def _read_first_description(data, file_path: str) -> Optional[bytes]:
+    """Return the ImageDescription of the first IFD of a TIFF held in a buffer."""
+    size = len(data)
+    if size < 8:
+        raise TiffFormatError(f"{file_path} is too short to be a TIFF file")
+    byte_order = {b'II': '<', b'MM': '>'}.get(bytes(data[:2]))
+    if byte_order is None:
+        raise TiffFormatError(f"{file_path} is not a TIFF file")
+
+    version = struct.unpack_from(byte_order + 'H', data, 2)[0]
+    if version == 42:
+        ifd_offset = struct.unpack_from(byte_order + 'I', data, 4)[0]
+        count_format, entry_format, value_size = 'H', 'HHII', 4
+    elif version == 43:
+        if size < 16 or struct.unpack_from(byte_order + 'HH', data, 4) != (8, 0):
+            raise TiffFormatError(f"{file_path} has an invalid BigTIFF header")
+        ifd_offset = struct.unpack_from(byte_order + 'Q', data, 8)[0]
+        count_format, entry_format, value_size = 'Q', 'HHQQ', 8
+    else:
+        raise TiffFormatError(f"{file_path} is not a TIFF file (version {version})")
+
+    count_size = struct.calcsize(count_format)
+    entry_size = struct.calcsize(byte_order + entry_format)
+    if ifd_offset == 0:
+        return None
+    if ifd_offset + count_size > size:
+        raise TiffFormatError(f"{file_path}: first IFD at {ifd_offset} is beyond the end of the file")
+    entry_count = struct.unpack_from(byte_order + count_format, data, ifd_offset)[0]
+    entries_start = ifd_offset + count_size
+    if entries_start + entry_count * entry_size > size:
+        raise TiffFormatError(f"{file_path}: first IFD with {entry_count} entries is truncated")
+
+    entry = struct.Struct(byte_order + entry_format)
+    for position in range(entries_start, entries_start + entry_count * entry_size, entry_size):
+        tag, field_type, count, value = entry.unpack_from(data, position)
+        if tag != IMAGE_DESCRIPTION_TAG:
+            continue
+        if field_type not in _BYTE_TYPES:
+            raise TiffFormatError(f"{file_path}: ImageDescription has field type {field_type}")
+        if count <= value_size:
+            # Short values are stored in the entry itself
+            start = position + entry.size - value_size
+        else:
+            start = value
+            if start + count > size:
+                raise TiffFormatError(f"{file_path}: ImageDescription at {start} is beyond the end of the file")
+        return bytes(data[start:start + count]).rstrip(b'\0')
+    return None
+
+
+def read_image_description(file_path: str) -> Optional[bytes]:
+    """
+    Read the ImageDescription of the first IFD of a TIFF or BigTIFF file.
+
+    The file is memory-mapped and only the pages holding the header, the
+    first IFD and the description are read.
+
+    Args:
+        file_path: Path of the TIFF file
+
+    Returns:
+        The description (the OME-XML document of an OME-TIFF), or None if the first IFD has none
+
+    Raises:
+        TiffFormatError: If the file is not a TIFF file or its first IFD is damaged
+        OSError: If the file cannot be read
+    """
+    with open(file_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            raise TiffFormatError(f"{file_path} is empty")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            return _read_first_description(data, file_path)
+
+
+def instance_source(instance_file: str):
+    """
+    Return what an XML parser should read for an instance file.
+
+    Args:
+        instance_file: Path of an OME-XML document or an OME-TIFF file
+
+    Returns:
+        The path of an XML document, or a binary stream holding the OME-XML of a TIFF file
+
+    Raises:
+        TiffFormatError: If a TIFF file is damaged or has no ImageDescription
+        OSError: If a TIFF file cannot be read
+    """
+    if not is_tiff_file(instance_file):
+        return instance_file
+    description = read_image_description(instance_file)
+    if description is None:
+        raise TiffFormatError(f"{instance_file} has no ImageDescription")
+    return io.BytesIO(description)
+
+
+def xml_output_path(tiff_file: str, output_dir: str, base_dir: Optional[str] = None) -> str:
+    """
+    Return where the OME-XML of a TIFF file is written.
+
+    Args:
+        tiff_file: Path of the TIFF file
+        output_dir: Directory the documents are written to
+        base_dir: Directory whose layout is kept below output_dir (None to use the file name only)
+
+    Returns:
+        The path, with the TIFF extension replaced by .xml (image.ome.tif -> image.ome.xml)
+    """
+    relative_path = os.path.relpath(tiff_file, base_dir) if base_dir else os.path.basename(tiff_file)
+    stem = os.path.splitext(relative_path)[0]
+    return os.path.join(output_dir, stem + '.xml')
+
+
+def find_tiff_files(paths: List[str]) -> List[Tuple[str, Optional[str]]]:
+    """
+    Expand files and directories into TIFF files.
+
+    Args:
+        paths: Files, kept as given, and directories, searched recursively
+            for files ending in one of TIFF_EXTENSIONS
+
+    Returns:
+        (TIFF file, directory it was found in or None for files given directly) pairs, sorted per directory
+    """
+    tiff_files = []
+    for path in paths:
+        if os.path.isdir(path):
+            found = []
+            for dir_path, dir_names, file_names in os.walk(path):
+                dir_names.sort()
+                found.extend(os.path.join(dir_path, file_name) for file_name in sorted(file_names)
+                             if is_tiff_file(file_name))
+            tiff_files.extend((tiff_file, path) for tiff_file in found)
+        else:
+            tiff_files.append((path, None))
+    return tiff_files
+
+
+def extract_ome_xml(tiff_file: str, output_file: str) -> Tuple[int, Optional[str]]:
+    """
+    Write the OME-XML of a TIFF file to an XML file.
+
+    Args:
+        tiff_file: Path of the TIFF file
+        output_file: Path of the XML file
+
+    Returns:
+        Tuple of (size of the document in bytes, error message or None)
+    """
+    try:
+        description = read_image_description(tiff_file)
+    except (TiffFormatError, OSError) as e:
+        return 0, str(e)
+    if description is None:
+        return 0, f"{tiff_file} has no ImageDescription"
+    os.makedirs(os.path.dirname(output_file) or '.', exist_ok=True)
+    with open(output_file, 'wb') as f:
+        f.write(description)
+    return len(description), None
+
+
+def _extract_task(task: Tuple[str, str]) -> Tuple[int, Optional[str]]:
+    return extract_ome_xml(*task)
+
+
+def extract_ome_xml_files(paths: List[str], output_dir: str, jobs: int = 1) -> Dict[str, Tuple[int, Optional[str]]]:
+    """
+    Write the OME-XML of every TIFF file found in paths and log the throughput.
+
+    Args:
+        paths: TIFF files and directories searched recursively for them
+        output_dir: Directory the documents are written to, keeping the layout of searched directories
+        jobs: Number of worker processes (0 or less uses one per CPU)
+
+    Returns:
+        Dictionary mapping each TIFF file to (size of its document in bytes, error message or None)
+    """
+    if jobs is None or jobs <= 0:
+        jobs = os.cpu_count() or 1
+    tasks = [(tiff_file, xml_output_path(tiff_file, output_dir, base_dir))
+             for tiff_file, base_dir in find_tiff_files(paths)]
+
+    start = time.perf_counter()
+    if jobs == 1 or len(tasks) < 2:
+        outcomes = [_extract_task(task) for task in tasks]
+    else:
+        # Files are cheap to read; hand them to workers in chunks to keep the overhead per file low
+        chunksize = max(1, min(64, len(tasks) // (jobs * 4)))
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            outcomes = list(executor.map(_extract_task, tasks, chunksize=chunksize))
+    seconds = max(time.perf_counter() - start, 1e-9)
+
+    results = {}
+    for (tiff_file, output_file), (xml_size, error) in zip(tasks, outcomes):
+        results[tiff_file] = (xml_size, error)
+        if error:
+            logger.error(f"✗ {error}")
+        else:
+            logger.debug(f"Wrote {output_file} ({xml_size} bytes)")
+
+    extracted = sum(1 for _, error in results.values() if error is None)
+    xml_bytes = sum(xml_size for xml_size, _ in results.values())
+    logger.info(f"Extracted OME-XML from {extracted} of {len(results)} TIFF files ({xml_bytes / 1e6:.1f} MB) "
+                f"in {seconds:.2f}s: {len(results) / seconds:.0f} files/s")
+    return results
+
+
+def main():
+    """Main function to run the extractor from command line"""
+    parser = argparse.ArgumentParser(description="Extract the OME-XML of OME-TIFF files")
+    parser.add_argument("tiff_files", nargs="+",
+                        help="OME-TIFF files, or directories searched recursively for .tif/.tiff/.btf files")
+    parser.add_argument("--output-dir", "-o", required=True,
+                        help="Directory to write the OME-XML documents to (image.ome.tif -> image.ome.xml)")
+    parser.add_argument("--jobs", "-j", type=int, default=1,
+                        help="Number of worker processes (default: 1; 0 = one per CPU)")
+    parser.add_argument("--verbose", "-v", action="store_true", help="Enable verbose output")
+    args = parser.parse_args()
+
+    if args.verbose:
+        logger.setLevel(logging.DEBUG)
+
+    results = extract_ome_xml_files(args.tiff_files, args.output_dir, args.jobs)
+    return 0 if results and all(error is None for _, error in results.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
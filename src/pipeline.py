@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+"""
+In-process generate -> validate pipeline.
+
+Running the generator and then `validate_schema` on its output directory
+means two interpreter start-ups, and validation cannot begin until the last
+partition has been written and is then read back from disk. The pipeline
+runs both in one process: every schema the generator writes is handed, as
+the in-memory dictionary, to a pool of validation workers straight away, so
+validation overlaps generation and nothing is parsed twice.
+"""
+
+import os
+import sys
+import time
+import logging
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+# Fix import for both module and direct script usage
+try:
+    from src.generator import generate_linkml_schema
+    from src import validate_schema
+    from src.xsd_catalog import load_catalog
+except ImportError:
+    from generator import generate_linkml_schema
+    import validate_schema
+    from xsd_catalog import load_catalog
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def generate_and_validate(ome_xsd_path: str, output_path: str, partition: bool = True, jobs: int = 0,
+                          verbose: bool = False, report_file: Optional[str] = None,
+                          top_level_elements: Optional[List[str]] = None,
+                          compact: bool = False, catalog=None) -> Dict[str, Tuple[bool, List[str]]]:
+    """
+    Generate LinkML schemas and validate each one as soon as it is written.
+
+    Args:
+        ome_xsd_path: Path to the OME XSD file
+        output_path: Output directory (partitioned) or file (single schema)
+        partition: Whether to partition the schema into separate files
+        jobs: Number of validation worker processes (0 or less uses one per CPU)
+        verbose: Whether to output detailed information
+        report_file: Path of the Markdown validation report (None for no report)
+        top_level_elements: List of top-level elements to include (if None, include all)
+        compact: Whether to write repeated structures once using YAML anchors/aliases
+        catalog: SchemaCatalog resolving the locations of included/imported schemas
+
+    Returns:
+        Dictionary mapping schema files to (is_valid, error_messages) tuples, in sorted order
+    """
+    if verbose:
+        logger.setLevel(logging.DEBUG)
+    if jobs is None or jobs <= 0:
+        jobs = os.cpu_count() or 1
+
+    initializer = validate_schema.warm_validator_pool if validate_schema.linkml_imports_ok else None
+    futures = {}
+    start = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=jobs, initializer=initializer) as executor:
+        def on_write(file_path, schema):
+            # The dictionary is sent to a worker as is; the file is never read back
+            futures[file_path] = executor.submit(validate_schema.validate_schema_dict, schema, file_path)
+
+        try:
+            generate_linkml_schema(ome_xsd_path, output_path, top_level_elements, partition,
+                                   compact=compact, on_write=on_write, catalog=catalog)
+        except Exception:
+            for future in futures.values():
+                future.cancel()
+            raise
+        generated = time.perf_counter()
+
+        results = {}
+        for file_path in sorted(futures):
+            is_valid, errors = futures[file_path].result()
+            results[file_path] = (is_valid, errors)
+            if not is_valid:
+                logger.error(f"✗ {file_path} has {len(errors)} errors")
+                for error in errors:
+                    logger.debug(f"  - {error}")
+
+    finished = time.perf_counter()
+    valid_count = sum(1 for is_valid, _ in results.values() if is_valid)
+    logger.info(f"Generated {len(results)} schemas in {generated - start:.2f}s; "
+                f"validation finished {finished - generated:.2f}s later ({finished - start:.2f}s total)")
+    logger.info(f"{valid_count} of {len(results)} schemas are valid")
+
+    if report_file:
+        validate_schema.generate_validation_report(results, report_file)
+    return results
+
+
+def main():
+    """Main function to run the pipeline from command line"""
+    parser = argparse.ArgumentParser(description="Generate LinkML schemas from an OME XSD and validate them")
+    parser.add_argument("xsd_path", help="Path to the OME XSD file")
+    parser.add_argument("--output", "-o", default="ome_schemas",
+                        help="Output directory (or file with --single) (default: ome_schemas)")
+    parser.add_argument("--single", action="store_true", help="Generate a single schema file instead of partitions")
+    parser.add_argument("--elements", "-e", help="Comma-separated list of top-level elements to include")
+    parser.add_argument("--compact", action="store_true",
+                        help="Write repeated structures once using YAML anchors and aliases")
+    parser.add_argument("--jobs", "-j", type=int, default=0,
+                        help="Number of validation worker processes (default: 0 = one per CPU)")
+    parser.add_argument("--report", "-r", help="Path to save the validation report")
+    parser.add_argument("--catalog", help="Catalog file or schema mirror directory to resolve schema locations with")
+    parser.add_argument("--offline", action="store_true", help="Refuse network access when resolving schema locations")
+    parser.add_argument("--verbose", "-v", action="store_true", help="Enable verbose output")
+    args = parser.parse_args()
+
+    top_level_elements = args.elements.split(",") if args.elements else None
+    results = generate_and_validate(args.xsd_path, args.output, not args.single, args.jobs, args.verbose,
+                                    args.report, top_level_elements, args.compact,
+                                    load_catalog(args.catalog, args.offline))
+    return 0 if results and all(is_valid for is_valid, _ in results.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
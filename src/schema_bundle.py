@@ -0,0 +1,211 @@
+"""
+Compiled LinkML schema bundles.
+
+A bundle is a single binary file written next to the generated YAML that
+holds the final LinkML dictionary together with the indexes downstream tools
+otherwise rebuild on every start (class -> slots and class -> ancestors).
+Each bundle records the SHA-256 of the YAML files it was compiled from, so a
+bundle that no longer matches its YAML is rejected instead of being used.
+"""
+
+import os
+import sys
+import hashlib
+import logging
+import marshal
+import yaml
+from typing import Dict, List, Optional
+
+# Fix import for both module and direct script usage
+try:
+    from src.inheritance_index import InheritanceIndex
+except ImportError:
+    from inheritance_index import InheritanceIndex
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+BUNDLE_MAGIC = b"OMELKML\x00"
+BUNDLE_FORMAT_VERSION = 1
+BUNDLE_EXTENSION = ".bundle"
+
+# marshal output is only stable within a Python minor version
+_PYTHON_TAG = "%d.%d" % sys.version_info[:2]
+
+
+def _file_sha256(path: str) -> str:
+    """Return the hex SHA-256 digest of a file."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def build_class_slot_index(linkml_schema: Dict) -> Dict[str, List[str]]:
+    """
+    Build the class -> slots index of a LinkML schema.
+
+    Args:
+        linkml_schema: LinkML schema dictionary
+
+    Returns:
+        Dictionary mapping class names to their slot names
+    """
+    return {
+        class_name: list(class_def.get("slots", []))
+        for class_name, class_def in linkml_schema.get("classes", {}).items()
+        if isinstance(class_def, dict)
+    }
+
+
+def build_ancestor_index(linkml_schema: Dict) -> Dict[str, List[str]]:
+    """
+    Build the class -> ancestors index of a LinkML schema.
+
+    Args:
+        linkml_schema: LinkML schema dictionary
+
+    Returns:
+        Dictionary mapping class names to their ancestors, nearest first
+    """
+    return InheritanceIndex.from_linkml(linkml_schema).ancestor_map()
+
+
+def get_bundle_path(output_path: str, linkml_schema: Dict, partition: bool = False) -> str:
+    """
+    Get the bundle location for a generated schema.
+
+    Args:
+        output_path: YAML file, or directory for partitioned output
+        linkml_schema: LinkML schema dictionary
+        partition: Whether the output was partitioned
+
+    Returns:
+        Path of the bundle file
+    """
+    if partition:
+        return os.path.join(output_path, f"{linkml_schema.get('name', 'schema')}{BUNDLE_EXTENSION}")
+    return f"{os.path.splitext(output_path)[0]}{BUNDLE_EXTENSION}"
+
+
+def write_schema_bundle(linkml_schema: Dict, yaml_paths: List[str], bundle_path: str) -> str:
+    """
+    Write a compiled bundle for a generated LinkML schema.
+
+    Args:
+        linkml_schema: The final LinkML schema dictionary
+        yaml_paths: YAML files the schema was written to
+        bundle_path: Path of the bundle file to write
+
+    Returns:
+        The bundle path
+    """
+    bundle_dir = os.path.dirname(os.path.abspath(bundle_path))
+    sources = {
+        os.path.relpath(os.path.abspath(path), bundle_dir): _file_sha256(path)
+        for path in yaml_paths
+    }
+
+    payload = {
+        "format_version": BUNDLE_FORMAT_VERSION,
+        "python": _PYTHON_TAG,
+        "sources": sources,
+        "schema": linkml_schema,
+        "class_slots": build_class_slot_index(linkml_schema),
+        "ancestors": build_ancestor_index(linkml_schema),
+    }
+
+    # Write to a temporary file first so readers never see a partial bundle
+    tmp_path = f"{bundle_path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(BUNDLE_MAGIC)
+        f.write(marshal.dumps(payload))
+    os.replace(tmp_path, bundle_path)
+
+    logger.info(f"Wrote compiled schema bundle to {bundle_path}")
+    return bundle_path
+
+
+def load_schema_bundle(bundle_path: str, verify: bool = True) -> Dict:
+    """
+    Load a compiled schema bundle.
+
+    Args:
+        bundle_path: Path of the bundle file
+        verify: Whether to check the recorded hashes against the YAML files
+
+    Returns:
+        Dictionary with 'schema', 'class_slots' and 'ancestors' entries
+
+    Raises:
+        ValueError: If the bundle is not readable by this Python/bundle
+            version, or is stale with respect to its YAML sources
+    """
+    with open(bundle_path, 'rb') as f:
+        data = f.read()
+
+    if not data.startswith(BUNDLE_MAGIC):
+        raise ValueError(f"Not a schema bundle: {bundle_path}")
+
+    try:
+        payload = marshal.loads(data[len(BUNDLE_MAGIC):])
+    except (ValueError, EOFError, TypeError) as e:
+        raise ValueError(f"Corrupt schema bundle {bundle_path}: {str(e)}")
+
+    if payload.get("format_version") != BUNDLE_FORMAT_VERSION or payload.get("python") != _PYTHON_TAG:
+        raise ValueError(
+            f"Schema bundle {bundle_path} was written by an incompatible version "
+            f"(format {payload.get('format_version')}, Python {payload.get('python')})"
+        )
+
+    if verify:
+        stale = find_stale_sources(bundle_path, payload["sources"])
+        if stale:
+            raise ValueError(f"Schema bundle {bundle_path} is stale: {', '.join(stale)}")
+
+    return payload
+
+
+def find_stale_sources(bundle_path: str, sources: Dict[str, str]) -> List[str]:
+    """
+    Compare a bundle's recorded source hashes with the files on disk.
+
+    Args:
+        bundle_path: Path of the bundle file
+        sources: Mapping of bundle-relative YAML paths to SHA-256 digests
+
+    Returns:
+        List of source paths that are missing or have changed
+    """
+    bundle_dir = os.path.dirname(os.path.abspath(bundle_path))
+    stale = []
+    for rel_path, digest in sources.items():
+        path = os.path.join(bundle_dir, rel_path)
+        if not os.path.exists(path) or _file_sha256(path) != digest:
+            stale.append(rel_path)
+    return stale
+
+
+def load_schema(yaml_path: str, bundle_path: Optional[str] = None) -> Dict:
+    """
+    Load a generated LinkML schema, preferring a fresh compiled bundle.
+
+    Falls back to parsing the YAML when no bundle exists or it is stale.
+
+    Args:
+        yaml_path: Path of the single-file YAML schema
+        bundle_path: Path of the bundle (defaults to the YAML path with a .bundle suffix)
+
+    Returns:
+        The LinkML schema dictionary
+    """
+    bundle_path = bundle_path or f"{os.path.splitext(yaml_path)[0]}{BUNDLE_EXTENSION}"
+    if os.path.exists(bundle_path):
+        try:
+            return load_schema_bundle(bundle_path)["schema"]
+        except ValueError as e:
+            logger.warning(f"Ignoring schema bundle: {str(e)}")
+
+    with open(yaml_path, 'r') as f:
+        return yaml.safe_load(f)
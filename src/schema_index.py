@@ -0,0 +1,209 @@
+"""
+Global index of the definitions in a directory of LinkML schema files.
+
+Partitioned schemas copy the same common classes, slots, types and enums into
+every file. The index parses each file once and records every definition under
+a structural hash (a digest of its canonical JSON form), so identical copies
+collapse to one distinct definition that only has to be checked once, and a
+name that has different definitions in different files shows up as a
+conflict. It also resolves each file's local `imports` against the other
+files in the directory.
+"""
+
+import os
+import json
+import hashlib
+import logging
+import yaml
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Schema sections that hold named definitions
+INDEXED_SECTIONS = ('classes', 'slots', 'types', 'enums')
+
+# Singular names used in messages
+_SECTION_LABELS = {'classes': 'Class', 'slots': 'Slot', 'types': 'Type', 'enums': 'Enum'}
+
+
+def structural_hash(definition: Any) -> str:
+    """
+    Return a digest of a definition that is equal for structurally equal definitions.
+
+    Args:
+        definition: A YAML-loaded definition
+
+    Returns:
+        Hex SHA-256 digest of the definition's canonical JSON form
+    """
+    canonical = json.dumps(definition, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+class SchemaCollectionIndex:
+    """
+    Index of classes, slots, types and enums across a set of schema files.
+
+    Attributes:
+        documents: Mapping of file path to parsed schema (only files that parsed to a mapping)
+        hashes: Mapping of file path -> section -> name -> structural hash
+        definitions: Mapping of section -> name -> structural hash -> files defining it that way
+        distinct: Mapping of (section, structural hash) to one instance of the definition
+        imports: Mapping of file path to the files its local imports resolve to
+        dangling_imports: Mapping of file path to the imports that resolve to no file
+    """
+
+    def __init__(self, documents: Dict[str, Dict[str, Any]]):
+        self.documents = documents
+        self.hashes = {}
+        self.definitions = {section: {} for section in INDEXED_SECTIONS}
+        self.distinct = {}
+        self.imports = {}
+        self.dangling_imports = {}
+        self._scopes = {}
+
+        for file_path, schema in documents.items():
+            file_hashes = {}
+            for section in INDEXED_SECTIONS:
+                entries = schema.get(section)
+                if not isinstance(entries, dict):
+                    continue
+                section_hashes = {}
+                for name, definition in entries.items():
+                    digest = structural_hash(definition)
+                    section_hashes[name] = digest
+                    self.distinct.setdefault((section, digest), definition)
+                    self.definitions[section].setdefault(name, {}).setdefault(digest, []).append(file_path)
+                file_hashes[section] = section_hashes
+            self.hashes[file_path] = file_hashes
+
+        self._resolve_imports()
+
+    @classmethod
+    def from_files(cls, file_paths: List[str]) -> Tuple["SchemaCollectionIndex", Dict[str, str]]:
+        """
+        Parse the given files once and index them.
+
+        Args:
+            file_paths: Paths of the schema files
+
+        Returns:
+            Tuple of (index, parse_errors) where parse_errors maps the files
+            that could not be indexed to an error message
+        """
+        documents = {}
+        parse_errors = {}
+        for file_path in file_paths:
+            try:
+                with open(file_path, 'r') as f:
+                    schema = yaml.safe_load(f)
+            except (OSError, yaml.YAMLError) as e:
+                parse_errors[file_path] = f"YAML syntax error in {file_path}: {str(e)}"
+                continue
+            if schema is None:
+                parse_errors[file_path] = f"Invalid or empty YAML: {file_path}"
+            elif not isinstance(schema, dict):
+                parse_errors[file_path] = f"Schema in {file_path} is not a mapping"
+            else:
+                documents[file_path] = schema
+        return cls(documents), parse_errors
+
+    def _resolve_imports(self):
+        """Resolve local imports (names without a prefix) to files in the same directory."""
+        by_location = {}
+        for file_path in self.documents:
+            stem = os.path.splitext(os.path.abspath(file_path))[0]
+            by_location[stem] = file_path
+
+        for file_path, schema in self.documents.items():
+            resolved = []
+            dangling = []
+            imports = schema.get('imports') or []
+            if not isinstance(imports, list):
+                imports = [imports]
+            for imported in imports:
+                imported = str(imported)
+                # Prefixed imports such as linkml:types refer to external schemas
+                if ':' in imported:
+                    continue
+                location = os.path.join(os.path.dirname(os.path.abspath(file_path)), imported)
+                target = by_location.get(os.path.splitext(location)[0])
+                if target is None:
+                    dangling.append(imported)
+                elif target != file_path:
+                    resolved.append(target)
+            self.imports[file_path] = resolved
+            if dangling:
+                self.dangling_imports[file_path] = dangling
+
+    def scope(self, file_path: str) -> Dict[str, Set[str]]:
+        """
+        Return the names visible in a file: its own and those of its (transitive) imports.
+
+        Args:
+            file_path: Path of an indexed file
+
+        Returns:
+            Mapping of section to the set of visible names
+        """
+        if file_path not in self._scopes:
+            scope = {section: set() for section in INDEXED_SECTIONS}
+            seen = set()
+            stack = [file_path]
+            while stack:
+                current = stack.pop()
+                if current in seen:
+                    continue
+                seen.add(current)
+                for section in INDEXED_SECTIONS:
+                    entries = self.documents[current].get(section)
+                    if entries:
+                        scope[section].update(entries)
+                stack.extend(self.imports.get(current, []))
+            self._scopes[file_path] = scope
+        return self._scopes[file_path]
+
+    def conflicts(self) -> Dict[str, List[str]]:
+        """
+        Report names that are defined differently in different files.
+
+        Each conflicting name is reported once, listing its variants by the
+        first file defining each of them. The message goes to the first file
+        that does not use the most common variant.
+
+        Returns:
+            Mapping of file path to conflict messages for that file
+        """
+        messages = {}
+        for section in INDEXED_SECTIONS:
+            label = _SECTION_LABELS[section]
+            for name, variants in self.definitions[section].items():
+                if len(variants) < 2:
+                    continue
+                # Most common variant first; ties keep the order the files were indexed in
+                ordered = sorted(variants.values(), key=len, reverse=True)
+                listed = "; ".join(
+                    f"in {files[0]}" + (f" and {len(files) - 1} other files" if len(files) > 1 else "")
+                    for files in ordered
+                )
+                messages.setdefault(ordered[1][0], []).append(
+                    f"{label} {name} has {len(variants)} different definitions: {listed}"
+                )
+        return messages
+
+    def definition_hash(self, file_path: str, section: str, name: str) -> Optional[str]:
+        """Return the structural hash of a definition in a file."""
+        return self.hashes.get(file_path, {}).get(section, {}).get(name)
+
+    def statistics(self) -> Dict[str, int]:
+        """Return the number of files, definitions, distinct definitions and conflicting names."""
+        total = sum(len(names) for file_hashes in self.hashes.values() for names in file_hashes.values())
+        conflicting = sum(1 for section in INDEXED_SECTIONS
+                          for variants in self.definitions[section].values() if len(variants) > 1)
+        return {
+            'files': len(self.documents),
+            'definitions': total,
+            'distinct': len(self.distinct),
+            'conflicts': conflicting,
+        }
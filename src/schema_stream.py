@@ -0,0 +1,297 @@
+"""
+Event-streaming loader for the structural validation of large schema files.
+
+yaml.safe_load builds the whole document, including every description, before
+a single reference can be checked. The structural checks only look at a small
+part of it: the top-level keys, the names defined in each section, and the
+is_a, slots and range of classes and slots. load_schema_skeleton walks the
+PyYAML parse events and builds just that part (the "skeleton"), skipping
+everything else as it streams past, so memory grows with the number of names
+rather than with the size of the file.
+
+The skeleton has the same shape as the corresponding parts of the full
+document, so the existing checks run on it unchanged and report the same
+errors. Anchors and aliases are supported: the events of every anchored node
+are recorded and replayed where an alias refers to it, because the alias may
+sit at a place where more of the node is needed than where it was defined.
+Documents using YAML features the skeleton cannot reproduce exactly (merge
+keys, collection keys, recursive aliases, custom collection tags) raise
+UnsupportedYAMLFeature so that the caller can fall back to yaml.safe_load.
+"""
+
+import logging
+import yaml
+from typing import Any, Dict, TextIO, Union
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Sections whose definitions are checked and those of which only the names are needed
+DEFINITION_SECTIONS = ('classes', 'slots')
+NAME_SECTIONS = ('types', 'enums')
+
+# Fields of a class or slot definition used by the checks, and whether each holds a list
+DEFINITION_FIELDS = {'is_a': False, 'range': False, 'slots': True}
+
+_MAP_TAG = 'tag:yaml.org,2002:map'
+_SEQ_TAG = 'tag:yaml.org,2002:seq'
+_MERGE_TAG = 'tag:yaml.org,2002:merge'
+
+# What is kept of a node, depending on where it appears
+_ROOT = 'root'              # the document: every key, sections in full
+_SECTION = 'section'        # classes/slots: every name with its definition
+_NAMES = 'names'            # types/enums: every name
+_DEFINITION = 'definition'  # a class or slot: is_a, slots and range only
+_LIST = 'list'              # the slots of a class: every item
+_VALUE = 'value'            # a referenced name: scalars in full, stand-ins for collections
+_SKIP = 'skip'              # not needed at all
+
+
+class UnsupportedYAMLFeature(Exception):
+    """Raised when a document uses a YAML feature the skeleton cannot reproduce."""
+
+
+class _EventReader:
+    """
+    Parse events with aliases resolved on request.
+
+    Every event read from the parser is appended to the recordings of the
+    anchored nodes that are open at that point, and each recording is stored
+    under its anchor once the node ends. An alias inside a recording is
+    stored as a reference to the recording it points to, which is never
+    copied. Replayed events are not recorded again and do not register
+    anchors, just as PyYAML's composer reuses the anchored node.
+    """
+
+    def __init__(self, stream: Union[str, TextIO]):
+        self.loader = yaml.SafeLoader(stream)
+        self.anchor_marks = {}
+        self.deferred_error = None
+        self._anchors = {}
+        self._open = []
+        self._replay = []
+        self._peeked = None
+
+    def dispose(self):
+        self.loader.dispose()
+
+    def peek(self):
+        """Return the next event without consuming it."""
+        if self._peeked is None:
+            self._peeked = self._read()
+        return self._peeked
+
+    def next(self):
+        """Consume and return the next event."""
+        event = self.peek()
+        self._peeked = None
+        return event
+
+    def expand(self, event: yaml.AliasEvent):
+        """Replay the events of the node an alias refers to; call right after reading the alias."""
+        self._replay.append(iter(self._anchors[event.anchor]))
+
+    def _read(self):
+        while self._replay:
+            try:
+                item = next(self._replay[-1])
+            except StopIteration:
+                self._replay.pop()
+                continue
+            if isinstance(item, list):
+                self._replay.append(iter(item))
+                continue
+            return item
+
+        event = self.loader.get_event()
+        if isinstance(event, yaml.AliasEvent):
+            if event.anchor not in self._anchors:
+                if any(recording[0] == event.anchor for recording in self._open):
+                    raise UnsupportedYAMLFeature(f"recursive alias {event.anchor!r}")
+                raise yaml.composer.ComposerError(None, None, f"found undefined alias {event.anchor!r}",
+                                                  event.start_mark)
+            for recording in self._open:
+                recording[2].append(self._anchors[event.anchor])
+            return event
+
+        for recording in self._open:
+            recording[2].append(event)
+            if isinstance(event, yaml.CollectionStartEvent):
+                recording[1] += 1
+            elif isinstance(event, yaml.CollectionEndEvent):
+                recording[1] -= 1
+
+        anchor = getattr(event, 'anchor', None)
+        if anchor is not None and isinstance(event, (yaml.ScalarEvent, yaml.CollectionStartEvent)):
+            if anchor in self.anchor_marks:
+                raise yaml.composer.ComposerError(f"found duplicate anchor {anchor!r}; first occurrence",
+                                                  self.anchor_marks[anchor], "second occurrence",
+                                                  event.start_mark)
+            self.anchor_marks[anchor] = event.start_mark
+            depth = 1 if isinstance(event, yaml.CollectionStartEvent) else 0
+            self._open.append([anchor, depth, [event]])
+
+        # Store the recordings of the nodes that have just ended
+        while self._open and self._open[-1][1] == 0:
+            anchor, _, events = self._open.pop()
+            self._anchors[anchor] = events
+        return event
+
+    def construct_scalar(self, event: yaml.ScalarEvent) -> Any:
+        """
+        Construct the value of a scalar as yaml.safe_load would.
+
+        Constructor errors are deferred: safe_load only constructs once the
+        whole document has been parsed, so a syntax error further down the
+        file takes precedence.
+        """
+        node = yaml.ScalarNode(self.scalar_tag(event), event.value, event.start_mark, event.end_mark,
+                               event.style)
+        try:
+            return self.loader.construct_object(node, deep=True)
+        except Exception as e:
+            if self.deferred_error is None:
+                self.deferred_error = e
+            return None
+        finally:
+            self.loader.constructed_objects.clear()
+            self.loader.recursive_objects.clear()
+
+    def scalar_tag(self, event: yaml.ScalarEvent) -> str:
+        """Resolve the tag of a scalar as PyYAML's composer does."""
+        if event.tag is None or event.tag == '!':
+            return self.loader.resolve(yaml.ScalarNode, event.value, event.implicit)
+        return event.tag
+
+
+class _SkeletonBuilder:
+    """Builds the skeleton of one document from an _EventReader."""
+
+    def __init__(self, reader: _EventReader):
+        self.reader = reader
+
+    def node(self, level: str) -> Any:
+        """Read one node and return what is kept of it at the given level."""
+        event = self.reader.next()
+        if isinstance(event, yaml.AliasEvent):
+            if level == _SKIP:
+                return None
+            self.reader.expand(event)
+            event = self.reader.next()
+
+        if isinstance(event, yaml.ScalarEvent):
+            # Every scalar is constructed so that invalid values are reported as by safe_load
+            value = self.reader.construct_scalar(event)
+            return None if level in (_SKIP, _DEFINITION) else value
+
+        if event.tag not in (None, '!', _MAP_TAG, _SEQ_TAG):
+            raise UnsupportedYAMLFeature(f"collection tag {event.tag}")
+        if isinstance(event, yaml.MappingStartEvent):
+            if level in (_ROOT, _SECTION, _NAMES, _DEFINITION):
+                return self._mapping(level)
+            non_empty = self._skip(mapping=True)
+            stand_in = {None: None} if non_empty else {}
+        else:
+            if level in (_SECTION, _NAMES, _LIST):
+                items = []
+                while not self._at_end():
+                    items.append(self.node(_VALUE))
+                return items
+            non_empty = self._skip(mapping=False)
+            stand_in = [None] if non_empty else []
+        # Collections that are only referred to keep their type and truthiness
+        return stand_in if level in (_ROOT, _LIST, _VALUE) else None
+
+    def _mapping(self, level: str) -> Dict[Any, Any]:
+        mapping = {}
+        while not self._at_end():
+            key = self._key()
+            if level == _ROOT:
+                if key in DEFINITION_SECTIONS:
+                    child_level = _SECTION
+                elif key in NAME_SECTIONS:
+                    child_level = _NAMES
+                else:
+                    child_level = _SKIP
+            elif level == _SECTION:
+                child_level = _DEFINITION
+            elif level == _NAMES:
+                child_level = _SKIP
+            elif key in DEFINITION_FIELDS:
+                child_level = _LIST if DEFINITION_FIELDS[key] else _VALUE
+            else:
+                self.node(_SKIP)
+                continue
+            mapping[key] = self.node(child_level)
+        return mapping
+
+    def _skip(self, mapping: bool) -> bool:
+        """Consume the rest of the collection just started; return whether it had items."""
+        non_empty = False
+        while not self._at_end():
+            non_empty = True
+            if mapping:
+                self._key()
+            self.node(_SKIP)
+        return non_empty
+
+    def _at_end(self) -> bool:
+        """Consume the end event of the current collection if it comes next."""
+        if isinstance(self.reader.peek(), yaml.CollectionEndEvent):
+            self.reader.next()
+            return True
+        return False
+
+    def _key(self) -> Any:
+        """Read a mapping key, which must be a scalar other than the merge key."""
+        event = self.reader.next()
+        if isinstance(event, yaml.AliasEvent):
+            self.reader.expand(event)
+            event = self.reader.next()
+        if not isinstance(event, yaml.ScalarEvent):
+            raise UnsupportedYAMLFeature("collection used as a mapping key")
+        if self.reader.scalar_tag(event) == _MERGE_TAG:
+            raise UnsupportedYAMLFeature("merge key")
+        return self.reader.construct_scalar(event)
+
+
+def load_schema_skeleton(stream: Union[str, TextIO]) -> Any:
+    """
+    Load the parts of a schema document the structural checks use.
+
+    The result equals yaml.safe_load(stream) with everything the checks do
+    not look at left out: only the top-level keys, the names in each section
+    and the is_a, slots and range of classes and slots are kept. Values
+    that are collections where a name is expected are replaced by empty or
+    one-item stand-ins of the same type. A scalar or sequence document is
+    reduced the same way.
+
+    Args:
+        stream: YAML text or an open file
+
+    Returns:
+        The skeleton, or None for an empty document
+
+    Raises:
+        yaml.YAMLError: For the same documents and with the same message as yaml.safe_load
+        UnsupportedYAMLFeature: If the document uses merge keys, collection
+            keys, recursive aliases or custom collection tags
+    """
+    reader = _EventReader(stream)
+    try:
+        reader.next()  # StreamStartEvent
+        document = None
+        document_mark = None
+        if not isinstance(reader.peek(), yaml.StreamEndEvent):
+            reader.next()  # DocumentStartEvent
+            document_mark = reader.peek().start_mark
+            document = _SkeletonBuilder(reader).node(_ROOT)
+            reader.next()  # DocumentEndEvent
+        if not isinstance(reader.peek(), yaml.StreamEndEvent):
+            raise yaml.composer.ComposerError("expected a single document in the stream", document_mark,
+                                              "but found another document", reader.next().start_mark)
+        if reader.deferred_error is not None:
+            raise reader.deferred_error
+        return document
+    finally:
+        reader.dispose()
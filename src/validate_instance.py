@@ -0,0 +1,596 @@
+#!/usr/bin/env python
+"""
+Streaming validation of OME-XML instance documents.
+
+Companion .ome files and the OME-XML of OME-TIFF files (read from their
+headers by ome_tiff, without touching pixel data) can be hundreds of
+megabytes. Validating them with XMLSchema.is_valid builds the
+whole element tree first. Here the document is read as a lazy
+xmlschema.XMLResource instead: it is parsed incrementally, every subtree at
+the lazy depth (by default each child of the root element, such as an Image
+with its Pixels and Planes, an ROI or an Instrument) is validated as soon as
+it is complete and then dropped, and the root is validated last with its
+children pruned. Inside those subtrees, long runs of repeated elements such
+as the Planes of a Pixels are validated one element at a time as they are
+read and are not kept (see RepeatCompactor), so peak memory stays flat
+however many Planes an Image holds.
+
+ElementTree records no source positions, so the lazy resource is fed by a
+small expat-based iterparse that stores the line of each start tag on the
+element, and every error is reported with the line it refers to.
+
+Many documents can be validated in a process pool. The schema is parsed once
+in the parent and the workers are forked afterwards, so they start with the
+parsed schema already in memory (shared copy-on-write) instead of each
+building their own.
+"""
+
+import os
+import gc
+import sys
+import time
+import logging
+import argparse
+import multiprocessing
+import xml.etree.ElementTree as ElementTree
+from xml.parsers import expat
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import xmlschema
+from xmlschema.validators import ValidationContext, XsdElement, XsdGroup
+
+# Fix import for both module and direct script usage
+try:
+    from src.xsd_catalog import load_xsd, load_catalog
+    from src.validation_reports import ResultCallback, JsonLinesReportWriter, JUnitReportWriter
+    from src.ome_tiff import TIFF_EXTENSIONS, TiffFormatError, instance_source, is_tiff_file
+except ImportError:
+    from xsd_catalog import load_xsd, load_catalog
+    from validation_reports import ResultCallback, JsonLinesReportWriter, JUnitReportWriter
+    from ome_tiff import TIFF_EXTENSIONS, TiffFormatError, instance_source, is_tiff_file
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Depth of the subtrees validated one at a time (1 = each child of the root element)
+DEFAULT_LAZY_DEPTH = 1
+
+# Lazy depths xmlschema validates correctly; deeper than 2 it loses track of the
+# identity constraints of the root element (a KeyError on OME's ID keys)
+LAZY_DEPTHS = (1, 2)
+
+# Bytes handed to expat at a time
+READ_SIZE = 64 * 1024
+
+# Extensions of the documents validated when a directory is given
+INSTANCE_EXTENSIONS = ('.ome', '.xml') + TIFF_EXTENSIONS
+
+# Schema used by a pool worker; forked workers inherit it from the parent
+_worker_schema = None
+
+
+class SourceLineElement(ElementTree.Element):
+    """Element that records the line of its start tag, where xmlschema looks for it."""
+
+    __slots__ = ('sourceline',)
+
+
+def _qualified_name(name: str) -> str:
+    """Turn an expat 'uri}local' name into ElementTree's '{uri}local'."""
+    return '{' + name if '}' in name else name
+
+
+def iterparse_with_lines(source, events=None) -> Iterator[Tuple[str, object]]:
+    """
+    Incrementally parse XML like ElementTree.iterparse, recording line numbers.
+
+    Yields the same 'start', 'end', 'start-ns' and 'end-ns' events, and the
+    elements are SourceLineElement instances whose sourceline is the line of
+    their start tag. Used as the iterparse of lazy xmlschema resources.
+
+    Args:
+        source: Binary file object to parse
+        events: Ignored; all four event types are generated
+
+    Yields:
+        (event, element or namespace) tuples
+
+    Raises:
+        ElementTree.ParseError: If the document is not well-formed XML
+    """
+    parser = expat.ParserCreate(namespace_separator='}')
+    parser.buffer_text = True
+    builder = ElementTree.TreeBuilder(element_factory=SourceLineElement)
+    ready = []
+
+    def start(name, attributes):
+        elem = builder.start(_qualified_name(name),
+                             {_qualified_name(key): value for key, value in attributes.items()})
+        elem.sourceline = parser.CurrentLineNumber
+        ready.append(('start', elem))
+
+    def end(name):
+        ready.append(('end', builder.end(_qualified_name(name))))
+
+    parser.StartElementHandler = start
+    parser.EndElementHandler = end
+    parser.CharacterDataHandler = builder.data
+    parser.StartNamespaceDeclHandler = lambda prefix, uri: ready.append(('start-ns', (prefix or '', uri or '')))
+    parser.EndNamespaceDeclHandler = lambda prefix: ready.append(('end-ns', None))
+
+    while True:
+        data = source.read(READ_SIZE)
+        try:
+            parser.Parse(data, not data)
+        except expat.ExpatError as e:
+            error = ElementTree.ParseError(f"{expat.ErrorString(e.code)}: line {e.lineno}, column {e.offset}")
+            error.code = e.code
+            error.position = (e.lineno, e.offset)
+            raise error from None
+        yield from ready
+        del ready[:]
+        if not data:
+            return
+
+
+def format_instance_error(error: xmlschema.XMLSchemaValidationError, path: Optional[str] = None) -> str:
+    """
+    Format a validation error with the line it refers to.
+
+    Errors about an unexpected or missing child point at the child, if any,
+    and otherwise at the element; attribute and value errors point at their
+    element.
+
+    Args:
+        error: An error reported by xmlschema for an element read by iterparse_with_lines
+        path: Path of the element to report instead of error.path
+
+    Returns:
+        Message of the form "line N: reason (path)"
+    """
+    line = getattr(error.invalid_child, 'sourceline', None) or getattr(error.obj, 'sourceline', None) \
+        or error.sourceline
+    message = error.reason or error.message
+    # The path of a children error on a lazy resource names the last child read, not the parent
+    if not isinstance(error.obj, ElementTree.Element):
+        path = path or error.path
+        if path:
+            message = f"{message} ({path})"
+    return f"line {line}: {message}" if line else message
+
+
+class RepeatCompactor:
+    """
+    Validates long runs of repeated elements as they are parsed and drops them.
+
+    xmlschema keeps every element of a lazy subtree until the whole subtree
+    is validated, so an Image is held with all of its Planes. A run of
+    siblings matching the same unbounded particle of their parent's content
+    model satisfies that model whatever its length past the particle's
+    minOccurs. So once a run holds max(minOccurs, 1) elements, every further
+    element of it is validated on its own as soon as it is complete and is
+    removed from its parent before xmlschema sees it.
+
+    An element is passed on to xmlschema after all when it declares
+    namespaces, contains an element selected by an identity constraint or
+    defines an xs:ID, since those are checked across the whole document.
+
+    Use iterparse as the iterparse of the lazy resource, set context to a
+    validation context for that resource, and collect the errors found with
+    pop_errors.
+    """
+
+    def __init__(self, schema: xmlschema.XMLSchema, lazy_depth: int):
+        """
+        Args:
+            schema: Schema the document is validated against
+            lazy_depth: Lazy depth of the resource; only elements below it are dropped
+        """
+        self.schema = schema
+        self.lazy_depth = lazy_depth
+        self.context: Optional[ValidationContext] = None
+        identities = schema.maps.identities.values()
+        # A field that is not an attribute of the selected element could read a dropped element
+        self.enabled = all(field.path.startswith('@') for identity in identities for field in identity.fields)
+        self.selected_tags = {element.name for identity in identities for element in identity.elements}
+        self._particles: Dict[Tuple[XsdElement, str], Optional[XsdElement]] = {}
+        self._errors: List[str] = []
+
+    def pop_errors(self) -> List[str]:
+        """Return the messages of the errors found since the last call."""
+        errors, self._errors = self._errors, []
+        return errors
+
+    def _particle(self, parent: Optional[XsdElement], tag: str) -> Optional[XsdElement]:
+        """Return the element particle of parent's element-only content model that matches tag."""
+        if parent is None:
+            return None
+        key = (parent, tag)
+        if key not in self._particles:
+            content = getattr(parent.type, 'content', None)
+            particle = None
+            if isinstance(content, XsdGroup) and not parent.type.mixed:
+                particle = content.match_element(tag)
+            self._particles[key] = particle if isinstance(particle, XsdElement) else None
+        return self._particles[key]
+
+    def _drop(self, elem: ElementTree.Element, particle: XsdElement, held: List[Tuple[str, object]],
+              parent: ElementTree.Element, path: str) -> bool:
+        """Validate a complete held-back element and remove it from parent, unless it must be kept."""
+        if any(event not in ('start', 'end') for event, _ in held) or \
+                any(node.tag in self.selected_tags for node in elem.iter()):
+            return False
+        particle.raw_decode(elem, 'lax', self.context)
+        if self.context.id_map:
+            self.context.id_map.clear()
+            self.context.errors.clear()
+            return False
+        self._errors.extend(format_instance_error(error, path) for error in self.context.errors)
+        self.context.errors.clear()
+        # Not necessarily the last child: expat builds a whole buffer of the document at a time
+        parent.remove(elem)
+        return True
+
+    def iterparse(self, source, events=None) -> Iterator[Tuple[str, object]]:
+        """
+        Parse like iterparse_with_lines, leaving out the events of dropped elements.
+
+        Args:
+            source: Binary file object to parse
+            events: Ignored; all four event types are generated
+
+        Yields:
+            (event, element or namespace) tuples
+        """
+        # Per open element: [element, particle, path, tag of the current run of children, run length,
+        # children read per tag]; paths count the siblings read so far
+        stack = []
+        namespaces = []
+        held = None
+        held_depth = 0
+        held_parent = None
+        for event, node in iterparse_with_lines(source, events):
+            if held is not None:
+                held.append((event, node))
+                if event == 'start':
+                    held_depth += 1
+                elif event == 'end':
+                    held_depth -= 1
+                    if not held_depth:
+                        parent, particle, path = held_parent
+                        if not self._drop(node, particle, held, parent, path):
+                            yield from held
+                        held = None
+                continue
+            if event == 'start-ns':
+                namespaces.append((event, node))
+                continue
+            if event == 'start':
+                name = node.tag.rpartition('}')[2]
+                if stack:
+                    entry = stack[-1]
+                    particle = self._particle(entry[1], node.tag)
+                    count = entry[5][node.tag] = entry[5].get(node.tag, 0) + 1
+                    path = f"{entry[2]}/{name}[{count}]" if count > 1 else f"{entry[2]}/{name}"
+                    if entry[3] == node.tag:
+                        entry[4] += 1
+                    else:
+                        entry[3], entry[4] = node.tag, 1
+                    if self.enabled and not namespaces and len(stack) > self.lazy_depth and \
+                            particle is not None and particle.max_occurs is None and \
+                            entry[4] > max(particle.min_occurs, 1):
+                        held, held_depth, held_parent = [(event, node)], 1, (entry[0], particle, path)
+                        continue
+                else:
+                    particle, path = self.schema.maps.elements.get(node.tag), f"/{name}"
+                yield from namespaces
+                namespaces = []
+                stack.append([node, particle, path, None, 0, {}])
+            elif event == 'end':
+                stack.pop()
+            yield event, node
+
+
+def iter_instance_errors(instance_file: str, schema: xmlschema.XMLSchema,
+                         lazy_depth: int = DEFAULT_LAZY_DEPTH) -> Iterator[str]:
+    """
+    Validate an instance document lazily, yielding error messages as they are found.
+
+    Args:
+        instance_file: Path of the XML document, or of an OME-TIFF file holding it
+        schema: Schema to validate against
+        lazy_depth: Depth of the subtrees validated one at a time (one of LAZY_DEPTHS)
+
+    Yields:
+        Error messages with line numbers
+
+    Raises:
+        xmlschema.XMLResourceError: If the document cannot be read or is not well-formed
+        TiffFormatError: If a TIFF file is damaged or has no ImageDescription
+    """
+    compactor = RepeatCompactor(schema, lazy_depth)
+    xml_resource = xmlschema.XMLResource(instance_source(instance_file), lazy=lazy_depth, thin_lazy=True,
+                                         iterparse=compactor.iterparse)
+    compactor.context = ValidationContext(source=xml_resource)
+    for error in schema.iter_errors(xml_resource):
+        # Errors in dropped elements come before those xmlschema finds in the subtree holding them
+        yield from compactor.pop_errors()
+        # Only the message is kept: the error holds on to its elements
+        yield format_instance_error(error)
+    yield from compactor.pop_errors()
+
+
+def validate_instance_file(instance_file: str, schema: xmlschema.XMLSchema, verbose: bool = False,
+                           max_errors: Optional[int] = None,
+                           lazy_depth: int = DEFAULT_LAZY_DEPTH) -> Tuple[bool, List[str]]:
+    """
+    Validate an OME-XML document against a schema while streaming it.
+
+    Args:
+        instance_file: Path of the XML document, or of an OME-TIFF file holding it
+        schema: Schema to validate against (see xsd_catalog.load_xsd)
+        verbose: Whether to output detailed validation information
+        max_errors: Stop validating the document once this many errors were found (None for no limit)
+        lazy_depth: Depth of the subtrees validated one at a time
+
+    Returns:
+        Tuple of (is_valid, error_messages)
+    """
+    if verbose:
+        logger.setLevel(logging.DEBUG)
+
+    if not os.path.exists(instance_file):
+        return False, [f"File not found: {instance_file}"]
+
+    errors = []
+    logger.debug(f"Validating {instance_file}")
+    try:
+        for message in iter_instance_errors(instance_file, schema, lazy_depth):
+            errors.append(message)
+            if max_errors is not None and len(errors) >= max_errors:
+                break
+    except (xmlschema.XMLResourceError, OSError) as e:
+        if isinstance(e.__cause__, SyntaxError):
+            errors.append(f"XML syntax error in {instance_file}: {e.__cause__}")
+        else:
+            errors.append(f"Cannot read {instance_file}: {str(e)}")
+    except TiffFormatError as e:
+        errors.append(str(e))
+    except Exception as e:
+        # A failure inside xmlschema fails this document, not the whole run
+        errors.append(f"Unexpected error validating {instance_file}: {type(e).__name__}: {e}")
+    return not errors, errors
+
+
+def peak_rss_bytes(children: bool = False) -> Optional[int]:
+    """
+    Return the peak resident set size of this process or of its finished children.
+
+    Args:
+        children: Report the largest finished child process (such as a pool worker) instead
+
+    Returns:
+        Peak RSS in bytes, or None where the platform does not report it
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def format_throughput(documents: int, total_bytes: int, seconds: float,
+                      peak_rss: Optional[int] = None, worker_peak_rss: Optional[int] = None) -> str:
+    """
+    Summarise a validation run.
+
+    Args:
+        documents: Number of documents validated
+        total_bytes: Total size of the documents
+        seconds: Wall-clock time of the run
+        peak_rss: Peak resident set size in bytes (None if unknown)
+        worker_peak_rss: Peak resident set size of the largest worker process (None without workers)
+
+    Returns:
+        Summary with documents/second, MB/second and peak RSS
+    """
+    seconds = max(seconds, 1e-9)
+    summary = (f"Validated {documents} documents ({total_bytes / 1e6:.1f} MB) in {seconds:.2f}s: "
+               f"{documents / seconds:.1f} documents/s, {total_bytes / 1e6 / seconds:.1f} MB/s")
+    if peak_rss is not None:
+        summary += f", peak RSS {peak_rss / 2 ** 20:.0f} MB"
+        if worker_peak_rss is not None:
+            summary += f" (workers {worker_peak_rss / 2 ** 20:.0f} MB)"
+    return summary
+
+
+def find_instance_files(paths: List[str]) -> List[str]:
+    """
+    Expand directories into the OME-XML documents they contain.
+
+    Args:
+        paths: Documents and directories; directories are searched recursively
+            for files ending in one of INSTANCE_EXTENSIONS
+
+    Returns:
+        The documents, with each directory's files in sorted order
+    """
+    instance_files = []
+    for path in paths:
+        if not os.path.isdir(path):
+            instance_files.append(path)
+            continue
+        found = []
+        for directory, _, file_names in os.walk(path):
+            found.extend(os.path.join(directory, file_name) for file_name in file_names
+                         if file_name.lower().endswith(INSTANCE_EXTENSIONS))
+        instance_files.extend(sorted(found))
+    return instance_files
+
+
+def _init_worker(schema: Optional[xmlschema.XMLSchema] = None):
+    """Set the schema of a worker process that was not forked from the parent."""
+    global _worker_schema
+    if schema is not None:
+        _worker_schema = schema
+
+
+def _validate_in_worker(instance_file: str, max_errors: Optional[int], lazy_depth: int) -> Tuple[bool, List[str]]:
+    return validate_instance_file(instance_file, _worker_schema, max_errors=max_errors, lazy_depth=lazy_depth)
+
+
+def _validate_instances(instance_files: List[str], schema: xmlschema.XMLSchema, verbose: bool, jobs: int,
+                        max_errors: Optional[int], lazy_depth: int):
+    """
+    Validate documents serially or in a process pool, yielding results in order.
+
+    Workers are forked after the schema was parsed, so each starts with the
+    parsed schema. The objects that exist at that point are frozen out of the
+    garbage collector first, which keeps collections in the workers from
+    writing to (and so copying) the pages they share with the parent. Where
+    fork is not available, the schema is pickled to each worker once.
+
+    Args:
+        instance_files: Paths of the documents
+        schema: Schema to validate against
+        verbose: Whether to output detailed validation information
+        jobs: Number of worker processes
+        max_errors: Per-document error limit (None for no limit)
+        lazy_depth: Depth of the subtrees validated one at a time
+
+    Yields:
+        (is_valid, error_messages) tuples in the order of instance_files
+    """
+    global _worker_schema
+    if jobs == 1:
+        for instance_file in instance_files:
+            yield validate_instance_file(instance_file, schema, verbose, max_errors, lazy_depth)
+        return
+
+    logger.info(f"Validating {len(instance_files)} documents with {jobs} worker processes")
+    if 'fork' in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context('fork')
+        initargs = ()
+        _worker_schema = schema
+    else:
+        context = None
+        initargs = (schema,)
+    # Small documents are handed out in batches to cut the per-task overhead
+    chunksize = max(1, min(16, len(instance_files) // (jobs * 4)))
+    gc.freeze()
+    try:
+        with ProcessPoolExecutor(max_workers=jobs, mp_context=context, initializer=_init_worker,
+                                 initargs=initargs) as executor:
+            yield from executor.map(_validate_in_worker, instance_files, [max_errors] * len(instance_files),
+                                    [lazy_depth] * len(instance_files), chunksize=chunksize)
+    finally:
+        gc.unfreeze()
+        _worker_schema = None
+
+
+def validate_instance_files(instance_files: List[str], schema: xmlschema.XMLSchema, verbose: bool = False,
+                            max_errors: Optional[int] = None, lazy_depth: int = DEFAULT_LAZY_DEPTH,
+                            jobs: int = 1,
+                            on_result: Optional[ResultCallback] = None) -> Dict[str, Tuple[bool, List[str]]]:
+    """
+    Validate many OME-XML documents and log the throughput.
+
+    With jobs > 1 the documents are validated in a pool of worker processes
+    that share the already parsed schema. Results are logged and passed to
+    on_result in the order of instance_files, each as soon as it and the
+    results before it are available.
+
+    Args:
+        instance_files: Paths of the XML documents (see find_instance_files for directories)
+        schema: Schema to validate against
+        verbose: Whether to output detailed validation information
+        max_errors: Maximum number of errors reported per document (None for no limit)
+        lazy_depth: Depth of the subtrees validated one at a time
+        jobs: Number of worker processes (0 or less uses one per CPU)
+        on_result: Called with (file_path, is_valid, errors) for every document
+
+    Returns:
+        Dictionary mapping each document to its (is_valid, error_messages)
+    """
+    if jobs is None or jobs <= 0:
+        jobs = os.cpu_count() or 1
+    jobs = max(1, min(jobs, len(instance_files)))
+
+    results = {}
+    total_bytes = 0
+    start = time.perf_counter()
+    outcomes = _validate_instances(instance_files, schema, verbose, jobs, max_errors, lazy_depth)
+    try:
+        for instance_file in instance_files:
+            is_valid, errors = next(outcomes)
+            results[instance_file] = (is_valid, errors)
+            # A TIFF file is mostly pixel data, which is never read
+            if os.path.exists(instance_file) and not is_tiff_file(instance_file):
+                total_bytes += os.path.getsize(instance_file)
+            if is_valid:
+                logger.info(f"✓ {instance_file} is valid")
+            else:
+                logger.error(f"✗ {instance_file} has {len(errors)} errors:")
+                for error in errors:
+                    logger.error(f"  - {error}")
+            if on_result is not None:
+                on_result(instance_file, is_valid, errors)
+    finally:
+        outcomes.close()
+    logger.info(format_throughput(len(results), total_bytes, time.perf_counter() - start, peak_rss_bytes(),
+                                  peak_rss_bytes(children=True) if jobs > 1 else None))
+    return results
+
+
+def main():
+    """Main function to run instance validation from command line"""
+    parser = argparse.ArgumentParser(description="Validate OME-XML documents against the OME XSD, streaming them")
+    parser.add_argument("instances", nargs="+",
+                        help="OME-XML documents or OME-TIFF files, or directories searched recursively for "
+                             ".ome, .xml and .tif/.tiff/.btf files")
+    parser.add_argument("--xsd", default="data/ome.xsd", help="Path to the OME XSD file (default: data/ome.xsd)")
+    parser.add_argument("--catalog", help="Catalog file or schema mirror directory to resolve schema locations with")
+    parser.add_argument("--offline", action="store_true", help="Refuse network access when resolving schema locations")
+    parser.add_argument("--lazy-depth", type=int, default=DEFAULT_LAZY_DEPTH, choices=LAZY_DEPTHS,
+                        help=f"Depth of the subtrees validated one at a time (default: {DEFAULT_LAZY_DEPTH})")
+    parser.add_argument("--max-errors", type=int, help="Stop collecting errors after N per document")
+    parser.add_argument("--jobs", "-j", type=int, default=1,
+                        help="Number of worker processes (0 = one per CPU)")
+    parser.add_argument("--jsonl", help="Path to stream a JSON Lines report to (one record per document)")
+    parser.add_argument("--junit", help="Path to stream a JUnit XML report to (one test case per document)")
+    parser.add_argument("--verbose", "-v", action="store_true", help="Enable verbose output")
+    args = parser.parse_args()
+
+    instance_files = find_instance_files(args.instances)
+    if not instance_files:
+        logger.warning(f"No OME-XML documents found in {', '.join(args.instances)}")
+        return 1
+
+    schema = load_xsd(args.xsd, load_catalog(args.catalog, args.offline))
+    writers = []
+    if args.jsonl:
+        writers.append(JsonLinesReportWriter(args.jsonl))
+    if args.junit:
+        writers.append(JUnitReportWriter(args.junit, suite_name="validate_instance"))
+
+    def on_result(instance_file, is_valid, errors):
+        for writer in writers:
+            writer.write_result(instance_file, is_valid, errors)
+
+    try:
+        results = validate_instance_files(instance_files, schema, args.verbose, args.max_errors, args.lazy_depth,
+                                          args.jobs, on_result)
+    finally:
+        for writer in writers:
+            writer.close()
+    return 0 if all(is_valid for is_valid, _ in results.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
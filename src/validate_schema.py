@@ -10,10 +10,34 @@ reference consistency, and semantic correctness.
 import os
 import sys
 import logging
+import json
+import hashlib
 import argparse
 import yaml
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import List, Optional, Dict, Any, Tuple
+from typing import Callable, List, Optional, Dict, Any, Tuple
+
+# Fix import for both module and direct script usage
+try:
+    from src.inheritance_index import InheritanceIndex
+    from src.schema_index import SchemaCollectionIndex, INDEXED_SECTIONS
+    from src.schema_stream import load_schema_skeleton, UnsupportedYAMLFeature
+    from src.validator_pool import get_validator_pool, warm_validator_pool, metamodel_message
+    from src.validation_reports import (
+        ResultCallback, JsonLinesReportWriter, JUnitReportWriter, MarkdownReportWriter,
+        markdown_summary_lines, markdown_details_header_lines, markdown_file_lines
+    )
+except ImportError:
+    from inheritance_index import InheritanceIndex
+    from schema_index import SchemaCollectionIndex, INDEXED_SECTIONS
+    from schema_stream import load_schema_skeleton, UnsupportedYAMLFeature
+    from validator_pool import get_validator_pool, warm_validator_pool, metamodel_message
+    from validation_reports import (
+        ResultCallback, JsonLinesReportWriter, JUnitReportWriter, MarkdownReportWriter,
+        markdown_summary_lines, markdown_details_header_lines, markdown_file_lines
+    )
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -22,13 +46,17 @@ logger = logging.getLogger(__name__)
 # Import LinkML validation tools with better error handling
 linkml_imports_ok = False
 yaml_loader = None
-SchemaView = None
+SchemaDefinition = None
 JsonSchemaValidator = None
 
 try:
     # Try standard import path first
     from linkml_runtime.loaders import yaml_loader
-    from linkml_runtime.utils.schemaview import SchemaView
+    
+    try:
+        from linkml_runtime.linkml_model.meta import SchemaDefinition
+    except ImportError:
+        SchemaDefinition = None
     
     # Some LinkML versions have validate_yaml in different locations
     try:
@@ -60,13 +88,309 @@ except ImportError as e:
     print("For full validation, install LinkML with: pip install linkml linkml-runtime")
     # We'll continue without LinkML and do basic YAML validation
 
-def validate_schema_file(schema_file: str, verbose: bool = False) -> Tuple[bool, List[str]]:
+class _ErrorLimitReached(Exception):
+    """Raised when a file's error budget is used up."""
+
+class _ErrorList(list):
+    """List of error messages that stops collection once max_errors messages were added."""
+    
+    def __init__(self, max_errors: Optional[int] = None):
+        super().__init__()
+        self.max_errors = max_errors
+    
+    def append(self, message: str):
+        super().append(message)
+        if self.max_errors is not None and len(self) >= self.max_errors:
+            raise _ErrorLimitReached()
+    
+    def extend(self, messages):
+        for message in messages:
+            self.append(message)
+
+# Bump whenever a check is added or changed so that cached results are invalidated
+VALIDATOR_VERSION = "3"
+DEFAULT_CACHE_FILE = ".validation_cache.json"
+
+def _linkml_version() -> str:
+    """Return the version of the LinkML package used for validation (or 'none')."""
+    if not linkml_imports_ok:
+        return "none"
+    try:
+        from importlib.metadata import version, PackageNotFoundError
+    except ImportError:
+        return "unknown"
+    versions = []
+    for package in ("linkml", "linkml-runtime"):
+        try:
+            versions.append(f"{package}={version(package)}")
+        except PackageNotFoundError:
+            continue
+    return ",".join(versions) or "unknown"
+
+class ValidationCache:
+    """
+    Persistent cache of validation results keyed by file content.
+    
+    A result is stored under the SHA-256 of the file content, the file path
+    (error messages name the file), the LinkML version and VALIDATOR_VERSION,
+    so any change to the file or to the validator makes it miss. Only the
+    latest result of each path is kept, so the cache does not grow as files
+    change.
+    
+    Attributes:
+        cache_file: Path of the JSON file the cache is stored in
+        hits: Number of results answered from the cache since creation
+    """
+    
+    def __init__(self, cache_file: str = DEFAULT_CACHE_FILE):
+        self.cache_file = cache_file
+        self.hits = 0
+        self._entries = {}
+        self._path_keys = {}
+        self._key_paths = {}
+        self._dirty = False
+        self._environment = f"{_linkml_version()}|validator={VALIDATOR_VERSION}"
+        
+        if os.path.exists(cache_file):
+            try:
+                with open(cache_file, 'r') as f:
+                    data = json.load(f)
+                entries = data.get("entries", {}) if isinstance(data, dict) else {}
+            except (OSError, ValueError) as e:
+                logger.warning(f"Ignoring unreadable validation cache {cache_file}: {str(e)}")
+                entries = {}
+            # Entries are [is_valid, errors, path]; older entries without a path are dropped
+            for key, entry in entries.items():
+                if isinstance(entry, list) and len(entry) == 3:
+                    self._entries[key] = entry
+                    self._path_keys[entry[2]] = key
+    
+    def key(self, schema_file: str) -> Optional[str]:
+        """
+        Compute the cache key of a schema file.
+        
+        Args:
+            schema_file: Path to the schema file
+        
+        Returns:
+            The key, or None if the file cannot be read
+        """
+        digest = hashlib.sha256()
+        try:
+            with open(schema_file, 'rb') as f:
+                for chunk in iter(lambda: f.read(1 << 16), b""):
+                    digest.update(chunk)
+        except OSError:
+            return None
+        path = os.path.abspath(schema_file)
+        digest.update(f"\0{path}\0{self._environment}".encode("utf-8"))
+        key = digest.hexdigest()
+        self._key_paths[key] = path
+        return key
+    
+    def get(self, key: Optional[str]) -> Optional[Tuple[bool, List[str]]]:
+        """Return the cached (is_valid, errors) for a key, counting the hit."""
+        entry = self._entries.get(key) if key else None
+        if entry is None:
+            return None
+        self.hits += 1
+        return bool(entry[0]), list(entry[1])
+    
+    def put(self, key: Optional[str], result: Tuple[bool, List[str]]):
+        """Store the (is_valid, errors) result for a key."""
+        if key:
+            path = self._key_paths.get(key)
+            # Replace the result of an earlier version of the file
+            previous = self._path_keys.get(path)
+            if previous is not None and previous != key:
+                self._entries.pop(previous, None)
+            self._path_keys[path] = key
+            self._entries[key] = [bool(result[0]), list(result[1]), path]
+            self._dirty = True
+    
+    def save(self):
+        """Write the cache to disk if it has changed."""
+        if not self._dirty:
+            return
+        tmp_path = self.cache_file + ".tmp"
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump({"validator_version": VALIDATOR_VERSION, "entries": self._entries}, f)
+            os.replace(tmp_path, self.cache_file)
+            self._dirty = False
+        except OSError as e:
+            logger.warning(f"Could not save validation cache {self.cache_file}: {str(e)}")
+
+def _analyse_definition(section: str, definition: Any) -> Optional[tuple]:
+    """
+    Extract the facts the structural checks need from one class or slot definition.
+    
+    The result only depends on the definition itself, so it can be computed
+    once per distinct definition and reused wherever that definition appears.
+    
+    Args:
+        section: 'classes' or 'slots'
+        definition: The class or slot definition
+    
+    Returns:
+        None if the definition is not a dictionary; for a class a
+        (parent, slots) tuple where slots is None when absent and False when
+        not a list; for a slot a (range,) tuple
+    """
+    if not isinstance(definition, dict):
+        return None
+    if section == 'classes':
+        slots = definition.get('slots') if 'slots' in definition else None
+        if slots is not None:
+            slots = tuple(slots) if isinstance(slots, list) else False
+        return definition.get('is_a'), slots
+    return (definition.get('range'),)
+
+def _schema_scope(schema: Dict[str, Any]) -> Dict[str, set]:
+    """Return the names a schema defines, per section."""
+    return {section: set(schema.get(section) or {}) for section in ('classes', 'slots', 'types', 'enums')}
+
+def _check_schema_structure(schema: Dict[str, Any], schema_file: str,
+                            scope: Optional[Dict[str, set]] = None,
+                            analyse: Optional[Callable[[str, str, Any], Optional[tuple]]] = None,
+                            max_errors: Optional[int] = None) -> List[str]:
+    """
+    Run the structural checks (required fields, class/slot/range references
+    and inheritance) against an already parsed schema.
+    
+    Args:
+        schema: The parsed schema document
+        schema_file: Path of the schema file (used in error messages)
+        scope: Names references may resolve to, per section (default: the
+            names the schema itself defines)
+        analyse: Function (section, name, definition) -> facts, used to
+            share definition analyses between files (default: _analyse_definition)
+        max_errors: Stop checking once this many errors were found (None for no limit)
+    
+    Returns:
+        List of error messages
+    """
+    errors = _ErrorList(max_errors)
+    try:
+        _collect_structure_errors(schema, schema_file, scope, analyse, errors)
+    except _ErrorLimitReached:
+        logger.debug(f"Stopped checking {schema_file} after {max_errors} errors")
+    return list(errors)
+
+def _collect_structure_errors(schema: Dict[str, Any], schema_file: str, scope: Optional[Dict[str, set]],
+                              analyse: Optional[Callable[[str, str, Any], Optional[tuple]]], errors: List[str]):
+    """Append the structural errors of a schema to errors (see _check_schema_structure)."""
+    rules = get_validator_pool().rules
+    if scope is None:
+        scope = _schema_scope(schema)
+    if analyse is None:
+        analyse = lambda section, name, definition: _analyse_definition(section, definition)
+    
+    # Validate schema structure
+    logger.debug(f"Validating schema structure: {schema_file}")
+    for field in rules.required_fields:
+        if field not in schema:
+            errors.append(f"Missing '{field}' field in schema: {schema_file}")
+        
+    # Validate classes and slots
+    if 'classes' in schema:
+        # Resolve the class hierarchy once instead of re-checking is_a per class
+        inheritance = InheritanceIndex.from_linkml(schema)
+        for class_name in inheritance.cycles:
+            errors.append(f"Class {class_name} is part of an inheritance cycle")
+        
+        for class_name, class_def in schema['classes'].items():
+            logger.debug(f"Validating class: {class_name}")
+            facts = analyse('classes', class_name, class_def)
+            # Check for required class properties
+            if facts is None:
+                errors.append(f"Class definition for {class_name} is not a dictionary")
+                continue
+            parent_class, class_slots = facts
+            
+            # Check class references
+            if parent_class and parent_class not in scope['classes']:
+                errors.append(f"Class {class_name} references undefined parent class {parent_class}")
+            
+            # Check slot references
+            if class_slots is False:
+                errors.append(f"Slots in class {class_name} should be a list")
+            elif class_slots:
+                for slot_name in class_slots:
+                    if slot_name not in scope['slots']:
+                        errors.append(f"Class {class_name} references undefined slot {slot_name}")
+    
+    # Validate slots
+    if 'slots' in schema:
+        range_names = rules.range_names(scope)
+        for slot_name, slot_def in schema['slots'].items():
+            logger.debug(f"Validating slot: {slot_name}")
+            facts = analyse('slots', slot_name, slot_def)
+            # Check for required slot properties
+            if facts is None:
+                errors.append(f"Slot definition for {slot_name} is not a dictionary")
+                continue
+            
+            # Check range references
+            range_type = facts[0]
+            if 'range' in slot_def:
+                if range_type not in range_names:
+                    errors.append(f"Slot {slot_name} references undefined range {range_type}")
+
+def _run_linkml_validator(schema: Dict[str, Any], schema_file: str) -> List[str]:
+    """
+    Check an already parsed schema against the LinkML metamodel.
+    
+    The metamodel validator is compiled once per process by the validator
+    pool and reused for every file. If it cannot be built, a
+    JsonSchemaValidator is created for the file instead; the LinkML
+    SchemaDefinition it needs is only built here, from the parsed document,
+    so the file is not read again. If neither is available the check is
+    skipped, which is logged.
+    
+    Args:
+        schema: The parsed schema document
+        schema_file: Path of the schema file (used when no SchemaDefinition can be built)
+    
+    Returns:
+        List of error messages
+    """
+    metamodel_errors = get_validator_pool().metamodel_errors(schema)
+    if metamodel_errors is not None:
+        return metamodel_errors
+    if JsonSchemaValidator is None:
+        logger.info(f"LinkML metamodel check skipped for {schema_file}: "
+                    f"neither the metamodel JSON Schema nor JsonSchemaValidator is available")
+        return []
+    
+    errors = []
+    try:
+        if SchemaDefinition is not None:
+            source = yaml_loader.load(dict(schema), target_class=SchemaDefinition)
+        else:
+            source = schema_file
+        validator = JsonSchemaValidator(source)
+        validation_results = validator.validate()
+        if not validation_results.valid:
+            for error in validation_results.results:
+                errors.append(f"LinkML validation error: {error}")
+    except Exception as e:
+        logger.debug(f"Could not use JsonSchemaValidator: {str(e)}")
+        # Fall back to basic validation
+    return errors
+
+def validate_schema_file(schema_file: str, verbose: bool = False,
+                         max_errors: Optional[int] = None) -> Tuple[bool, List[str]]:
     """
     Validate a single LinkML schema file.
     
+    The file is read and parsed once; the parsed document is passed to every
+    check.
+    
     Args:
         schema_file: Path to the schema file
         verbose: Whether to output detailed validation information
+        max_errors: Stop validating the file once this many errors were found (None for no limit)
     
     Returns:
         Tuple of (is_valid, error_messages)
@@ -74,118 +398,288 @@ def validate_schema_file(schema_file: str, verbose: bool = False) -> Tuple[bool,
     if verbose:
         logger.setLevel(logging.DEBUG)
         
-    errors = []
+    errors = _ErrorList(max_errors)
     
     try:
         # Check if file exists
         if not os.path.exists(schema_file):
             errors.append(f"File not found: {schema_file}")
-            return False, errors
+            return False, list(errors)
             
         # Check YAML syntax
         logger.debug(f"Checking YAML syntax for {schema_file}")
         try:
             with open(schema_file, 'r') as f:
-                yaml_content = yaml.safe_load(f)
+                schema = yaml.safe_load(f)
                 
-            if yaml_content is None:
+            if schema is None:
                 errors.append(f"Invalid or empty YAML: {schema_file}")
-                return False, errors
+                return False, list(errors)
         except yaml.YAMLError as e:
             errors.append(f"YAML syntax error in {schema_file}: {str(e)}")
-            return False, errors
-        
+            return False, list(errors)
+    except _ErrorLimitReached:
+        return False, list(errors)
+    except Exception as e:
+        return False, list(errors) + [f"Unexpected error validating {schema_file}: {str(e)}"]
+    
+    return _validate_schema_document(schema, schema_file, max_errors)
+
+def stream_validate_schema_file(schema_file: str, verbose: bool = False,
+                                max_errors: Optional[int] = None) -> Tuple[bool, List[str]]:
+    """
+    Validate a single LinkML schema file without loading the whole document.
+    
+    The file is read as a stream of YAML events and only the names and
+    references the structural checks need are kept (see schema_stream), so
+    memory grows with the number of names rather than with the file size.
+    The structural checks and their messages are those of
+    validate_schema_file; the LinkML metamodel check, which needs the full
+    document, is not run. Files using YAML features the streaming loader
+    does not support are validated with validate_schema_file instead.
+    
+    Args:
+        schema_file: Path to the schema file
+        verbose: Whether to output detailed validation information
+        max_errors: Stop validating the file once this many errors were found (None for no limit)
+    
+    Returns:
+        Tuple of (is_valid, error_messages)
+    """
+    if verbose:
+        logger.setLevel(logging.DEBUG)
+    
+    if not os.path.exists(schema_file):
+        return False, [f"File not found: {schema_file}"]
+    
+    logger.debug(f"Streaming YAML events of {schema_file}")
+    try:
+        with open(schema_file, 'r') as f:
+            skeleton = load_schema_skeleton(f)
+    except UnsupportedYAMLFeature as e:
+        logger.debug(f"Cannot stream {schema_file} ({str(e)}); loading it in full")
+        return validate_schema_file(schema_file, verbose, max_errors)
+    except yaml.YAMLError as e:
+        return False, [f"YAML syntax error in {schema_file}: {str(e)}"]
+    except Exception as e:
+        return False, [f"Unexpected error validating {schema_file}: {str(e)}"]
+    
+    if skeleton is None:
+        return False, [f"Invalid or empty YAML: {schema_file}"]
+    return _validate_schema_document(skeleton, schema_file, max_errors, metamodel=False)
+
+def _validate_schema_document(schema: Any, schema_file: str, max_errors: Optional[int] = None,
+                              metamodel: bool = True) -> Tuple[bool, List[str]]:
+    """
+    Validate an already parsed schema document.
+    
+    Args:
+        schema: The parsed schema document
+        schema_file: Path or name of the schema (used in messages)
+        max_errors: Stop validating once this many errors were found (None for no limit)
+        metamodel: Whether to check the document against the LinkML metamodel
+            (False for schema skeletons, which leave out what the metamodel checks)
+    
+    Returns:
+        Tuple of (is_valid, error_messages)
+    """
+    errors = _ErrorList(max_errors)
+    
+    try:
         # If LinkML is not available, just do basic YAML validation
         if not linkml_imports_ok:
             logger.info(f"Basic YAML validation passed for {schema_file}")
             return True, []
-            
-        # Load schema with LinkML
-        logger.debug(f"Loading schema with LinkML: {schema_file}")
-        try:
-            schema = yaml_loader.load(schema_file, target_class=dict)
-            view = SchemaView(schema)
-        except Exception as e:
-            errors.append(f"LinkML schema loading error in {schema_file}: {str(e)}")
-            return False, errors
-            
-        # Validate schema structure
-        logger.debug(f"Validating schema structure: {schema_file}")
-        if 'id' not in schema:
-            errors.append(f"Missing 'id' field in schema: {schema_file}")
-        if 'name' not in schema:
-            errors.append(f"Missing 'name' field in schema: {schema_file}")
-            
-        # Validate classes and slots
-        if 'classes' in schema:
-            for class_name, class_def in schema['classes'].items():
-                logger.debug(f"Validating class: {class_name}")
-                # Check for required class properties
-                if not isinstance(class_def, dict):
-                    errors.append(f"Class definition for {class_name} is not a dictionary")
-                    continue
-                
-                # Check class references
-                if 'is_a' in class_def:
-                    parent_class = class_def['is_a']
-                    if parent_class not in schema['classes']:
-                        errors.append(f"Class {class_name} references undefined parent class {parent_class}")
-                
-                # Check slot references
-                if 'slots' in class_def:
-                    if not isinstance(class_def['slots'], list):
-                        errors.append(f"Slots in class {class_name} should be a list")
-                    else:
-                        for slot_name in class_def['slots']:
-                            if 'slots' not in schema or slot_name not in schema['slots']:
-                                errors.append(f"Class {class_name} references undefined slot {slot_name}")
         
-        # Validate slots
-        if 'slots' in schema:
-            for slot_name, slot_def in schema['slots'].items():
-                logger.debug(f"Validating slot: {slot_name}")
-                # Check for required slot properties
-                if not isinstance(slot_def, dict):
-                    errors.append(f"Slot definition for {slot_name} is not a dictionary")
-                    continue
-                
-                # Check range references
-                if 'range' in slot_def:
-                    range_type = slot_def['range']
-                    if range_type not in ['string', 'integer', 'boolean', 'float', 'date', 'datetime'] and \
-                       ('classes' not in schema or range_type not in schema['classes']) and \
-                       ('types' not in schema or range_type not in schema['types']):
-                        errors.append(f"Slot {slot_name} references undefined range {range_type}")
+        if not isinstance(schema, dict):
+            errors.append(f"Schema in {schema_file} is not a mapping")
+            return False, list(errors)
         
-        # Run LinkML validators if available
-        if JsonSchemaValidator is not None:
-            try:
-                validator = JsonSchemaValidator(schema_file)
-                validation_results = validator.validate()
-                if not validation_results.valid:
-                    for error in validation_results.results:
-                        errors.append(f"LinkML validation error: {error}")
-            except Exception as e:
-                logger.debug(f"Could not use JsonSchemaValidator: {str(e)}")
-                # Fall back to basic validation
-                pass
+        errors.extend(_check_schema_structure(schema, schema_file, max_errors=max_errors))
+        
+        # Check the schema against the LinkML metamodel
+        if metamodel:
+            errors.extend(_run_linkml_validator(schema, schema_file))
         
         if errors:
-            return False, errors
+            return False, list(errors)
         else:
             return True, []
-            
+    
+    except _ErrorLimitReached:
+        return False, list(errors)
     except Exception as e:
-        errors.append(f"Unexpected error validating {schema_file}: {str(e)}")
-        return False, errors
+        return False, list(errors) + [f"Unexpected error validating {schema_file}: {str(e)}"]
 
-def validate_schema_directory(directory: str, verbose: bool = False) -> Dict[str, Tuple[bool, List[str]]]:
+def validate_schema_dict(schema: Dict[str, Any], name: str = "<schema>",
+                         max_errors: Optional[int] = None) -> Tuple[bool, List[str]]:
+    """
+    Validate a LinkML schema dictionary held in memory.
+    
+    Runs the same checks as validate_schema_file on a dictionary such as the
+    one returned by generate_linkml_schema, without writing and re-reading
+    YAML. The schema is not modified.
+    
+    Args:
+        schema: The LinkML schema dictionary
+        name: Name of the schema used in messages in place of a file path
+        max_errors: Stop validating once this many errors were found (None for no limit)
+    
+    Returns:
+        Tuple of (is_valid, error_messages)
+    """
+    if schema is None:
+        return False, [f"Invalid or empty YAML: {name}"]
+    return _validate_schema_document(schema, name, max_errors)
+
+def validate_schema_dicts(schemas: Dict[str, Dict[str, Any]], jobs: int = 1,
+                          max_errors: Optional[int] = None) -> Dict[str, Tuple[bool, List[str]]]:
+    """
+    Validate several LinkML schema dictionaries held in memory.
+    
+    Args:
+        schemas: Mapping of schema name to schema dictionary
+        jobs: Number of worker processes (0 or less uses one per CPU)
+        max_errors: Per-schema error limit (None for no limit)
+    
+    Returns:
+        Dictionary mapping schema names to (is_valid, error_messages) tuples, in input order
+    """
+    names = list(schemas)
+    if jobs is None or jobs <= 0:
+        jobs = os.cpu_count() or 1
+    jobs = max(1, min(jobs, len(names)))
+    
+    if jobs == 1:
+        return {name: validate_schema_dict(schemas[name], name, max_errors) for name in names}
+    
+    if linkml_imports_ok:
+        warm_validator_pool()
+    initializer = warm_validator_pool if linkml_imports_ok else None
+    with ProcessPoolExecutor(max_workers=jobs, initializer=initializer) as executor:
+        outcomes = executor.map(partial(validate_schema_dict, max_errors=max_errors),
+                                [schemas[name] for name in names], names)
+        return dict(zip(names, outcomes))
+
+def _log_file_result(file_path: str, is_valid: bool, errors: List[str]):
+    """Log the validation result of a single file."""
+    if is_valid:
+        logger.info(f"✓ {file_path} is valid")
+    else:
+        logger.error(f"✗ {file_path} has {len(errors)} errors:")
+        for error in errors:
+            logger.error(f"  - {error}")
+
+class _RunBudget:
+    """
+    Tracks when a directory run should stop (fail-fast / overall error limit).
+    
+    Attributes:
+        fail_fast: Stop at the first invalid file
+        max_errors: Overall error limit (None for no limit)
+        error_count: Errors reported so far
+        stop_reason: Why the run should stop (None while it may continue)
+    """
+    
+    def __init__(self, fail_fast: bool = False, max_errors: Optional[int] = None):
+        self.fail_fast = fail_fast
+        self.max_errors = max_errors
+        self.error_count = 0
+        self.stop_reason = None
+    
+    @property
+    def exhausted(self) -> bool:
+        """Whether the run should stop."""
+        return self.stop_reason is not None
+    
+    def charge(self, result: Tuple[bool, List[str]]) -> Tuple[bool, List[str]]:
+        """
+        Account for a file's result, trimming its errors to the remaining budget.
+        
+        Args:
+            result: The file's (is_valid, error_messages)
+        
+        Returns:
+            The result, with at most the remaining number of errors
+        """
+        is_valid, errors = result
+        if self.max_errors is not None:
+            errors = errors[:self.max_errors - self.error_count]
+        self.error_count += len(errors)
+        if self.fail_fast and not is_valid:
+            self.stop_reason = "the first invalid file (--fail-fast)"
+        elif self.max_errors is not None and self.error_count >= self.max_errors:
+            self.stop_reason = f"{self.error_count} errors (--max-errors)"
+        return is_valid, errors
+    
+    def log_stop(self, skipped: int):
+        """Log why the run stopped and how many files were not validated."""
+        logger.warning(f"Stopped after {self.stop_reason}; {skipped} files were not validated")
+
+def _emit_result(file_path: str, result: Tuple[bool, List[str]], on_result: Optional[ResultCallback]):
+    """Log a file's result and pass it to the result callback, if any."""
+    _log_file_result(file_path, *result)
+    if on_result is not None:
+        on_result(file_path, *result)
+
+def _validate_files(file_paths: List[str], verbose: bool, jobs: int, max_errors: Optional[int] = None):
+    """
+    Validate files serially or in a process pool, yielding results in order.
+    
+    Closing the generator early cancels the files that have not started yet.
+    
+    Args:
+        file_paths: Paths of the files to validate
+        verbose: Whether to output detailed validation information
+        jobs: Number of worker processes
+        max_errors: Per-file error limit (None for no limit)
+    
+    Yields:
+        (is_valid, error_messages) tuples in the order of file_paths
+    """
+    options = {'max_errors': max_errors} if max_errors is not None else {}
+    if jobs == 1:
+        for file_path in file_paths:
+            logger.info(f"Validating {file_path}")
+            yield validate_schema_file(file_path, verbose, **options)
+        return
+    
+    logger.info(f"Validating {len(file_paths)} files with {jobs} worker processes")
+    if linkml_imports_ok:
+        # Compile once here so forked workers inherit it; other start methods compile once per worker
+        warm_validator_pool()
+    initializer = warm_validator_pool if linkml_imports_ok else None
+    with ProcessPoolExecutor(max_workers=jobs, initializer=initializer) as executor:
+        # map() yields results in submission order, whatever order workers finish in;
+        # closing it cancels the futures that have not started
+        yield from executor.map(partial(validate_schema_file, verbose=verbose, **options), file_paths)
+
+def validate_schema_directory(directory: str, verbose: bool = False, jobs: int = 1,
+                              cache: Optional[ValidationCache] = None,
+                              on_result: Optional[ResultCallback] = None, fail_fast: bool = False,
+                              max_errors: Optional[int] = None) -> Dict[str, Tuple[bool, List[str]]]:
     """
     Validate all LinkML schema files in a directory.
     
+    Files are validated in sorted order. With jobs > 1 they are validated in a
+    process pool; results are still collected and logged in sorted order, so
+    the returned dictionary (and any report built from it) is identical to a
+    serial run. Each result is logged and passed to on_result as soon as it
+    is available, so streaming reports show progress while the run continues.
+    
+    With fail_fast the run stops at the first invalid file; with max_errors it
+    stops once that many errors were collected in total (each file also
+    reports at most max_errors). Files after the stopping point are not
+    validated and are missing from the result.
+    
     Args:
         directory: Path to directory containing schema files
         verbose: Whether to output detailed validation information
+        jobs: Number of worker processes (0 or less uses one per CPU)
+        cache: Validation cache; files found in it are not validated again
+        on_result: Called with (file_path, is_valid, errors) for every file
+        fail_fast: Stop at the first invalid file
+        max_errors: Error limit per file and for the whole run (None for no limit)
     
     Returns:
         Dictionary mapping filenames to (is_valid, error_messages) tuples
@@ -202,69 +696,202 @@ def validate_schema_directory(directory: str, verbose: bool = False) -> Dict[str
     if not yaml_files:
         logger.warning(f"No YAML files found in {directory}")
         return {}
+    
+    file_paths = sorted(str(yaml_file) for yaml_file in yaml_files)
+    
+    # Answer unchanged files from the cache, validate the rest
+    keys = {}
+    cached = {}
+    if cache is not None:
+        for file_path in file_paths:
+            keys[file_path] = cache.key(file_path)
+            result = cache.get(keys[file_path])
+            if result is not None:
+                cached[file_path] = result
+        if cache.hits:
+            logger.info(f"{cache.hits} of {len(file_paths)} results taken from cache")
+    pending = [file_path for file_path in file_paths if file_path not in cached]
+    
+    if jobs is None or jobs <= 0:
+        jobs = os.cpu_count() or 1
+    jobs = max(1, min(jobs, len(pending)))
+    
+    outcomes = _validate_files(pending, verbose, jobs, max_errors)
+    budget = _RunBudget(fail_fast, max_errors)
+    try:
+        # Emit results in sorted order, whether they were cached or computed
+        for file_path in file_paths:
+            if file_path in cached:
+                result = cached[file_path]
+            else:
+                result = next(outcomes)
+                # Results cut short by the error limit are incomplete, so they are not cached
+                if cache is not None and (max_errors is None or len(result[1]) < max_errors):
+                    cache.put(keys[file_path], result)
+            results[file_path] = budget.charge(result)
+            _emit_result(file_path, results[file_path], on_result)
+            if budget.exhausted:
+                budget.log_stop(len(file_paths) - len(results))
+                break
+    finally:
+        outcomes.close()
+        if cache is not None:
+            cache.save()
+    
+    return results
+
+def _collection_metamodel_errors(schema: Dict[str, Any], file_path: str, index: SchemaCollectionIndex,
+                                 checked: Dict[tuple, list]) -> List[str]:
+    """
+    Check a file of a schema collection against the LinkML metamodel.
+    
+    Only the file's header (id, name, imports, prefixes, ...) is checked per
+    file. Each class, slot, type and enum definition is checked once per
+    distinct (section, structural hash) and its errors are reported in every
+    file that copies it. The messages are those of checking the whole file.
+    
+    Args:
+        schema: The parsed schema document
+        file_path: Path of the schema file
+        index: The index of the collection
+        checked: (section, structural hash) -> errors of the definition, shared by all files
+    
+    Returns:
+        List of error messages
+    """
+    pool = get_validator_pool()
+    if pool.metamodel_validator is None:
+        return _run_linkml_validator(schema, file_path)
+    
+    header = {key: value for key, value in schema.items()
+              if not (key in INDEXED_SECTIONS and isinstance(value, dict))}
+    described = pool.describe_metamodel_errors(header)
+    for section in INDEXED_SECTIONS:
+        entries = schema.get(section)
+        if not isinstance(entries, dict):
+            continue
+        for name, definition in entries.items():
+            key = (section, index.definition_hash(file_path, section, name))
+            if key not in checked:
+                checked[key] = pool.definition_errors(section, definition)
+            described.extend(([section, name] + path, message) for path, message in checked[key])
+    described.sort(key=lambda item: [str(part) for part in item[0]])
+    return [metamodel_message(path, message) for path, message in described]
+
+def validate_schema_collection(directory: str, verbose: bool = False,
+                               on_result: Optional[ResultCallback] = None, fail_fast: bool = False,
+                               max_errors: Optional[int] = None) -> Dict[str, Tuple[bool, List[str]]]:
+    """
+    Validate all LinkML schema files in a directory against a global index.
+    
+    Every file is parsed once and its classes, slots, types and enums are
+    recorded in a SchemaCollectionIndex. Each distinct definition (by
+    structural hash) is analysed and checked against the LinkML metamodel
+    once, however many files copy it; references
+    resolve against the file's own definitions plus those of its local
+    imports. On top of the per-file checks this reports definitions that
+    differ between files and imports that do not resolve to a file.
+    
+    Args:
+        directory: Path to directory containing schema files
+        verbose: Whether to output detailed validation information
+        on_result: Called with (file_path, is_valid, errors) for every file
+        fail_fast: Stop at the first invalid file
+        max_errors: Error limit per file and for the whole run (None for no limit)
+    
+    Returns:
+        Dictionary mapping filenames to (is_valid, error_messages) tuples
+    """
+    if verbose:
+        logger.setLevel(logging.DEBUG)
+    
+    if not os.path.isdir(directory):
+        logger.error(f"Directory not found: {directory}")
+        return {}
+    
+    yaml_files = list(Path(directory).glob('*.yaml')) + list(Path(directory).glob('*.yml'))
+    if not yaml_files:
+        logger.warning(f"No YAML files found in {directory}")
+        return {}
+    file_paths = sorted(str(yaml_file) for yaml_file in yaml_files)
+    
+    index, parse_errors = SchemaCollectionIndex.from_files(file_paths)
+    stats = index.statistics()
+    logger.info(f"Indexed {stats['definitions']} definitions in {stats['files']} files: "
+                f"{stats['distinct']} distinct, {stats['conflicts']} conflicting names")
+    
+    # (section, structural hash) -> facts and metamodel errors, shared by every file with that definition
+    analyses = {}
+    checked = {}
+    conflicts = index.conflicts()
+    results = {}
+    budget = _RunBudget(fail_fast, max_errors)
+    
+    for file_path in file_paths:
+        if budget.exhausted:
+            budget.log_stop(len(file_paths) - len(results))
+            break
         
-    # Validate each file
-    for yaml_file in yaml_files:
-        file_path = str(yaml_file)
-        logger.info(f"Validating {file_path}")
-        is_valid, errors = validate_schema_file(file_path, verbose)
-        results[file_path] = (is_valid, errors)
+        if file_path in parse_errors:
+            results[file_path] = budget.charge((False, [parse_errors[file_path]]))
+            _emit_result(file_path, results[file_path], on_result)
+            continue
         
-        # Print results immediately
-        if is_valid:
-            logger.info(f"✓ {file_path} is valid")
-        else:
-            logger.error(f"✗ {file_path} has {len(errors)} errors:")
-            for error in errors:
-                logger.error(f"  - {error}")
+        schema = index.documents[file_path]
+        if not linkml_imports_ok:
+            results[file_path] = (True, [])
+            _emit_result(file_path, results[file_path], on_result)
+            continue
+        
+        def analyse(section, name, definition, file_path=file_path):
+            key = (section, index.definition_hash(file_path, section, name))
+            if key[1] is None:
+                return _analyse_definition(section, definition)
+            if key not in analyses:
+                analyses[key] = _analyse_definition(section, definition)
+            return analyses[key]
+        
+        errors = _ErrorList(max_errors)
+        try:
+            errors.extend(_check_schema_structure(schema, file_path, index.scope(file_path), analyse, max_errors))
+            for imported in index.dangling_imports.get(file_path, []):
+                errors.append(f"Import {imported} in {file_path} does not resolve to a schema file in {directory}")
+            errors.extend(conflicts.get(file_path, []))
+            errors.extend(_collection_metamodel_errors(schema, file_path, index, checked))
+        except _ErrorLimitReached:
+            pass
+        except Exception as e:
+            errors = [f"Unexpected error validating {file_path}: {str(e)}"]
+        
+        results[file_path] = budget.charge((not errors, list(errors)))
+        _emit_result(file_path, results[file_path], on_result)
     
     return results
 
-def generate_validation_report(results: Dict[str, Tuple[bool, List[str]]], output_file: Optional[str] = None):
+def generate_validation_report(results: Dict[str, Tuple[bool, List[str]]], output_file: Optional[str] = None,
+                               cached_count: Optional[int] = None):
     """
     Generate a validation report from validation results.
     
+    To write the report while validation is still running, pass a
+    MarkdownReportWriter as on_result instead; it produces the same text.
+    
     Args:
         results: Dictionary mapping filenames to (is_valid, error_messages) tuples
         output_file: Path to output file for report
+        cached_count: Number of results answered from the validation cache (None if caching was off)
     """
     valid_count = sum(1 for is_valid, _ in results.values() if is_valid)
     total_count = len(results)
     
-    report = []
-    report.append("# LinkML Schema Validation Report")
-    report.append("")
-    report.append("## Summary")
-    report.append("")
-    report.append(f"- Total schemas validated: {total_count}")
-    report.append(f"- Valid schemas: {valid_count}")
-    report.append(f"- Invalid schemas: {total_count - valid_count}")
-    
-    # Add LinkML availability info
-    report.append("")
-    if linkml_imports_ok:
-        report.append("LinkML imports were successful. Full validation performed.")
-    else:
-        report.append("**Warning:** LinkML packages not available. Only basic YAML syntax validation was performed.")
-        report.append("Install LinkML for more thorough validation: `pip install linkml linkml-runtime`")
-    
-    report.append("")
+    report = markdown_summary_lines(total_count, valid_count, cached_count, linkml_imports_ok)
     
     if total_count - valid_count > 0:
-        report.append("## Details of Invalid Schemas")
-        report.append("")
+        report.extend(markdown_details_header_lines())
         
         for file_path, (is_valid, errors) in results.items():
             if not is_valid:
-                report.append(f"### {os.path.basename(file_path)}")
-                report.append("")
-                report.append(f"File: `{file_path}`")
-                report.append("")
-                report.append("Errors:")
-                report.append("")
-                for error in errors:
-                    report.append(f"- {error}")
-                report.append("")
+                report.extend(markdown_file_lines(file_path, errors))
     
     report_text = "\n".join(report)
     
@@ -277,6 +904,28 @@ def generate_validation_report(results: Dict[str, Tuple[bool, List[str]]], outpu
     
     return report_text
 
+def _open_report_writers(jsonl_file: Optional[str] = None, junit_file: Optional[str] = None,
+                         markdown_file: Optional[str] = None) -> list:
+    """
+    Open the streaming report writers requested on the command line.
+    
+    Args:
+        jsonl_file: Path of the JSON Lines report
+        junit_file: Path of the JUnit XML report
+        markdown_file: Path of the Markdown report
+    
+    Returns:
+        List of report writers
+    """
+    writers = []
+    if jsonl_file:
+        writers.append(JsonLinesReportWriter(jsonl_file))
+    if junit_file:
+        writers.append(JUnitReportWriter(junit_file))
+    if markdown_file:
+        writers.append(MarkdownReportWriter(markdown_file, linkml_imports_ok))
+    return writers
+
 def main():
     """Main function to run validation from command line"""
     parser = argparse.ArgumentParser(description="Validate LinkML schemas")
@@ -284,7 +933,24 @@ def main():
     # Add arguments
     parser.add_argument("path", help="Path to a LinkML schema file or directory of schema files")
     parser.add_argument("--output", "-o", help="Path to save validation report")
+    parser.add_argument("--jsonl", help="Path to stream a JSON Lines report to (one record per file)")
+    parser.add_argument("--junit", help="Path to stream a JUnit XML report to (one test case per file)")
     parser.add_argument("--verbose", "-v", action="store_true", help="Enable verbose output")
+    parser.add_argument("--jobs", "-j", type=int, default=1,
+                        help="Number of worker processes for directory validation (0 = one per CPU)")
+    parser.add_argument("--cross-file", action="store_true",
+                        help="Validate a directory against one global class/slot index and report conflicts between files")
+    parser.add_argument("--fail-fast", action="store_true",
+                        help="Stop at the first invalid file and cancel outstanding work")
+    parser.add_argument("--max-errors", type=int,
+                        help="Stop collecting errors after N per file and N in total")
+    parser.add_argument("--stream", action="store_true",
+                        help="Validate a single file from a stream of YAML events, keeping only names and "
+                             "references in memory (structural checks only)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Revalidate every file instead of reusing cached results for unchanged files")
+    parser.add_argument("--cache-file",
+                        help=f"Path of the validation cache (default: <directory>/{DEFAULT_CACHE_FILE})")
     
     # Parse arguments
     args = parser.parse_args()
@@ -298,30 +964,45 @@ def main():
     # Check if path is a file or directory
     if os.path.isfile(args.path):
         # Validate single file
-        is_valid, errors = validate_schema_file(args.path, args.verbose)
+        validate = stream_validate_schema_file if args.stream else validate_schema_file
+        is_valid, errors = validate(args.path, args.verbose, args.max_errors)
         results = {args.path: (is_valid, errors)}
         
         # Generate report if requested
         if args.output:
             generate_validation_report(results, args.output)
+        writers = _open_report_writers(args.jsonl, args.junit)
+        for writer in writers:
+            writer.write_result(args.path, is_valid, errors)
+            writer.close()
         
         # Print results
-        if is_valid:
-            logger.info(f"✓ {args.path} is valid")
-            return 0
-        else:
-            logger.error(f"✗ {args.path} has {len(errors)} errors:")
-            for error in errors:
-                logger.error(f"  - {error}")
-            return 1
+        _log_file_result(args.path, is_valid, errors)
+        return 0 if is_valid else 1
     
     elif os.path.isdir(args.path):
-        # Validate directory
-        results = validate_schema_directory(args.path, args.verbose)
+        # Reports are written as results arrive, so they stay useful if the run is interrupted
+        writers = _open_report_writers(args.jsonl, args.junit, args.output)
         
-        # Generate report if requested
-        if args.output:
-            generate_validation_report(results, args.output)
+        def on_result(file_path, is_valid, errors):
+            for writer in writers:
+                writer.write_result(file_path, is_valid, errors)
+        
+        cache = None
+        try:
+            if args.cross_file:
+                # Results depend on the other files, so they are neither cached nor split across workers
+                results = validate_schema_collection(args.path, args.verbose, on_result,
+                                                     args.fail_fast, args.max_errors)
+            else:
+                # Validate directory, reusing results for files that have not changed
+                if not args.no_cache:
+                    cache = ValidationCache(args.cache_file or os.path.join(args.path, DEFAULT_CACHE_FILE))
+                results = validate_schema_directory(args.path, args.verbose, args.jobs, cache, on_result,
+                                                    args.fail_fast, args.max_errors)
+        finally:
+            for writer in writers:
+                writer.close(cache.hits if cache is not None else None)
         
         # Check if any schema is invalid
         if not results:
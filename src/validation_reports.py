@@ -0,0 +1,270 @@
+"""
+Streaming validation report writers.
+
+Each writer receives one validation result at a time (write_result) and puts
+it on disk straight away, so memory stays flat for large directories and CI can
+follow progress. Three formats are supported:
+
+- JSON Lines: one JSON object per file, followed by a summary object
+- JUnit XML: one <testcase> per file; the closing tags and suite counts are
+  rewritten after every test case, so the file parses at any point
+- Markdown: the same report generate_validation_report produces; per-file
+  sections stream to a ".partial" file and the summary is put in front on close
+
+If a run is killed, the JSON Lines and JUnit reports hold every result written
+so far (the JSON Lines report lacks its summary object). The Markdown report
+only exists as its ".partial" file of invalid-file sections, without a summary.
+"""
+
+import os
+import json
+import shutil
+import logging
+from abc import ABC, abstractmethod
+from xml.sax.saxutils import escape, quoteattr
+from typing import Callable, List, Optional
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Callback signature shared by the validators: (file_path, is_valid, errors)
+ResultCallback = Callable[[str, bool, List[str]], None]
+
+
+def markdown_summary_lines(total_count: int, valid_count: int, cached_count: Optional[int],
+                           full_validation: bool) -> List[str]:
+    """
+    Build the title and summary lines of the Markdown validation report.
+
+    Args:
+        total_count: Number of validated schemas
+        valid_count: Number of valid schemas
+        cached_count: Number of results answered from the cache (None if caching was off)
+        full_validation: Whether LinkML was available for full validation
+
+    Returns:
+        List of report lines
+    """
+    lines = []
+    lines.append("# LinkML Schema Validation Report")
+    lines.append("")
+    lines.append("## Summary")
+    lines.append("")
+    lines.append(f"- Total schemas validated: {total_count}")
+    lines.append(f"- Valid schemas: {valid_count}")
+    lines.append(f"- Invalid schemas: {total_count - valid_count}")
+    if cached_count is not None:
+        lines.append(f"- Results from cache: {cached_count}")
+
+    # Add LinkML availability info
+    lines.append("")
+    if full_validation:
+        lines.append("LinkML imports were successful. Full validation performed.")
+    else:
+        lines.append("**Warning:** LinkML packages not available. Only basic YAML syntax validation was performed.")
+        lines.append("Install LinkML for more thorough validation: `pip install linkml linkml-runtime`")
+
+    lines.append("")
+    return lines
+
+
+def markdown_details_header_lines() -> List[str]:
+    """Return the heading lines of the invalid-schema details section."""
+    return ["## Details of Invalid Schemas", ""]
+
+
+def markdown_file_lines(file_path: str, errors: List[str]) -> List[str]:
+    """
+    Build the Markdown report section of an invalid schema file.
+
+    Args:
+        file_path: Path of the schema file
+        errors: Its error messages
+
+    Returns:
+        List of report lines
+    """
+    lines = [f"### {os.path.basename(file_path)}", "", f"File: `{file_path}`", "", "Errors:", ""]
+    lines.extend(f"- {error}" for error in errors)
+    lines.append("")
+    return lines
+
+
+class ReportWriter(ABC):
+    """
+    Base class of the streaming report writers.
+
+    Attributes:
+        output_file: Path of the report
+        total_count: Number of results written so far
+        valid_count: Number of valid results written so far
+    """
+
+    def __init__(self, output_file: str):
+        self.output_file = output_file
+        self.total_count = 0
+        self.valid_count = 0
+        self.closed = False
+
+    def __call__(self, file_path: str, is_valid: bool, errors: List[str]):
+        self.write_result(file_path, is_valid, errors)
+
+    def write_result(self, file_path: str, is_valid: bool, errors: List[str]):
+        """
+        Write the result of one file.
+
+        Args:
+            file_path: Path of the schema file
+            is_valid: Whether it is valid
+            errors: Its error messages
+        """
+        self.total_count += 1
+        if is_valid:
+            self.valid_count += 1
+        self._write(file_path, is_valid, errors)
+
+    def close(self, cached_count: Optional[int] = None):
+        """
+        Finish the report.
+
+        Args:
+            cached_count: Number of results answered from the cache (None if caching was off)
+        """
+        if not self.closed:
+            self.closed = True
+            self._close(cached_count)
+            logger.info(f"Validation report saved to {self.output_file}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    @abstractmethod
+    def _write(self, file_path: str, is_valid: bool, errors: List[str]):
+        """Put the result of one file on disk."""
+
+    @abstractmethod
+    def _close(self, cached_count: Optional[int]):
+        """Write what the report still lacks and close it."""
+
+
+class JsonLinesReportWriter(ReportWriter):
+    """Writes one JSON object per file and a final summary object."""
+
+    def __init__(self, output_file: str):
+        super().__init__(output_file)
+        self._stream = open(output_file, 'w')
+
+    def _write(self, file_path, is_valid, errors):
+        record = {"type": "result", "file": file_path, "valid": is_valid, "errors": list(errors)}
+        self._stream.write(json.dumps(record) + "\n")
+        self._stream.flush()
+
+    def _close(self, cached_count):
+        summary = {
+            "type": "summary",
+            "total": self.total_count,
+            "valid": self.valid_count,
+            "invalid": self.total_count - self.valid_count,
+        }
+        if cached_count is not None:
+            summary["cached"] = cached_count
+        self._stream.write(json.dumps(summary) + "\n")
+        self._stream.close()
+
+
+class JUnitReportWriter(ReportWriter):
+    """
+    Writes a JUnit XML report with one <testcase> per schema file.
+
+    The <testsuite> counts are written into a fixed-width region of the
+    start tag (padded with whitespace) and overwritten in place after every
+    test case, so the test cases never have to be held in memory. Each test
+    case is written over the closing tags of the previous flush, which are
+    then appended again, keeping the file well-formed between writes.
+    """
+
+    _COUNTS_WIDTH = 64
+    _CLOSING_TAGS = '  </testsuite>\n</testsuites>\n'
+
+    def __init__(self, output_file: str, suite_name: str = "validate_schema"):
+        super().__init__(output_file)
+        self.suite_name = suite_name
+        self._stream = open(output_file, 'w', encoding='utf-8')
+        self._stream.write('<?xml version="1.0" encoding="UTF-8"?>\n<testsuites>\n')
+        self._stream.write(f'  <testsuite name={quoteattr(suite_name)} ')
+        self._counts_offset = self._stream.tell()
+        self._stream.write(self._counts(0, 0) + '>\n')
+        self._body_end = self._stream.tell()
+        self._stream.write(self._CLOSING_TAGS)
+        self._stream.flush()
+
+    def _counts(self, tests: int, failures: int) -> str:
+        """Return the count attributes padded to the reserved width."""
+        return f'tests="{tests}" failures="{failures}" errors="0" skipped="0"'.ljust(self._COUNTS_WIDTH)
+
+    def _write(self, file_path, is_valid, errors):
+        name = quoteattr(os.path.basename(file_path))
+        self._stream.seek(self._body_end)
+        self._stream.write(
+            f'    <testcase classname={quoteattr(self.suite_name)} name={name} file={quoteattr(file_path)}'
+        )
+        if is_valid:
+            self._stream.write('/>\n')
+        else:
+            message = quoteattr(f"{len(errors)} validation errors")
+            details = escape("\n".join(errors))
+            self._stream.write(f'>\n      <failure message={message}>{details}</failure>\n    </testcase>\n')
+        self._body_end = self._stream.tell()
+        self._stream.write(self._CLOSING_TAGS)
+        self._stream.seek(self._counts_offset)
+        self._stream.write(self._counts(self.total_count, self.total_count - self.valid_count))
+        self._stream.flush()
+
+    def _close(self, cached_count):
+        self._stream.close()
+
+
+class MarkdownReportWriter(ReportWriter):
+    """
+    Writes the Markdown validation report.
+
+    Sections of invalid files stream to "<output_file>.partial". On close the
+    summary is written to the report followed by the streamed sections, giving
+    exactly the text generate_validation_report produces for the same results.
+    Until then the report itself does not exist.
+    """
+
+    def __init__(self, output_file: str, full_validation: bool = True):
+        super().__init__(output_file)
+        self.full_validation = full_validation
+        self.partial_file = output_file + ".partial"
+        self._stream = open(self.partial_file, 'w')
+        self._has_details = False
+
+    def _write(self, file_path, is_valid, errors):
+        if is_valid:
+            return
+        lines = []
+        if not self._has_details:
+            lines.extend(markdown_details_header_lines())
+            self._has_details = True
+        lines.extend(markdown_file_lines(file_path, errors))
+        # Every line after the summary is preceded by a newline, as in "\n".join()
+        self._stream.write("".join("\n" + line for line in lines))
+        self._stream.flush()
+
+    def _close(self, cached_count):
+        self._stream.close()
+        summary = "\n".join(markdown_summary_lines(
+            self.total_count, self.valid_count, cached_count, self.full_validation
+        ))
+        tmp_path = self.output_file + ".tmp"
+        with open(tmp_path, 'w') as report, open(self.partial_file, 'r') as details:
+            report.write(summary)
+            shutil.copyfileobj(details, report)
+        os.replace(tmp_path, self.output_file)
+        os.remove(self.partial_file)
@@ -0,0 +1,285 @@
+"""
+Process-wide pool of compiled schema validation rules.
+
+Checking a schema against the LinkML metamodel means compiling the metamodel
+JSON Schema shipped with linkml-runtime, which takes far longer than checking
+a single generated schema with it. The pool compiles the metamodel validator
+the first time it is needed and reuses it for every file validated in the
+process, together with the structural rules the pure-Python checks use. Each
+worker process of a parallel directory run builds its own pool once.
+"""
+
+import os
+import json
+import logging
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Location of the metamodel JSON Schema inside the linkml_runtime package
+METAMODEL_SCHEMA_PATH = os.path.join("linkml_model", "jsonschema", "meta.schema.json")
+
+# Longest message kept; jsonschema messages embed the whole failing instance, so longer ones are truncated
+_MAX_MESSAGE_LENGTH = 200
+
+# Schema wrapping a single definition checked on its own
+_DEFINITION_SCHEMA_ID = "https://w3id.org/linkml/definition"
+_DEFINITION_NAME = "definition"
+
+
+def find_metamodel_schema() -> Optional[str]:
+    """
+    Locate the LinkML metamodel JSON Schema shipped with linkml-runtime.
+
+    Returns:
+        Path of meta.schema.json, or None if linkml-runtime is not installed
+    """
+    try:
+        import importlib.util
+        spec = importlib.util.find_spec("linkml_runtime")
+        locations = list(spec.submodule_search_locations or []) if spec else []
+    except (ImportError, ValueError, AttributeError, TypeError):
+        return None
+    for location in locations:
+        path = os.path.join(str(location), METAMODEL_SCHEMA_PATH)
+        if os.path.isfile(path):
+            return path
+    return None
+
+
+def compile_metamodel_validator(metamodel_path: str):
+    """
+    Compile a JSON Schema validator for the LinkML metamodel.
+
+    Args:
+        metamodel_path: Path of the metamodel JSON Schema
+
+    Returns:
+        A jsonschema validator instance
+
+    Raises:
+        ImportError: If jsonschema is not installed
+        OSError, ValueError: If the metamodel cannot be read
+    """
+    import jsonschema
+
+    with open(metamodel_path, 'r') as f:
+        metamodel = json.load(f)
+    validator_class = jsonschema.validators.validator_for(metamodel)
+    validator_class.check_schema(metamodel)
+    return validator_class(metamodel)
+
+
+def _mismatched_branches(error) -> Dict[Any, List[str]]:
+    """
+    Find the alternatives of an anyOf/oneOf error that do not accept the instance's type.
+
+    Args:
+        error: A jsonschema ValidationError with context errors
+
+    Returns:
+        Types expected by each mismatched alternative, keyed by its index
+    """
+    branches = {}
+    for suberror in error.context:
+        if suberror.validator == 'type' and not suberror.relative_path:
+            expected = suberror.validator_value
+            branches[suberror.relative_schema_path[0]] = expected if isinstance(expected, list) else [expected]
+    return branches
+
+
+def describe_metamodel_error(error) -> Tuple[List[Any], str]:
+    """
+    Find the location and reason of a jsonschema error.
+
+    For anyOf/oneOf failures, alternatives whose type does not match the
+    instance (such as the 'null' alternative of every optional definition)
+    are left out and the most relevant error of the remaining ones is
+    reported, descending into nested alternatives. If no alternative accepts
+    the instance's type, the expected types are reported.
+
+    Args:
+        error: A jsonschema ValidationError
+
+    Returns:
+        Tuple of (path of the failing value in the schema, reason)
+    """
+    import jsonschema
+
+    expected_types = None
+    while error.context:
+        mismatched = _mismatched_branches(error)
+        candidates = [suberror for suberror in error.context
+                      if suberror.relative_schema_path[0] not in mismatched]
+        if not candidates:
+            expected_types = [t for types in mismatched.values() for t in types]
+            break
+        error = jsonschema.exceptions.best_match(candidates)
+    if expected_types is not None:
+        message = "value is not of type " + ", ".join(repr(t) for t in dict.fromkeys(expected_types))
+    else:
+        message = error.message
+        if len(message) > _MAX_MESSAGE_LENGTH:
+            message = message[:_MAX_MESSAGE_LENGTH - 3] + "..."
+    return list(error.absolute_path), message
+
+
+def metamodel_message(path: List[Any], message: str) -> str:
+    """Return the validation message of a metamodel error at a path of the schema."""
+    location = "/".join(str(part) for part in path) or "<root>"
+    return f"LinkML validation error at {location}: {message}"
+
+
+def format_metamodel_error(error) -> str:
+    """
+    Format a jsonschema error as a validation message (see describe_metamodel_error).
+
+    Args:
+        error: A jsonschema ValidationError
+
+    Returns:
+        Message naming the location in the schema and the violated rule
+    """
+    return metamodel_message(*describe_metamodel_error(error))
+
+
+class StructuralRules:
+    """
+    Rules used by the pure-Python structural checks.
+
+    Attributes:
+        required_fields: Top-level fields every schema must have
+        builtin_ranges: Ranges that need no definition in the schema
+        range_sections: Schema sections a slot range may refer to
+    """
+
+    __slots__ = ("required_fields", "builtin_ranges", "range_sections")
+
+    def __init__(self, required_fields: Tuple[str, ...] = ('id', 'name'),
+                 builtin_ranges: FrozenSet[str] = frozenset(
+                     ['string', 'integer', 'boolean', 'float', 'date', 'datetime']),
+                 range_sections: Tuple[str, ...] = ('classes', 'types', 'enums')):
+        self.required_fields = tuple(required_fields)
+        self.builtin_ranges = frozenset(builtin_ranges)
+        self.range_sections = tuple(range_sections)
+
+    def range_names(self, scope: Dict[str, set]) -> FrozenSet[str]:
+        """
+        Return every name a slot range may resolve to within a scope.
+
+        Args:
+            scope: Names visible in a schema, per section
+
+        Returns:
+            Set of valid range names
+        """
+        names = set(self.builtin_ranges)
+        for section in self.range_sections:
+            names.update(scope.get(section, ()))
+        return frozenset(names)
+
+
+class ValidatorPool:
+    """
+    Compiled validators shared by every file validated in a process.
+
+    Attributes:
+        rules: The structural rules
+        metamodel_path: Path of the metamodel JSON Schema (None if not found)
+        compile_count: Number of times the metamodel validator was compiled
+    """
+
+    def __init__(self, metamodel_path: Optional[str] = None, rules: Optional[StructuralRules] = None):
+        self.rules = rules or StructuralRules()
+        self.metamodel_path = metamodel_path or find_metamodel_schema()
+        self.compile_count = 0
+        self._metamodel_validator = None
+        self._metamodel_failed = False
+
+    @property
+    def metamodel_validator(self):
+        """The compiled metamodel validator, or None if it cannot be built."""
+        if self._metamodel_validator is None and not self._metamodel_failed:
+            if self.metamodel_path is None:
+                self._metamodel_failed = True
+            else:
+                try:
+                    self._metamodel_validator = compile_metamodel_validator(self.metamodel_path)
+                    self.compile_count += 1
+                    logger.debug(f"Compiled LinkML metamodel validator from {self.metamodel_path}")
+                except (ImportError, OSError, ValueError) as e:
+                    logger.debug(f"Could not compile LinkML metamodel validator: {str(e)}")
+                    self._metamodel_failed = True
+        return self._metamodel_validator
+
+    def metamodel_errors(self, schema: Dict[str, Any]) -> Optional[List[str]]:
+        """
+        Check a parsed schema against the LinkML metamodel.
+
+        Args:
+            schema: The parsed schema document
+
+        Returns:
+            List of error messages, or None if no metamodel validator is available
+        """
+        described = self.describe_metamodel_errors(schema)
+        if described is None:
+            return None
+        return [metamodel_message(path, message) for path, message in described]
+
+    def describe_metamodel_errors(self, schema: Dict[str, Any]) -> Optional[List[Tuple[List[Any], str]]]:
+        """
+        Check a parsed schema against the LinkML metamodel.
+
+        Args:
+            schema: The parsed schema document
+
+        Returns:
+            List of (path, reason) of the errors in path order, or None if no
+            metamodel validator is available
+        """
+        validator = self.metamodel_validator
+        if validator is None:
+            return None
+        described = [describe_metamodel_error(error) for error in validator.iter_errors(schema)]
+        return sorted(described, key=lambda item: [str(part) for part in item[0]])
+
+    def definition_errors(self, section: str, definition: Any) -> Optional[List[Tuple[List[Any], str]]]:
+        """
+        Check one class, slot, type or enum definition against the LinkML metamodel.
+
+        The definition is checked inside a schema holding nothing else, so
+        the result only depends on the definition and can be shared by every
+        file that copies it.
+
+        Args:
+            section: Schema section of the definition ('classes', 'slots', ...)
+            definition: The definition
+
+        Returns:
+            List of (path within the definition, reason) of the errors, or
+            None if no metamodel validator is available
+        """
+        described = self.describe_metamodel_errors(
+            {"id": _DEFINITION_SCHEMA_ID, "name": _DEFINITION_NAME, section: {_DEFINITION_NAME: definition}}
+        )
+        if described is None:
+            return None
+        return [(path[2:], message) for path, message in described if path[:2] == [section, _DEFINITION_NAME]]
+
+
+_POOL = None
+
+
+def get_validator_pool() -> ValidatorPool:
+    """Return the validator pool of the current process, creating it on first use."""
+    global _POOL
+    if _POOL is None:
+        _POOL = ValidatorPool()
+    return _POOL
+
+
+def warm_validator_pool():
+    """Create the process's validator pool and compile its metamodel validator."""
+    get_validator_pool().metamodel_validator
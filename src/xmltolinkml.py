@@ -0,0 +1,380 @@
+#!/usr/bin/env python
+"""
+OME-XML to LinkML instance converter.
+
+Converts OME-XML documents into instances of the LinkML schema generated by
+this project. The conversion is driven by the generated schema itself: the
+`attributes` map of each class (XML attribute -> slot, recorded by
+convert_json_schema_to_linkml) names the slot every XML attribute is written
+to, and the range of the slot decides whether its value is written as an
+integer, a number, a boolean or a string.
+
+A document is streamed with ElementTree.iterparse. Each child of the root
+element (an Image, ROI, Instrument, ...) becomes one record, which is written
+as one JSON line (or YAML document) as soon as its end tag has been read and
+is then dropped, so memory stays flat however many records a document holds.
+A record is built whole before it is written, so memory grows with the size
+of the largest record: an Image holding 200,000 Planes is held in memory as
+200,000 objects until its end tag has been read.
+
+Every object names its class in "@type". The generated classes describe the
+attributes of an element, not the elements it contains, so child elements are
+nested under their element name: elements that are classes of the schema, or
+have attributes or children, become lists of objects; other elements (which
+hold only text) become strings.
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import xml.etree.ElementTree as ElementTree
+from typing import Any, Callable, Dict, Iterator, List, Optional, TextIO, Tuple
+
+import yaml
+
+# Fix import for both module and direct script usage
+try:
+    from src.inheritance_index import InheritanceIndex
+    from src.schema_bundle import load_schema
+    from src.validate_instance import find_instance_files
+    from src.ome_tiff import TiffFormatError, instance_source, is_tiff_file
+except ImportError:
+    from inheritance_index import InheritanceIndex
+    from schema_bundle import load_schema
+    from validate_instance import find_instance_files
+    from ome_tiff import TiffFormatError, instance_source, is_tiff_file
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Key holding the class of each object
+TYPE_KEY = "@type"
+
+# Key holding the text of an element converted to an object
+TEXT_KEY = "value"
+
+OUTPUT_FORMATS = ("jsonl", "yaml")
+
+
+def _to_boolean(value: str) -> Any:
+    value = value.strip()
+    if value in ("true", "1"):
+        return True
+    if value in ("false", "0"):
+        return False
+    return value
+
+
+# Conversion of XML attribute values by slot range; other ranges (strings, enums, dates) stay strings
+_RANGE_CONVERTERS = {
+    "integer": int,
+    "float": float,
+    "number": float,
+    "boolean": _to_boolean,
+}
+
+
+def _local_name(tag: str) -> str:
+    """Remove the namespace from an ElementTree tag."""
+    return tag.rsplit("}", 1)[-1]
+
+
+def slot_name_for(attribute: str) -> str:
+    """Return the slot name the generator gives an XML attribute."""
+    return f"attr_{attribute.lower()}"
+
+
+class InstanceMapping:
+    """
+    XML <-> LinkML mapping of a generated schema.
+
+    Attributes:
+        classes: Mapping of class name to its effective attribute -> slot map
+        slot_ranges: Mapping of slot name to its range
+    """
+
+    def __init__(self, linkml_schema: Dict):
+        inheritance = InheritanceIndex.from_linkml(linkml_schema)
+        self.classes = {
+            class_name: dict(inheritance.effective_attributes(class_name))
+            for class_name in inheritance.order
+        }
+        self.slot_ranges = {
+            slot_name: slot_def.get("range", "string")
+            for slot_name, slot_def in (linkml_schema.get("slots") or {}).items()
+            if isinstance(slot_def, dict)
+        }
+        self._attribute_slots = {}
+        self._slot_attributes = {}
+        # Slots are shared between classes, so any class naming a slot also gives its attribute
+        self._any_slot_attributes = {
+            slot_name: attribute
+            for attributes in self.classes.values()
+            for attribute, slot_name in attributes.items()
+        }
+        undefined = {slot_name for attributes in self.classes.values() for slot_name in attributes.values()
+                     if slot_name not in self.slot_ranges}
+        if undefined:
+            logger.warning(f"{len(undefined)} slots used by classes have no definition; "
+                           f"their values are written as strings")
+
+    @classmethod
+    def load(cls, schema_path: str) -> "InstanceMapping":
+        """
+        Load the mapping of a generated schema file or its bundle.
+
+        Partitioned directories are not supported: each partition only defines
+        a few of the slots its classes use, so the ranges of the others would
+        be lost and their values written as strings.
+
+        Args:
+            schema_path: Single-file YAML schema or its bundle
+
+        Returns:
+            The mapping
+
+        Raises:
+            ValueError: If schema_path is a directory
+        """
+        if os.path.isdir(schema_path):
+            raise ValueError(f"{schema_path} is a directory; partitioned schemas do not define every slot, "
+                             f"use the single-file schema generated from the same XSD")
+        return cls(load_schema(schema_path))
+
+    def attribute_slots(self, class_name: str) -> Dict[str, Tuple[str, Callable[[str], Any]]]:
+        """
+        Return how the XML attributes of a class are converted.
+
+        Attributes missing from the class's map get the slot name the
+        generator would give them.
+
+        Args:
+            class_name: Name of the class (the local name of the element)
+
+        Returns:
+            Mapping of XML attribute to (slot name, value converter)
+        """
+        slots = self._attribute_slots.get(class_name)
+        if slots is None:
+            slots = {}
+            for attribute, slot_name in self.classes.get(class_name, {}).items():
+                slots[attribute] = (slot_name, self.converter(slot_name))
+            self._attribute_slots[class_name] = slots
+        return slots
+
+    def slot_attributes(self, class_name: str) -> Dict[str, str]:
+        """
+        Return the XML attribute each slot of a class is written to.
+
+        This is the inverse of attribute_slots. Slots missing from the class's
+        map are looked up in the maps of the other classes.
+
+        Args:
+            class_name: Name of the class (the local name of the element)
+
+        Returns:
+            Mapping of slot name to XML attribute
+        """
+        attributes = self._slot_attributes.get(class_name)
+        if attributes is None:
+            attributes = dict(self._any_slot_attributes)
+            attributes.update((slot_name, attribute)
+                              for attribute, slot_name in self.classes.get(class_name, {}).items())
+            self._slot_attributes[class_name] = attributes
+        return attributes
+
+    def converter(self, slot_name: str) -> Callable[[str], Any]:
+        """Return the function converting an XML attribute value for a slot."""
+        return _RANGE_CONVERTERS.get(self.slot_ranges.get(slot_name), str)
+
+    def element_to_object(self, elem: ElementTree.Element) -> Dict[str, Any]:
+        """
+        Convert an element and its subtree to a LinkML instance.
+
+        Args:
+            elem: The element
+
+        Returns:
+            The instance, with "@type" naming its class
+        """
+        class_name = _local_name(elem.tag)
+        obj = {TYPE_KEY: class_name}
+        slots = self.attribute_slots(class_name)
+        for attribute, value in elem.attrib.items():
+            if attribute[0] == "{":
+                continue  # xsi:schemaLocation and other namespaced attributes
+            slot = slots.get(attribute)
+            if slot is None:
+                slot = slots[attribute] = (slot_name_for(attribute), self.converter(slot_name_for(attribute)))
+            slot_name, convert = slot
+            try:
+                obj[slot_name] = convert(value)
+            except ValueError:
+                obj[slot_name] = value
+
+        for child in elem:
+            key = _local_name(child.tag)
+            if not child.attrib and not len(child) and key not in self.classes:
+                # Elements holding only text (Description, AcquisitionDate, ...) become strings
+                text = child.text or ""
+                if key not in obj:
+                    obj[key] = text
+                elif isinstance(obj[key], list):
+                    obj[key].append(text)
+                else:
+                    obj[key] = [obj[key], text]
+            else:
+                obj.setdefault(key, []).append(self.element_to_object(child))
+
+        text = (elem.text or "").strip()
+        if text:
+            obj[TEXT_KEY] = text
+        return obj
+
+
+def iter_instance_records(source, mapping: InstanceMapping,
+                          record_elements: Optional[List[str]] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Stream the records of an OME-XML document as LinkML instances.
+
+    Args:
+        source: Path or binary file object of the document
+        mapping: Mapping of the generated schema
+        record_elements: Local names of the children of the root to convert (None for all)
+
+    Yields:
+        One instance per converted child of the root element, in document order
+
+    Raises:
+        ElementTree.ParseError: If the document is not well-formed XML
+    """
+    # Only the records are streamed; each one is built whole (see the module docstring)
+    depth = 0
+    root = None
+    for event, elem in ElementTree.iterparse(source, events=("start", "end")):
+        if event == "start":
+            if root is None:
+                root = elem
+            depth += 1
+            continue
+        depth -= 1
+        if depth != 1:
+            continue
+        if record_elements is None or _local_name(elem.tag) in record_elements:
+            yield mapping.element_to_object(elem)
+        # The record has been written; drop it so memory stays flat
+        root.remove(elem)
+
+
+def _write_record(record: Dict[str, Any], stream: TextIO, output_format: str):
+    if output_format == "yaml":
+        stream.write("---\n")
+        yaml.safe_dump(record, stream, sort_keys=False, allow_unicode=True)
+    else:
+        stream.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")))
+        stream.write("\n")
+
+
+def convert_instance_file(instance_file: str, mapping: InstanceMapping, stream: TextIO,
+                          record_elements: Optional[List[str]] = None, output_format: str = "jsonl") -> int:
+    """
+    Convert an OME-XML document, writing each record as soon as it has been read.
+
+    Args:
+        instance_file: Path of the document, or of an OME-TIFF file holding it
+        mapping: Mapping of the generated schema
+        stream: Text stream to write to
+        record_elements: Local names of the children of the root to convert (None for all)
+        output_format: 'jsonl' for one JSON object per line, 'yaml' for one YAML document per record
+
+    Returns:
+        Number of records written
+    """
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown output format: {output_format}")
+    count = 0
+    for record in iter_instance_records(instance_source(instance_file), mapping, record_elements):
+        _write_record(record, stream, output_format)
+        count += 1
+    return count
+
+
+def convert_instance_files(instance_files: List[str], mapping: InstanceMapping, stream: TextIO,
+                           record_elements: Optional[List[str]] = None,
+                           output_format: str = "jsonl") -> Dict[str, int]:
+    """
+    Convert several OME-XML documents into one output stream and log the throughput.
+
+    Documents that cannot be read or parsed are logged and skipped.
+
+    Args:
+        instance_files: Paths of the documents
+        mapping: Mapping of the generated schema
+        stream: Text stream to write to
+        record_elements: Local names of the children of the root to convert (None for all)
+        output_format: 'jsonl' or 'yaml'
+
+    Returns:
+        Dictionary mapping each converted document to its number of records
+    """
+    counts = {}
+    total_bytes = 0
+    start = time.perf_counter()
+    for instance_file in instance_files:
+        try:
+            counts[instance_file] = convert_instance_file(instance_file, mapping, stream, record_elements,
+                                                          output_format)
+        except (ElementTree.ParseError, OSError, TiffFormatError) as e:
+            logger.error(f"✗ Cannot convert {instance_file}: {str(e)}")
+            continue
+        if not is_tiff_file(instance_file):
+            # A TIFF file is mostly pixel data, which is never read
+            total_bytes += os.path.getsize(instance_file)
+        logger.debug(f"Converted {counts[instance_file]} records from {instance_file}")
+
+    seconds = max(time.perf_counter() - start, 1e-9)
+    records = sum(counts.values())
+    logger.info(f"Converted {records} records from {len(counts)} documents ({total_bytes / 1e6:.1f} MB) "
+                f"in {seconds:.2f}s: {len(counts) / seconds:.1f} documents/s, {records / seconds:.0f} records/s, "
+                f"{total_bytes / 1e6 / seconds:.1f} MB/s")
+    return counts
+
+
+def main():
+    """Main function to run the converter from command line"""
+    parser = argparse.ArgumentParser(description="Convert OME-XML documents to LinkML instances")
+    parser.add_argument("schema", help="Generated single-file LinkML schema (or its bundle)")
+    parser.add_argument("instances", nargs="+",
+                        help="OME-XML documents or OME-TIFF files, or directories searched recursively for "
+                             ".ome, .xml and .tif/.tiff/.btf files")
+    parser.add_argument("--output", "-o", help="Output file (default: standard output)")
+    parser.add_argument("--format", "-f", choices=OUTPUT_FORMATS, default="jsonl",
+                        help="jsonl: one JSON object per line; yaml: one YAML document per record (default: jsonl)")
+    parser.add_argument("--records", help="Comma-separated elements to convert, e.g. 'Image,ROI' (default: all "
+                                          "children of the root element)")
+    parser.add_argument("--verbose", "-v", action="store_true", help="Enable verbose output")
+    args = parser.parse_args()
+
+    if args.verbose:
+        logger.setLevel(logging.DEBUG)
+
+    try:
+        mapping = InstanceMapping.load(args.schema)
+    except (OSError, ValueError, yaml.YAMLError) as e:
+        logger.error(f"✗ Cannot load {args.schema}: {str(e)}")
+        return 1
+    instance_files = find_instance_files(args.instances)
+    record_elements = args.records.split(",") if args.records else None
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as stream:
+            counts = convert_instance_files(instance_files, mapping, stream, record_elements, args.format)
+    else:
+        counts = convert_instance_files(instance_files, mapping, sys.stdout, record_elements, args.format)
+    return 0 if len(counts) == len(instance_files) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
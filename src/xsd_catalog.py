@@ -0,0 +1,215 @@
+"""
+Offline catalog of schema locations for xmlschema.
+
+An XSD may include or import other schemas by URL, and xmlschema fetches
+them whenever the XSD is parsed. A SchemaCatalog maps such URLs to local
+files (normally those of a mirror written by download_xsd.mirror_xsd) and is
+passed to xmlschema as its uri_mapper, so parsing reads only local files. In
+strict mode xmlschema is also told to refuse any remote access, which makes
+parsing fully deterministic in air-gapped builds: a URL missing from the
+catalog fails the parse instead of reaching the network. The published
+locations of the W3C schemas xmlschema bundles (such as xml.xsd) resolve to
+the bundled copies without a catalog entry.
+
+The catalog is stored as JSON next to the mirrored files:
+
+    {"version": 1, "entries": {"<url>": "<path relative to the catalog>"}}
+"""
+
+import os
+import json
+import logging
+import xmlschema
+from typing import Dict, Optional
+from urllib.parse import urldefrag, urlsplit
+
+try:
+    from xmlschema.locations import FALLBACK_LOCATIONS
+except ImportError:
+    FALLBACK_LOCATIONS = {}
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+CATALOG_FILE = "catalog.json"
+CATALOG_VERSION = 1
+
+_REMOTE_SCHEMES = ("http", "https", "ftp")
+
+# Published locations of schemas bundled with xmlschema, and their namespaces
+BUNDLED_SCHEMA_URLS = {
+    "http://www.w3.org/2001/xml.xsd": "http://www.w3.org/XML/1998/namespace",
+    "https://www.w3.org/2001/xml.xsd": "http://www.w3.org/XML/1998/namespace",
+    "http://www.w3.org/2001/XMLSchema.xsd": "http://www.w3.org/2001/XMLSchema",
+    "https://www.w3.org/2001/XMLSchema.xsd": "http://www.w3.org/2001/XMLSchema",
+    "http://www.w3.org/1999/xlink.xsd": "http://www.w3.org/1999/xlink",
+    "https://www.w3.org/1999/xlink.xsd": "http://www.w3.org/1999/xlink",
+}
+
+
+def bundled_location(url: str) -> Optional[str]:
+    """
+    Return the copy bundled with xmlschema of a published W3C schema.
+
+    Args:
+        url: Location of a schema
+
+    Returns:
+        URL of the bundled copy, or None if the schema is not bundled
+    """
+    namespace = BUNDLED_SCHEMA_URLS.get(urldefrag(url)[0])
+    location = FALLBACK_LOCATIONS.get(namespace) if namespace else None
+    if isinstance(location, (list, tuple)):
+        location = location[0] if location else None
+    return location
+
+
+class SchemaResolutionError(Exception):
+    """Raised when a strict catalog cannot resolve the schemas an XSD needs."""
+
+
+class SchemaCatalog:
+    """
+    Mapping of schema URLs to local files, usable as an xmlschema uri_mapper.
+
+    Attributes:
+        entries: Mapping of URL to absolute local path
+        strict: Whether remote access is refused
+        misses: Remote URLs requested that are not in the catalog
+    """
+
+    def __init__(self, entries: Optional[Dict[str, str]] = None, strict: bool = False):
+        self.entries = {}
+        self.strict = strict
+        self.misses = []
+        for url, path in (entries or {}).items():
+            self.add(url, path)
+
+    @classmethod
+    def load(cls, path: str, strict: bool = False) -> "SchemaCatalog":
+        """
+        Load a catalog file, or the catalog of a mirror directory.
+
+        Args:
+            path: Path of a catalog file or of a directory containing catalog.json
+            strict: Whether remote access is refused
+
+        Returns:
+            The catalog
+
+        Raises:
+            OSError, ValueError: If the catalog cannot be read
+        """
+        catalog_file = os.path.join(path, CATALOG_FILE) if os.path.isdir(path) else path
+        with open(catalog_file, 'r') as f:
+            data = json.load(f)
+        base_dir = os.path.dirname(os.path.abspath(catalog_file))
+        entries = {url: os.path.join(base_dir, *relative.split("/"))
+                   for url, relative in data.get("entries", {}).items()}
+        return cls(entries, strict)
+
+    def add(self, url: str, path: str):
+        """Map a URL (without fragment) to a local file."""
+        self.entries[urldefrag(url)[0]] = os.path.abspath(path)
+
+    def save(self, catalog_file: str):
+        """
+        Write the catalog, with paths relative to the catalog file, replacing it atomically.
+
+        Args:
+            catalog_file: Path of the catalog file
+        """
+        base_dir = os.path.dirname(os.path.abspath(catalog_file))
+        entries = {url: os.path.relpath(path, base_dir).replace(os.sep, "/")
+                   for url, path in sorted(self.entries.items())}
+        tmp_path = catalog_file + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({"version": CATALOG_VERSION, "entries": entries}, f, indent=2)
+        os.replace(tmp_path, catalog_file)
+
+    def resolve(self, url: str) -> str:
+        """
+        Map a URL to its local file; other URLs are returned unchanged.
+
+        URLs missing from the catalog resolve to xmlschema's bundled copy
+        when there is one; other remote URLs are recorded in misses.
+
+        Args:
+            url: The URL xmlschema is about to open
+
+        Returns:
+            The local path, or the URL itself
+        """
+        path = self.entries.get(urldefrag(url)[0])
+        if path is not None:
+            return path
+        path = bundled_location(url)
+        if path is not None:
+            logger.debug(f"Schema location resolved to the copy bundled with xmlschema: {url}")
+            return path
+        if urlsplit(url).scheme in _REMOTE_SCHEMES and url not in self.misses:
+            self.misses.append(url)
+            if self.strict:
+                logger.warning(f"Schema location not in the offline catalog: {url}")
+            else:
+                logger.debug(f"Schema location not in the catalog, fetching it: {url}")
+        return url
+
+    __call__ = resolve
+
+    def xmlschema_options(self) -> Dict:
+        """Return the keyword arguments that make xmlschema resolve locations through the catalog."""
+        return {"uri_mapper": self, "allow": "local" if self.strict else "all"}
+
+
+def load_xsd(xsd_path: str, catalog: Optional[SchemaCatalog] = None, **kwargs):
+    """
+    Parse an XSD, resolving the schemas it refers to through a catalog.
+
+    Args:
+        xsd_path: Path of the XSD file
+        catalog: Catalog to resolve schema locations with (None to resolve them as xmlschema does)
+        **kwargs: Further arguments for xmlschema.XMLSchema
+
+    Returns:
+        The XMLSchema object
+
+    Raises:
+        SchemaResolutionError: If a strict catalog lacks schemas the XSD needs
+    """
+    if catalog is None:
+        return xmlschema.XMLSchema(xsd_path, **kwargs)
+
+    del catalog.misses[:]
+    try:
+        schema = xmlschema.XMLSchema(xsd_path, **catalog.xmlschema_options(), **kwargs)
+    except xmlschema.XMLSchemaException as e:
+        if catalog.strict and catalog.misses:
+            raise SchemaResolutionError(
+                f"Cannot parse {xsd_path} offline; not in the catalog: {', '.join(catalog.misses)}"
+            ) from e
+        raise
+    # xmlschema only warns about imports it cannot read and returns the schema without them
+    if catalog.strict and catalog.misses:
+        raise SchemaResolutionError(
+            f"Cannot parse {xsd_path} offline; not in the catalog: {', '.join(catalog.misses)}"
+        )
+    return schema
+
+
+def load_catalog(path: Optional[str], offline: bool = False) -> Optional[SchemaCatalog]:
+    """
+    Build the catalog selected on the command line.
+
+    Args:
+        path: Catalog file or mirror directory (None for no catalog)
+        offline: Whether to refuse remote access
+
+    Returns:
+        The catalog, or None if neither a path nor offline mode was given
+    """
+    if path:
+        return SchemaCatalog.load(path, strict=offline)
+    if offline:
+        return SchemaCatalog(strict=True)
+    return None
@@ -1,28 +1,89 @@
 import os
 import json
 import argparse
-import xmlschema
 import logging
 import re
 from typing import Dict, Optional
 from collections import defaultdict
 
+# Fix import for both module and direct script usage
+try:
+    from src.xsd_catalog import load_xsd, load_catalog
+except ImportError:
+    from xsd_catalog import load_xsd, load_catalog
+
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-def xsd_to_json_schema(xsd_path: str) -> Dict:
+XSD_NAMESPACE = "http://www.w3.org/2001/XMLSchema"
+
+# Map XSD built-in types to JSON Schema types
+XSD_TO_JSON_TYPE = {
+    "string": "string",
+    "normalizedString": "string",
+    "token": "string",
+    "byte": "integer",
+    "short": "integer",
+    "integer": "integer",
+    "int": "integer",
+    "long": "integer",
+    "unsignedByte": "integer",
+    "unsignedShort": "integer",
+    "unsignedInt": "integer",
+    "unsignedLong": "integer",
+    "decimal": "number",
+    "float": "number",
+    "double": "number",
+    "boolean": "boolean",
+    "date": "string",
+    "dateTime": "string",
+    "time": "string",
+    "anyURI": "string",
+    "ID": "string",
+    "IDREF": "string",
+    "NMTOKEN": "string",
+    "anyType": "object"
+}
+
+# Lower bounds implied by the names of XSD built-in integer types
+_XSD_BUILTIN_MINIMUM = {
+    "nonNegativeInteger": 0,
+    "positiveInteger": 1,
+    "unsignedByte": 0,
+    "unsignedShort": 0,
+    "unsignedInt": 0,
+    "unsignedLong": 0
+}
+
+# Map XSD bound facets to JSON Schema keywords
+_XSD_FACET_KEYWORDS = {
+    f"{{{XSD_NAMESPACE}}}minInclusive": "minimum",
+    f"{{{XSD_NAMESPACE}}}maxInclusive": "maximum",
+    f"{{{XSD_NAMESPACE}}}minExclusive": "exclusiveMinimum",
+    f"{{{XSD_NAMESPACE}}}maxExclusive": "exclusiveMaximum",
+    f"{{{XSD_NAMESPACE}}}minLength": "minLength",
+    f"{{{XSD_NAMESPACE}}}maxLength": "maxLength"
+}
+
+def xsd_to_json_schema(xsd_path: str, schema=None, type_index: Optional[Dict] = None, catalog=None) -> Dict:
     """
     Convert an XML Schema to JSON Schema
     
     Args:
         xsd_path: Path to the XML Schema file
+        schema: An already parsed XMLSchema for xsd_path (parsed if None)
+        type_index: Simple type index from build_type_index (built if None)
+        catalog: SchemaCatalog resolving the locations of included/imported schemas
         
     Returns:
         A JSON Schema as a Python dictionary
     """
     try:
         # Parse the XSD file
-        schema = xmlschema.XMLSchema(xsd_path)
+        if schema is None:
+            schema = load_xsd(xsd_path, catalog)
+        if type_index is None:
+            type_index = build_type_index(schema)
         
         # Create a basic JSON Schema structure
         json_schema = {
@@ -36,7 +97,7 @@ def xsd_to_json_schema(xsd_path: str) -> Dict:
         for element_name, element_type in schema.elements.items():
             try:
                 element_name = element_name.split("}")[-1]  # Remove namespace prefix
-                json_schema["properties"][element_name] = _extract_element_content(element_name, element_type, schema, json_schema)
+                json_schema["properties"][element_name] = _extract_element_content(element_name, element_type, schema, json_schema, type_index)
             except Exception as e:
                 logger.warning(f"Error processing element {element_name}: {str(e)}")
         
@@ -48,7 +109,7 @@ def xsd_to_json_schema(xsd_path: str) -> Dict:
         logger.error(f"Error converting XSD to JSON Schema: {str(e)}")
         raise
 
-def _extract_element_content(element_name, element_type, schema, json_schema):
+def _extract_element_content(element_name, element_type, schema, json_schema, type_index=None):
     """
     Extract content from an XSD element.
     
@@ -57,6 +118,7 @@ def _extract_element_content(element_name, element_type, schema, json_schema):
         element_type: Type of the element
         schema: The XMLSchema object
         json_schema: The JSON Schema being built
+        type_index: Simple type index from build_type_index
         
     Returns:
         A dictionary representing the element's content
@@ -82,7 +144,7 @@ def _extract_element_content(element_name, element_type, schema, json_schema):
         
         for attr_name, attr_type in type_attributes.items():
             attr_name = attr_name.split("}")[-1]  # Remove namespace prefix
-            attr_content = _process_attribute(attr_name, attr_type)
+            attr_content = _process_attribute(attr_name, attr_type, json_schema, type_index)
             
             # Add to properties
             element_content["properties"][f"@{attr_name}"] = attr_content
@@ -109,7 +171,7 @@ def _extract_element_content(element_name, element_type, schema, json_schema):
             if hasattr(element_type.type, 'attributes'):
                 for attr_name, attr_type in element_type.type.attributes.items():
                     attr_name = attr_name.split("}")[-1]  # Remove namespace prefix
-                    attr_content = _process_attribute(attr_name, attr_type)
+                    attr_content = _process_attribute(attr_name, attr_type, json_schema, type_index)
                     
                     # Add to properties
                     element_content["properties"][f"@{attr_name}"] = attr_content
@@ -134,7 +196,7 @@ def _extract_element_content(element_name, element_type, schema, json_schema):
                         }
                         
                         # Extract child content recursively
-                        child_content = _extract_element_content(child_name, child_type, schema, json_schema)
+                        child_content = _extract_element_content(child_name, child_type, schema, json_schema, type_index)
                         
                         # Add to properties
                         element_content["properties"][child_name] = child_content
@@ -157,7 +219,7 @@ def _extract_element_content(element_name, element_type, schema, json_schema):
                     if hasattr(base_type, 'attributes'):
                         for attr_name, attr_type in base_type.attributes.items():
                             attr_name = attr_name.split("}")[-1]  # Remove namespace prefix
-                            attr_content = _process_attribute(attr_name, attr_type)
+                            attr_content = _process_attribute(attr_name, attr_type, json_schema, type_index)
                             
                             # Add to properties if not already present
                             if f"@{attr_name}" not in element_content["properties"]:
@@ -179,20 +241,43 @@ def _extract_element_content(element_name, element_type, schema, json_schema):
     
     return element_content
 
-def _process_attribute(attr_name, attr_type):
+def _process_attribute(attr_name, attr_type, json_schema=None, type_index=None):
     """
     Process an XSD attribute.
     
+    The attribute's simple type is resolved through the type index to a JSON
+    Schema type plus facets. Enumerations of named simple types are registered
+    once under the JSON Schema "definitions" and referenced with "$ref";
+    anonymous enumerations are kept inline.
+    
     Args:
         attr_name: Name of the attribute
         attr_type: Type of the attribute
+        json_schema: The JSON Schema being built (receives shared definitions)
+        type_index: Simple type index from build_type_index
         
     Returns:
         A dictionary representing the attribute's content
     """
-    attr_content = {
-        "type": _map_xsd_type_to_json_type(attr_type.type.name if hasattr(attr_type, 'type') and hasattr(attr_type.type, 'name') else "string")
-    }
+    simple_type = getattr(attr_type, 'type', None)
+    if simple_type is None:
+        resolved = {"type": "string"}
+    else:
+        resolved = resolve_simple_type(simple_type, type_index if type_index is not None else {})
+    
+    type_name = getattr(simple_type, 'name', None)
+    if "enum" in resolved and type_name and json_schema is not None:
+        type_name = type_name.split("}")[-1]  # Remove namespace prefix
+        definitions = json_schema.setdefault("definitions", {})
+        if type_name not in definitions:
+            definitions[type_name] = dict(resolved)
+            if getattr(simple_type, 'annotation', None) is not None:
+                doc = _get_documentation(simple_type.annotation)
+                if doc:
+                    definitions[type_name]["description"] = doc
+        attr_content = {"$ref": f"#/definitions/{type_name}"}
+    else:
+        attr_content = dict(resolved)
     
     # Add description if available
     if hasattr(attr_type, 'annotation') and attr_type.annotation is not None:
@@ -200,14 +285,139 @@ def _process_attribute(attr_name, attr_type):
         if doc:
             attr_content["description"] = doc
     
-    # Add enumeration information if available
-    if hasattr(attr_type, 'type') and hasattr(attr_type.type, 'enumeration') and attr_type.type.enumeration:
-        enums = [str(v) for v in attr_type.type.enumeration]
-        if enums:
-            attr_content["enum"] = enums
-    
     return attr_content
 
+def build_type_index(schema) -> Dict[str, Dict]:
+    """
+    Build an index resolving every global simple type of a schema.
+    
+    Each simple type is followed through its restriction/list/union chain to
+    a JSON Schema primitive plus the facets collected along the way
+    (minimum/maximum, length, pattern, enum). Resolution is memoised, so each
+    type in a derivation chain is resolved only once.
+    
+    Args:
+        schema: The XMLSchema object
+        
+    Returns:
+        Dictionary mapping qualified type names to JSON Schema fragments
+    """
+    type_index = {}
+    for type_def in schema.maps.types.values():
+        if type_def.is_simple():
+            resolve_simple_type(type_def, type_index)
+    return type_index
+
+def resolve_simple_type(simple_type, type_index: Dict) -> Dict:
+    """
+    Resolve an XSD simple type to a JSON Schema fragment.
+    
+    Named types are looked up in (and added to) the type index; anonymous
+    types are resolved on the fly against it.
+    
+    Args:
+        simple_type: An xmlschema simple type
+        type_index: Simple type index to consult and update
+        
+    Returns:
+        A JSON Schema fragment with "type" and any facets
+    """
+    name = getattr(simple_type, 'name', None)
+    if name in type_index:
+        return type_index[name]
+    
+    if not simple_type.is_simple():
+        resolved = {"type": "object"}
+    elif getattr(simple_type, 'item_type', None) is not None:
+        resolved = {"type": "array", "items": resolve_simple_type(simple_type.item_type, type_index)}
+    elif getattr(simple_type, 'member_types', None):
+        member_types = {resolve_simple_type(member, type_index)["type"] for member in simple_type.member_types}
+        resolved = {"type": member_types.pop() if len(member_types) == 1 else "string"}
+    elif name and name.startswith(f"{{{XSD_NAMESPACE}}}"):
+        resolved = _resolve_builtin_type(simple_type, type_index)
+    else:
+        resolved = _resolve_restriction(simple_type, type_index)
+    
+    if name:
+        type_index[name] = resolved
+    return resolved
+
+def _resolve_builtin_type(simple_type, type_index):
+    """Resolve an XSD built-in type, following its base chain for unmapped names."""
+    local_name = simple_type.name.split("}")[-1]
+    if local_name in XSD_TO_JSON_TYPE:
+        resolved = {"type": _map_xsd_type_to_json_type(local_name)}
+    elif simple_type.base_type is not None and simple_type.base_type.is_simple():
+        resolved = {"type": resolve_simple_type(simple_type.base_type, type_index)["type"]}
+    else:
+        resolved = {"type": "string"}
+    
+    if local_name in _XSD_BUILTIN_MINIMUM:
+        resolved["minimum"] = _XSD_BUILTIN_MINIMUM[local_name]
+    return resolved
+
+def _resolve_restriction(simple_type, type_index):
+    """Resolve a user-defined restriction by merging its facets over its base type."""
+    base_type = getattr(simple_type, 'base_type', None)
+    if base_type is not None and base_type.is_simple():
+        resolved = dict(resolve_simple_type(base_type, type_index))
+    else:
+        resolved = {"type": "string"}
+    
+    # hexBinary lengths are counted in octets, each written as two characters
+    primitive = getattr(simple_type, 'primitive_type', None)
+    length_scale = 2 if getattr(primitive, 'local_name', None) == 'hexBinary' else 1
+    
+    for facet_name, facet in getattr(simple_type, 'facets', {}).items():
+        if facet_name in _XSD_FACET_KEYWORDS:
+            keyword = _XSD_FACET_KEYWORDS[facet_name]
+            value = _json_number(facet.value)
+            resolved[keyword] = value * length_scale if keyword.endswith("Length") else value
+        elif facet_name == f"{{{XSD_NAMESPACE}}}length":
+            resolved["minLength"] = resolved["maxLength"] = _json_number(facet.value) * length_scale
+    
+    # XSD patterns are implicitly anchored and alternatives within a step are OR-ed
+    patterns = getattr(simple_type, 'facets', {}).get(f"{{{XSD_NAMESPACE}}}pattern")
+    if patterns:
+        regexps = list(patterns.regexps)
+        pattern = regexps[0] if len(regexps) == 1 else "|".join(f"(?:{r})" for r in regexps)
+        # A restriction's value must also match every pattern of its base types
+        resolved["pattern"] = intersect_patterns(resolved.get("pattern"), f"^(?:{pattern})$")
+    
+    if getattr(simple_type, 'enumeration', None):
+        resolved["enum"] = [str(v) for v in simple_type.enumeration]
+    
+    return resolved
+
+def intersect_patterns(*patterns: Optional[str]) -> Optional[str]:
+    """
+    Combine anchored regular expressions into one that requires all of them.
+    
+    Every pattern but the last becomes a lookahead, so the combined pattern
+    matches exactly the values matched by each of its parts.
+    
+    Args:
+        patterns: Patterns of the form "^...$"; None entries are ignored
+        
+    Returns:
+        The combined pattern, or None if no pattern was given
+    """
+    patterns = [p for p in patterns if p]
+    if not patterns:
+        return None
+    lookaheads = "".join(f"(?={p[1:]})" for p in patterns[:-1])
+    return f"^{lookaheads}{patterns[-1][1:]}"
+
+def _json_number(value):
+    """Convert a facet value (possibly a Decimal) to a JSON number."""
+    if isinstance(value, (bool, int, float)):
+        return value
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return str(value)
+    return int(number) if number.is_integer() else number
+
 def _get_documentation(annotation):
     """
     Extract documentation from an XSD annotation.
@@ -279,35 +489,7 @@ def _map_xsd_type_to_json_type(xsd_type):
     if "}" in xsd_type:
         xsd_type = xsd_type.split("}")[-1]
     
-    # Map XSD types to JSON Schema types
-    type_map = {
-        "string": "string",
-        "normalizedString": "string",
-        "token": "string",
-        "byte": "integer",
-        "short": "integer",
-        "integer": "integer",
-        "int": "integer",
-        "long": "integer",
-        "unsignedByte": "integer",
-        "unsignedShort": "integer",
-        "unsignedInt": "integer",
-        "unsignedLong": "integer",
-        "decimal": "number",
-        "float": "number",
-        "double": "number",
-        "boolean": "boolean",
-        "date": "string",
-        "dateTime": "string",
-        "time": "string",
-        "anyURI": "string",
-        "ID": "string",
-        "IDREF": "string",
-        "NMTOKEN": "string",
-        "anyType": "object"
-    }
-    
-    return type_map.get(xsd_type, "object")
+    return XSD_TO_JSON_TYPE.get(xsd_type, "object")
 
 def _make_json_serializable(obj):
     """
@@ -342,11 +524,13 @@ def main():
     parser = argparse.ArgumentParser(description="Convert XML Schema to JSON Schema")
     parser.add_argument("input_file", help="Path to the XML Schema file")
     parser.add_argument("--output", "-o", help="Path to write the JSON Schema file")
+    parser.add_argument("--catalog", help="Catalog file or schema mirror directory to resolve schema locations with")
+    parser.add_argument("--offline", action="store_true", help="Refuse network access when resolving schema locations")
     
     args = parser.parse_args()
     
     # Convert XSD to JSON Schema
-    json_schema = xsd_to_json_schema(args.input_file)
+    json_schema = xsd_to_json_schema(args.input_file, catalog=load_catalog(args.catalog, args.offline))
     
     # Output the JSON Schema
     if args.output:
@@ -2,29 +2,39 @@ import os
 import pytest
 import tempfile
 import json
+import hashlib
+import email.utils
+import functools
+import threading
+import http.server
 from xsdata.formats.dataclass.parsers import XmlParser
 from xsdata.formats.dataclass.parsers.config import ParserConfig
 
+
 @pytest.fixture
 def sample_xsd_path():
     """Returns the path to the sample XSD file"""
     return os.path.join(os.path.dirname(__file__), "data", "sample.xsd")
 
+
 @pytest.fixture
 def complex_xsd_path():
     """Returns the path to the complex XSD file"""
     return os.path.join(os.path.dirname(__file__), "data", "complex.xsd")
 
+
 @pytest.fixture
 def ome_xsd_path():
     """Returns the path to the OME XSD file"""
     return os.path.join(os.path.dirname(__file__), "..", "data", "ome.xsd")
 
+
 @pytest.fixture
 def xml_parser():
     """Returns an XmlParser instance"""
     return XmlParser()
 
+
 @pytest.fixture
 def xml_parser_with_base_url(request):
     """Returns an XmlParser instance with a base URL set to the specified file"""
@@ -33,6 +43,7 @@ def xml_parser_with_base_url(request):
         return XmlParser(config=config)
     return _parser
 
+
 @pytest.fixture
 def temp_output_file():
     """Returns a temporary file for output"""
@@ -42,8 +53,205 @@ def temp_output_file():
     if os.path.exists(path):
         os.unlink(path)
 
+
 @pytest.fixture
 def temp_output_dir():
     """Returns a temporary directory for output files"""
     with tempfile.TemporaryDirectory() as tmp_dir:
-        yield tmp_dir 
\ No newline at end of file
+        yield tmp_dir
+
+
+TYPED_XSD = r"""<?xml version="1.0" encoding="UTF-8"?>
+<xs:schema xmlns:xs="http://www.w3.org/2001/XMLSchema"
+           xmlns:t="http://www.example.org/typed"
+           targetNamespace="http://www.example.org/typed"
+           elementFormDefault="qualified">
+  <xs:simpleType name="UnitsLength">
+    <xs:annotation><xs:documentation>The units used to represent a length</xs:documentation></xs:annotation>
+    <xs:restriction base="xs:string">
+      <xs:enumeration value="m"/>
+      <xs:enumeration value="cm"/>
+      <xs:enumeration value="mm"/>
+    </xs:restriction>
+  </xs:simpleType>
+  <xs:simpleType name="PositiveInt">
+    <xs:restriction base="xs:int">
+      <xs:minInclusive value="1"/>
+    </xs:restriction>
+  </xs:simpleType>
+  <xs:simpleType name="PercentFraction">
+    <xs:restriction base="xs:float">
+      <xs:minInclusive value="0.0"/>
+      <xs:maxInclusive value="1.0"/>
+    </xs:restriction>
+  </xs:simpleType>
+  <xs:simpleType name="PositiveFloat">
+    <xs:restriction base="xs:float">
+      <xs:minExclusive value="0.0"/>
+    </xs:restriction>
+  </xs:simpleType>
+  <xs:simpleType name="ByteCount">
+    <xs:restriction base="xs:int">
+      <xs:maxExclusive value="256"/>
+    </xs:restriction>
+  </xs:simpleType>
+  <xs:simpleType name="Hex40">
+    <xs:restriction base="xs:hexBinary">
+      <xs:length value="20"/>
+    </xs:restriction>
+  </xs:simpleType>
+  <xs:simpleType name="LSID">
+    <xs:restriction base="xs:string">
+      <xs:pattern value="(urn:lsid:\S+)|(\S+:\S+)"/>
+    </xs:restriction>
+  </xs:simpleType>
+  <xs:simpleType name="StageID">
+    <xs:restriction base="t:LSID">
+      <xs:pattern value="Stage:\S+"/>
+    </xs:restriction>
+  </xs:simpleType>
+  <xs:simpleType name="IndexList">
+    <xs:list itemType="t:PositiveInt"/>
+  </xs:simpleType>
+  <xs:element name="Stage">
+    <xs:complexType>
+      <xs:attribute name="ID" type="t:StageID"/>
+      <xs:attribute name="X" type="xs:float"/>
+      <xs:attribute name="SizeC" type="t:PositiveInt"/>
+      <xs:attribute name="Transmittance" type="t:PercentFraction"/>
+      <xs:attribute name="SHA1" type="t:Hex40"/>
+      <xs:attribute name="PhysicalSizeX" type="t:PositiveFloat"/>
+      <xs:attribute name="Bins" type="t:ByteCount"/>
+      <xs:attribute name="Indexes" type="t:IndexList"/>
+      <xs:attribute name="XUnit" type="t:UnitsLength"/>
+      <xs:attribute name="YUnit" type="t:UnitsLength"/>
+    </xs:complexType>
+  </xs:element>
+  <xs:element name="Plane">
+    <xs:complexType>
+      <xs:attribute name="PositionXUnit" type="t:UnitsLength"/>
+      <xs:attribute name="Order">
+        <xs:simpleType>
+          <xs:restriction base="xs:string">
+            <xs:enumeration value="XYZ"/>
+            <xs:enumeration value="XZY"/>
+          </xs:restriction>
+        </xs:simpleType>
+      </xs:attribute>
+    </xs:complexType>
+  </xs:element>
+</xs:schema>
+"""
+
+
+@pytest.fixture
+def typed_xsd_path(tmp_path):
+    """Returns the path to a small XSD using named and anonymous simple types"""
+    path = tmp_path / "typed.xsd"
+    path.write_text(TYPED_XSD)
+    return str(path)
+
+
+class _RecordingHandler(http.server.SimpleHTTPRequestHandler):
+    """
+    Serves files from the server's directory and records the requested paths.
+
+    Supports ETag/Last-Modified conditional requests and "bytes=N-" ranges
+    (with If-Range, and 416 for ranges past the end), and answers with the status codes queued in
+    server.failures before serving normally.
+    """
+
+    def do_GET(self):
+        self.server.requests.append(self.path)
+        self.server.headers.append(dict(self.headers))
+        if self.server.failures:
+            self.send_error(self.server.failures.pop(0))
+            return
+        path = self.translate_path(self.path)
+        if not os.path.isfile(path):
+            self.send_error(404)
+            return
+        with open(path, "rb") as f:
+            content = f.read()
+        etag = '"' + hashlib.sha256(content).hexdigest()[:16] + '"'
+        last_modified = email.utils.formatdate(int(os.path.getmtime(path)), usegmt=True)
+
+        if self.headers.get("If-None-Match") == etag or (
+                "If-None-Match" not in self.headers and self.headers.get("If-Modified-Since") == last_modified):
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+
+        status, start = 200, 0
+        requested = self.headers.get("Range", "")
+        if requested.startswith("bytes=") and self.headers.get("If-Range", etag) in (etag, last_modified):
+            start = int(requested[len("bytes="):].rstrip("-"))
+            status = 206
+            if start >= len(content):
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{len(content)}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+        self.send_response(status)
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", last_modified)
+        self.send_header("Content-Length", str(len(content) - start))
+        if status == 206:
+            self.send_header("Content-Range", f"bytes {start}-{len(content) - 1}/{len(content)}")
+        self.end_headers()
+        self.wfile.write(content[start:])
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def xsd_server(tmp_path):
+    """Serves tmp_path/www over HTTP on localhost; yields the server with a url(path) helper"""
+    root = tmp_path / "www"
+    root.mkdir()
+    handler = functools.partial(_RecordingHandler, directory=str(root))
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.requests = []
+    server.headers = []
+    server.failures = []
+    server.root = root
+    server.url = lambda path="": f"http://127.0.0.1:{server.server_port}/{path}"
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+MAPPED_SCHEMA = {
+    "classes": {
+        "Image": {"slots": ["attr_id", "attr_name"], "attributes": {"ID": "attr_id", "Name": "attr_name"}},
+        "Pixels": {"slots": ["attr_id", "attr_sizez", "attr_bigendian"],
+                   "attributes": {"ID": "attr_id", "SizeZ": "attr_sizez", "BigEndian": "attr_bigendian"}},
+        "Plane": {"slots": ["attr_thez", "attr_deltat"], "attributes": {"TheZ": "attr_thez", "DeltaT": "attr_deltat"}},
+        "MetadataOnly": {"slots": [], "attributes": {}},
+        "Shape": {"slots": ["attr_id"], "attributes": {"ID": "attr_id"}},
+        "Label": {"is_a": "Shape", "slots": ["attr_x"], "attributes": {"X": "attr_x"}},
+        "ROI": {"slots": ["attr_id"], "attributes": {"ID": "attr_id"}},
+    },
+    "slots": {
+        "attr_id": {"range": "string"},
+        "attr_name": {"range": "string"},
+        "attr_sizez": {"range": "integer"},
+        "attr_bigendian": {"range": "boolean"},
+        "attr_thez": {"range": "integer"},
+        "attr_deltat": {"range": "float"},
+        "attr_x": {"range": "float"},
+    },
+}
+
+
+@pytest.fixture
+def mapping():
+    """Returns the instance mapping of a small generated-style schema"""
+    from src.xmltolinkml import InstanceMapping
+    return InstanceMapping(MAPPED_SCHEMA)
@@ -0,0 +1,78 @@
+import pytest
+import yaml
+from src.compact_yaml import hash_cons, dump_compact, compare_emission_modes
+from src.generator import generate_linkml_schema
+
+LONG_DESCRIPTION = "An attribute description that is long enough to be aliased"
+
+@pytest.fixture
+def repetitive_schema():
+    """Returns a schema dictionary with repeated subtrees"""
+    return {
+        "name": "repetitive",
+        "classes": {
+            f"Class{i}": {
+                "description": LONG_DESCRIPTION,
+                "slots": ["attr_id", "attr_name"],
+                "attributes": {"ID": "attr_id", "Name": "attr_name"}
+            }
+            for i in range(10)
+        },
+        "slots": {
+            "attr_id": {"range": "string", "required": True},
+            "attr_flag": {"range": "string", "required": 1}
+        }
+    }
+
+class TestCompactYaml:
+    """Tests for compact YAML emission"""
+
+    def test_hash_cons_shares_identical_subtrees(self, repetitive_schema):
+        """Test that structurally identical subtrees become one object"""
+        consed = hash_cons(repetitive_schema)
+
+        assert consed == repetitive_schema
+        assert consed["classes"]["Class0"]["slots"] is consed["classes"]["Class1"]["slots"]
+        assert consed["classes"]["Class0"] is consed["classes"]["Class9"]
+
+        # The input is left untouched
+        assert repetitive_schema["classes"]["Class0"] is not repetitive_schema["classes"]["Class1"]
+
+    def test_hash_cons_keeps_scalar_types(self, repetitive_schema):
+        """Test that equal but differently typed scalars are not merged"""
+        consed = hash_cons(repetitive_schema)
+        assert consed["slots"]["attr_id"]["required"] is True
+        assert consed["slots"]["attr_flag"]["required"] == 1
+        assert consed["slots"]["attr_flag"]["required"] is not True
+
+    def test_dump_compact_round_trip(self, repetitive_schema):
+        """Test that the compact output loads back to the same data"""
+        text = dump_compact(repetitive_schema)
+
+        assert "&id" in text and "*id" in text
+        assert yaml.safe_load(text) == repetitive_schema
+        assert len(text) < len(yaml.dump(repetitive_schema, sort_keys=False))
+
+    def test_compare_emission_modes(self, repetitive_schema):
+        """Test the size/parse-time comparison"""
+        comparison = compare_emission_modes(repetitive_schema, repeat=1)
+
+        assert comparison["compact"]["bytes"] < comparison["default"]["bytes"]
+        for mode in ("default", "compact"):
+            assert comparison[mode]["dump_seconds"] >= 0
+            assert comparison[mode]["load_seconds"] >= 0
+
+    def test_generate_compact(self, typed_xsd_path, tmp_path):
+        """Test generating a schema in compact mode"""
+        compact_path = str(tmp_path / "compact.yaml")
+        default_path = str(tmp_path / "default.yaml")
+
+        schema = generate_linkml_schema(typed_xsd_path, compact_path, compact=True)
+        generate_linkml_schema(typed_xsd_path, default_path)
+
+        with open(compact_path) as f:
+            compact = yaml.safe_load(f)
+        with open(default_path) as f:
+            default = yaml.safe_load(f)
+
+        assert compact == default == schema
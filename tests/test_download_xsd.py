@@ -1,69 +1,377 @@
 import os
+import json
+import hashlib
 import pytest
 import requests
-import tempfile
-from unittest.mock import patch, MagicMock
-from src.download_xsd import download_xsd, OME_XSD_URL
+from unittest.mock import patch
+from src.download_xsd import (
+    download_xsd, mirror_xsd, mirror_schemas, create_session, find_schema_references, read_manifest, OME_XSD_URL,
+    fetch_versions, format_download_summary, get_ome_xsd_url, mirror_path
+)
 
 class TestDownloadXsd:
     """Tests for download_xsd.py module"""
     
-    @patch('src.download_xsd.requests.get')
-    def test_download_xsd(self, mock_get):
+    def test_download_xsd(self, xsd_server, tmp_path):
         """Test downloading an XSD file"""
-        # Create a mock response
-        mock_response = MagicMock()
-        mock_response.content = b"<xml>Test XSD content</xml>"
-        mock_get.return_value = mock_response
-        
-        # Call download_xsd with a temporary file
-        with tempfile.NamedTemporaryFile(delete=False) as temp_file:
-            temp_path = temp_file.name
-            
-        try:
-            download_xsd("https://example.com/test.xsd", temp_path)
-            
-            # Check that the file was created
-            assert os.path.exists(temp_path)
-            
-            # Check file contents
-            with open(temp_path, "rb") as f:
-                content = f.read()
-                assert content == b"<xml>Test XSD content</xml>"
-            
-            # Verify requests.get was called with the correct URL
-            mock_get.assert_called_once_with("https://example.com/test.xsd")
-        finally:
-            # Clean up
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
+        (xsd_server.root / "test.xsd").write_bytes(b"<xml>Test XSD content</xml>")
+        output_path = str(tmp_path / "data" / "test.xsd")
+        
+        record = download_xsd(xsd_server.url("test.xsd"), output_path)
+        
+        # Check file contents and the manifest
+        with open(output_path, "rb") as f:
+            assert f.read() == b"<xml>Test XSD content</xml>"
+        assert record["status"] == "downloaded"
+        assert read_manifest(output_path) == {
+            "url": xsd_server.url("test.xsd"),
+            "etag": record["etag"],
+            "last_modified": record["last_modified"],
+            "size": 27,
+            "sha256": hashlib.sha256(b"<xml>Test XSD content</xml>").hexdigest(),
+        }
+        assert not os.path.exists(output_path + ".part")
+        assert xsd_server.requests == ["/test.xsd"]
     
-    @patch('src.download_xsd.requests.get')
-    def test_download_xsd_error(self, mock_get):
+    def test_download_xsd_error(self, xsd_server, tmp_path):
         """Test error handling during download"""
-        # Create a mock response with an error
-        mock_response = MagicMock()
-        mock_response.raise_for_status.side_effect = requests.exceptions.HTTPError("404 Not Found")
-        mock_get.return_value = mock_response
-        
-        # Call download_xsd with a temporary file
-        with tempfile.NamedTemporaryFile(delete=False) as temp_file:
-            temp_path = temp_file.name
-            
-        try:
-            # Check that the error is propagated
-            with pytest.raises(requests.exceptions.HTTPError):
-                download_xsd("https://example.com/nonexistent.xsd", temp_path)
-                
-            # Verify requests.get was called with the correct URL
-            mock_get.assert_called_once_with("https://example.com/nonexistent.xsd")
-        finally:
-            # Clean up
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
+        output_path = str(tmp_path / "nonexistent.xsd")
+        
+        # Check that the error is propagated and nothing is written
+        with pytest.raises(requests.exceptions.HTTPError):
+            download_xsd(xsd_server.url("nonexistent.xsd"), output_path)
+        assert not os.path.exists(output_path)
+        assert xsd_server.requests == ["/nonexistent.xsd"]
+    
+    def test_repeated_download_is_conditional(self, xsd_server, tmp_path):
+        """Test that a current file costs one 304 round trip and a changed one is fetched again"""
+        (xsd_server.root / "test.xsd").write_bytes(b"<xml>v1</xml>")
+        output_path = str(tmp_path / "test.xsd")
+        first = download_xsd(xsd_server.url("test.xsd"), output_path)
+        
+        second = download_xsd(xsd_server.url("test.xsd"), output_path)
+        assert second["status"] == "not-modified"
+        assert second["sha256"] == first["sha256"]
+        assert xsd_server.headers[-1]["If-None-Match"] == first["etag"]
+        assert len(xsd_server.requests) == 2
+        
+        (xsd_server.root / "test.xsd").write_bytes(b"<xml>version 2</xml>")
+        third = download_xsd(xsd_server.url("test.xsd"), output_path)
+        assert third["status"] == "downloaded"
+        with open(output_path, "rb") as f:
+            assert f.read() == b"<xml>version 2</xml>"
+    
+    def test_modified_local_file_is_replaced(self, xsd_server, tmp_path):
+        """Test that a local file that no longer matches its manifest is downloaded in full"""
+        (xsd_server.root / "test.xsd").write_bytes(b"<xml>original</xml>")
+        output_path = str(tmp_path / "test.xsd")
+        download_xsd(xsd_server.url("test.xsd"), output_path)
+        with open(output_path, "wb") as f:
+            f.write(b"corrupted")
+        
+        record = download_xsd(xsd_server.url("test.xsd"), output_path)
+        
+        assert record["status"] == "downloaded"
+        assert "If-None-Match" not in xsd_server.headers[-1]
+        with open(output_path, "rb") as f:
+            assert f.read() == b"<xml>original</xml>"
+    
+    def test_interrupted_download_is_resumed(self, xsd_server, tmp_path):
+        """Test that a partial download continues with a Range request"""
+        content = b"<xml>" + b"x" * 1000 + b"</xml>"
+        (xsd_server.root / "test.xsd").write_bytes(content)
+        output_path = str(tmp_path / "test.xsd")
+        record = download_xsd(xsd_server.url("test.xsd"), output_path)
+        
+        # Leave a partial transfer behind, as an interrupted run would
+        os.replace(output_path, output_path + ".part")
+        with open(output_path + ".part", "r+b") as f:
+            f.truncate(400)
+        with open(output_path + ".manifest.json", "w") as f:
+            json.dump({"partial": {"url": xsd_server.url("test.xsd"), "etag": record["etag"]}}, f)
+        
+        resumed = download_xsd(xsd_server.url("test.xsd"), output_path)
+        
+        assert resumed["status"] == "resumed"
+        assert resumed["bytes_transferred"] == len(content) - 400
+        assert xsd_server.headers[-1]["Range"] == "bytes=400-"
+        assert resumed["sha256"] == record["sha256"]
+        with open(output_path, "rb") as f:
+            assert f.read() == content
+        assert "partial" not in read_manifest(output_path)
+    
+    def leave_partial(self, output_path, url, etag, content):
+        """Leave a partial transfer with the given content behind, as an interrupted run would"""
+        os.remove(output_path)
+        with open(output_path + ".part", "wb") as f:
+            f.write(content)
+        with open(output_path + ".manifest.json", "w") as f:
+            json.dump({"partial": {"url": url, "etag": etag}}, f)
+    
+    def test_complete_partial_download_is_promoted(self, xsd_server, tmp_path):
+        """Test that a .part file holding the whole file is renamed into place after a 416 answer"""
+        content = b"<xml>" + b"x" * 1000 + b"</xml>"
+        (xsd_server.root / "test.xsd").write_bytes(content)
+        output_path = str(tmp_path / "test.xsd")
+        record = download_xsd(xsd_server.url("test.xsd"), output_path)
+        self.leave_partial(output_path, xsd_server.url("test.xsd"), record["etag"], content)
+        
+        resumed = download_xsd(xsd_server.url("test.xsd"), output_path)
+        
+        assert resumed["status"] == "resumed"
+        assert resumed["bytes_transferred"] == 0
+        assert resumed["sha256"] == record["sha256"]
+        assert xsd_server.headers[-1]["Range"] == f"bytes={len(content)}-"
+        assert not os.path.exists(output_path + ".part")
+        with open(output_path, "rb") as f:
+            assert f.read() == content
+        
+        # The promoted file is current: the next run is a conditional request
+        assert download_xsd(xsd_server.url("test.xsd"), output_path)["status"] == "not-modified"
+    
+    def test_oversized_partial_download_is_restarted(self, xsd_server, tmp_path):
+        """Test that a .part file longer than the file is discarded after a 416 answer"""
+        content = b"<xml>" + b"x" * 1000 + b"</xml>"
+        (xsd_server.root / "test.xsd").write_bytes(content)
+        output_path = str(tmp_path / "test.xsd")
+        record = download_xsd(xsd_server.url("test.xsd"), output_path)
+        self.leave_partial(output_path, xsd_server.url("test.xsd"), record["etag"], content + b"garbage")
+        
+        downloaded = download_xsd(xsd_server.url("test.xsd"), output_path)
+        
+        assert downloaded["status"] == "downloaded"
+        assert downloaded["bytes_transferred"] == len(content)
+        assert "Range" not in xsd_server.headers[-1]
+        with open(output_path, "rb") as f:
+            assert f.read() == content
+    
+    def test_transient_errors_are_retried(self, xsd_server, tmp_path):
+        """Test that 503 answers are retried through the session"""
+        (xsd_server.root / "test.xsd").write_bytes(b"<xml/>")
+        xsd_server.failures.extend([503, 503])
+        session = create_session(1, retries=3, backoff_factor=0)
+        
+        record = download_xsd(xsd_server.url("test.xsd"), str(tmp_path / "test.xsd"), session=session)
+        
+        assert record["status"] == "downloaded"
+        assert xsd_server.requests == ["/test.xsd"] * 3
+        session.close()
+    
+    def test_failed_download_keeps_existing_file(self, xsd_server, tmp_path):
+        """Test that the existing file is only replaced by a complete download"""
+        (xsd_server.root / "test.xsd").write_bytes(b"<xml>good</xml>")
+        output_path = str(tmp_path / "test.xsd")
+        download_xsd(xsd_server.url("test.xsd"), output_path)
+        xsd_server.failures.append(500)
+        session = create_session(1, retries=0)
+        
+        with pytest.raises(requests.exceptions.HTTPError):
+            download_xsd(xsd_server.url("test.xsd"), output_path, session=session, force=True)
+        
+        with open(output_path, "rb") as f:
+            assert f.read() == b"<xml>good</xml>"
+        session.close()
     
     def test_ome_xsd_url_format(self):
         """Test that the OME XSD URL is correctly formatted"""
         assert OME_XSD_URL.startswith("https://")
         assert OME_XSD_URL.endswith(".xsd")
-        assert "openmicroscopy.org" in OME_XSD_URL 
\ No newline at end of file
+        assert "openmicroscopy.org" in OME_XSD_URL 
+
+ROOT_XSD = """<?xml version="1.0" encoding="UTF-8"?>
+<xs:schema xmlns:xs="http://www.w3.org/2001/XMLSchema"
+           xmlns:r="http://www.example.org/root"
+           xmlns:o="http://www.example.org/other"
+           targetNamespace="http://www.example.org/root"
+           elementFormDefault="qualified">
+  <xs:include schemaLocation="parts/types.xsd"/>
+  <xs:import namespace="http://www.example.org/other" schemaLocation='{other_url}'/>
+  <xs:element name="Root">
+    <xs:complexType>
+      <xs:sequence>
+        <xs:element ref="o:Other"/>
+      </xs:sequence>
+      <xs:attribute name="Size" type="r:Size"/>
+    </xs:complexType>
+  </xs:element>
+</xs:schema>
+"""
+
+TYPES_XSD = """<?xml version="1.0" encoding="UTF-8"?>
+<xs:schema xmlns:xs="http://www.w3.org/2001/XMLSchema"
+           targetNamespace="http://www.example.org/root">
+  <xs:include schemaLocation="../root.xsd"/>
+  <xs:simpleType name="Size">
+    <xs:restriction base="xs:int"/>
+  </xs:simpleType>
+</xs:schema>
+"""
+
+OTHER_XSD = """<?xml version="1.0" encoding="UTF-8"?>
+<xs:schema xmlns:xs="http://www.w3.org/2001/XMLSchema"
+           targetNamespace="http://www.example.org/other"
+           elementFormDefault="qualified">
+  <xs:include schemaLocation="more.xsd"/>
+  <xs:element name="Other" type="xs:string"/>
+</xs:schema>
+"""
+
+MORE_XSD = """<?xml version="1.0" encoding="UTF-8"?>
+<xs:schema xmlns:xs="http://www.w3.org/2001/XMLSchema"
+           targetNamespace="http://www.example.org/other">
+  <xs:element name="More" type="xs:string"/>
+</xs:schema>
+"""
+
+
+def serve_schemas(server):
+    """Write a schema set with relative, absolute and circular references to the server"""
+    (server.root / "schemas" / "parts").mkdir(parents=True)
+    (server.root / "shared").mkdir()
+    (server.root / "schemas" / "root.xsd").write_text(ROOT_XSD.format(other_url=server.url("shared/other.xsd")))
+    (server.root / "schemas" / "parts" / "types.xsd").write_text(TYPES_XSD)
+    (server.root / "shared" / "other.xsd").write_text(OTHER_XSD)
+    (server.root / "shared" / "more.xsd").write_text(MORE_XSD)
+    return server.url("schemas/root.xsd")
+
+
+class TestMirrorXsd:
+    """Tests for mirroring an XSD and its includes/imports"""
+
+    def test_find_schema_references(self):
+        """Test that include/import locations are found in document order"""
+        content = ROOT_XSD.format(other_url="http://example.com/other.xsd").encode()
+        assert find_schema_references(content) == ["parts/types.xsd", "http://example.com/other.xsd"]
+
+    def test_mirror_xsd(self, xsd_server, tmp_path):
+        """Test that every referenced schema is fetched once and the mirror parses offline"""
+        root_url = serve_schemas(xsd_server)
+        mirror_dir = str(tmp_path / "mirror")
+
+        local_paths = mirror_xsd(root_url, mirror_dir, jobs=4)
+
+        host = f"127.0.0.1_{xsd_server.server_port}"
+        assert local_paths == {
+            root_url: os.path.join(mirror_dir, host, "schemas", "root.xsd"),
+            xsd_server.url("schemas/parts/types.xsd"): os.path.join(mirror_dir, host, "schemas", "parts", "types.xsd"),
+            xsd_server.url("shared/other.xsd"): os.path.join(mirror_dir, host, "shared", "other.xsd"),
+            xsd_server.url("shared/more.xsd"): os.path.join(mirror_dir, host, "shared", "more.xsd"),
+        }
+        assert sorted(xsd_server.requests) == sorted(
+            ["/schemas/root.xsd", "/schemas/parts/types.xsd", "/shared/other.xsd", "/shared/more.xsd"]
+        )
+
+        root_content = open(local_paths[root_url]).read()
+        assert "schemaLocation='../shared/other.xsd'" in root_content
+        assert 'schemaLocation="parts/types.xsd"' in root_content
+        assert root_content.replace("'../shared/other.xsd'", f"'{xsd_server.url('shared/other.xsd')}'") == \
+            ROOT_XSD.format(other_url=xsd_server.url("shared/other.xsd"))
+
+        # The mirror is self-contained: parse it with the server gone
+        xsd_server.shutdown()
+        import xmlschema
+        schema = xmlschema.XMLSchema(local_paths[root_url])
+        assert "Root" in schema.elements
+        assert "{http://www.example.org/other}More" in schema.maps.elements
+
+    def test_mirror_xsd_again_is_conditional(self, xsd_server, tmp_path):
+        """Test that mirroring again revalidates the downloads instead of fetching them in full"""
+        root_url = serve_schemas(xsd_server)
+        mirror_dir = str(tmp_path / "mirror")
+        local_paths = mirror_xsd(root_url, mirror_dir)
+        first_requests = len(xsd_server.requests)
+        (xsd_server.root / "shared" / "more.xsd").write_text(MORE_XSD.replace("More", "Most"))
+
+        records = mirror_schemas({root_url: mirror_dir})[root_url]
+
+        assert {url: record["status"] for url, record in records.items()} == {
+            root_url: "not-modified",
+            xsd_server.url("schemas/parts/types.xsd"): "not-modified",
+            xsd_server.url("shared/other.xsd"): "not-modified",
+            xsd_server.url("shared/more.xsd"): "downloaded",
+        }
+        assert all("If-None-Match" in headers for headers in xsd_server.headers[first_requests:])
+        assert "Most" in open(local_paths[xsd_server.url("shared/more.xsd")]).read()
+        assert "schemaLocation='../shared/other.xsd'" in open(local_paths[root_url]).read()
+
+    def test_mirror_xsd_uses_given_session(self, xsd_server, tmp_path):
+        """Test that all downloads go through the session passed in"""
+        root_url = serve_schemas(xsd_server)
+        session = create_session(2)
+
+        with patch.object(session, "get", wraps=session.get) as get:
+            mirror_xsd(root_url, str(tmp_path / "mirror"), jobs=2, session=session)
+
+        assert get.call_count == 4
+        session.close()
+
+    def test_mirror_xsd_missing_reference(self, xsd_server, tmp_path):
+        """Test that a missing referenced schema fails the mirror"""
+        root_url = serve_schemas(xsd_server)
+        os.remove(xsd_server.root / "shared" / "more.xsd")
+
+        with pytest.raises(requests.exceptions.HTTPError):
+            mirror_xsd(root_url, str(tmp_path / "mirror"))
+
+
+class TestFetchVersions:
+    """Tests for mirroring several OME releases"""
+
+    def serve_releases(self, server, versions):
+        """Write one ome.xsd per release, all importing the same shared schema"""
+        (server.root / "shared").mkdir()
+        (server.root / "shared" / "other.xsd").write_text(OTHER_XSD)
+        (server.root / "shared" / "more.xsd").write_text(MORE_XSD)
+        for version in versions:
+            release = server.root / "OME" / version
+            (release / "parts").mkdir(parents=True)
+            (release / "ome.xsd").write_text(ROOT_XSD.format(other_url=server.url("shared/other.xsd")))
+            (release / "parts" / "types.xsd").write_text(TYPES_XSD.replace("root.xsd", "ome.xsd"))
+        return server.url("OME")
+
+    def test_get_ome_xsd_url_base_url(self):
+        """Test that releases can be fetched from another server"""
+        assert get_ome_xsd_url("2015-01", "http://localhost:8000/OME/") == "http://localhost:8000/OME/2015-01/ome.xsd"
+        assert get_ome_xsd_url("2015-01").endswith("/Schemas/OME/2015-01/ome.xsd")
+
+    def test_fetch_versions(self, xsd_server, tmp_path):
+        """Test that each release is mirrored into its own directory and shared files are fetched once"""
+        versions = ["2015-01", "2016-06"]
+        base_url = self.serve_releases(xsd_server, versions)
+        output_dir = tmp_path / "versions"
+
+        results = fetch_versions(versions, str(output_dir), jobs=4, base_url=base_url)
+
+        assert list(results) == versions
+        for version in versions:
+            records = results[version]
+            assert len(records) == 4
+            root = records[f"{base_url}/{version}/ome.xsd"]
+            assert root["path"] == mirror_path(f"{base_url}/{version}/ome.xsd", str(output_dir / version))
+            assert root["status"] == "downloaded"
+            assert root["size"] == len(ROOT_XSD.format(other_url=xsd_server.url("shared/other.xsd")))
+            for record in records.values():
+                assert os.path.exists(record["path"])
+            with open(output_dir / version / "catalog.json") as f:
+                assert set(json.load(f)["entries"]) == set(records)
+
+        # The shared schemas are downloaded for one release and reused for the other
+        assert xsd_server.requests.count("/shared/other.xsd") == 1
+        assert xsd_server.requests.count("/shared/more.xsd") == 1
+        statuses = [results[version][xsd_server.url("shared/other.xsd")]["status"] for version in versions]
+        assert sorted(statuses) == ["downloaded", "reused"]
+
+    def test_download_summary(self, xsd_server, tmp_path):
+        """Test the per-file summary table"""
+        versions = ["2015-01", "2016-06"]
+        base_url = self.serve_releases(xsd_server, versions)
+        results = fetch_versions(versions, str(tmp_path / "versions"), base_url=base_url)
+
+        lines = format_download_summary(results, elapsed=1.5)
+
+        assert lines[0].split() == ["Version", "File", "Size", "Time", "Status"]
+        assert set(lines[1]) == {"-", " "}
+        assert len(lines) == 2 + 8 + 1
+        assert sum(1 for line in lines if line.startswith("2016-06")) == 4
+        assert lines[-1].startswith("6 files downloaded (")
+        assert lines[-1].endswith("for 2 versions in 1.50s")
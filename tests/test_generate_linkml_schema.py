@@ -3,6 +3,79 @@ import pytest
 import yaml
 from src.generator import generate_linkml_schema
 
+INSTRUMENTS_XSD = """<?xml version="1.0" encoding="UTF-8"?>
+<xs:schema xmlns:xs="http://www.w3.org/2001/XMLSchema"
+           xmlns:i="http://www.example.org/instruments"
+           targetNamespace="http://www.example.org/instruments"
+           elementFormDefault="qualified">
+  <xs:simpleType name="MicroscopeType">
+    <xs:restriction base="xs:string">
+      <xs:enumeration value="Upright"/>
+      <xs:enumeration value="Inverted"/>
+    </xs:restriction>
+  </xs:simpleType>
+  <xs:simpleType name="LaserType">
+    <xs:restriction base="xs:string">
+      <xs:enumeration value="Gas"/>
+      <xs:enumeration value="Dye"/>
+    </xs:restriction>
+  </xs:simpleType>
+  <xs:simpleType name="InstrumentID">
+    <xs:restriction base="xs:string">
+      <xs:pattern value="Instrument:\S+"/>
+    </xs:restriction>
+  </xs:simpleType>
+  <xs:simpleType name="LightSourceID">
+    <xs:restriction base="xs:string">
+      <xs:pattern value="LightSource:\S+"/>
+    </xs:restriction>
+  </xs:simpleType>
+  <xs:element name="Microscope">
+    <xs:complexType>
+      <xs:attribute name="ID" type="i:InstrumentID"/>
+      <xs:attribute name="Type" type="i:MicroscopeType"/>
+      <xs:attribute name="Magnification">
+        <xs:simpleType>
+          <xs:restriction base="xs:int">
+            <xs:minInclusive value="1"/>
+          </xs:restriction>
+        </xs:simpleType>
+      </xs:attribute>
+    </xs:complexType>
+  </xs:element>
+  <xs:element name="Laser">
+    <xs:complexType>
+      <xs:attribute name="ID" type="i:LightSourceID"/>
+      <xs:attribute name="Type" type="i:LaserType"/>
+      <xs:attribute name="Magnification" type="xs:int"/>
+    </xs:complexType>
+  </xs:element>
+  <xs:element name="Arc">
+    <xs:complexType>
+      <xs:attribute name="Type">
+        <xs:simpleType>
+          <xs:restriction base="xs:string">
+            <xs:enumeration value="Hg"/>
+            <xs:enumeration value="Xe"/>
+          </xs:restriction>
+        </xs:simpleType>
+      </xs:attribute>
+    </xs:complexType>
+  </xs:element>
+  <xs:element name="Filament">
+    <xs:complexType>
+      <xs:attribute name="Type">
+        <xs:simpleType>
+          <xs:restriction base="xs:string">
+            <xs:enumeration value="Halogen"/>
+          </xs:restriction>
+        </xs:simpleType>
+      </xs:attribute>
+    </xs:complexType>
+  </xs:element>
+</xs:schema>
+"""
+
 class TestGenerateLinkMLSchema:
     """Tests for generate_linkml_schema function"""
     
@@ -61,6 +134,81 @@ class TestGenerateLinkMLSchema:
         assert "classes" in schema
         assert len(schema["classes"]) > 0
     
+    def test_generate_linkml_schema_enums(self, typed_xsd_path, temp_output_file):
+        """Test that enumerations are emitted once as named LinkML enums"""
+        temp_output_file = temp_output_file.replace('.json', '.yaml')
+        generate_linkml_schema(typed_xsd_path, temp_output_file)
+        
+        with open(temp_output_file, "r") as f:
+            schema = yaml.safe_load(f)
+        
+        # Named simple types become enums keyed by the type name
+        assert list(schema["enums"]["UnitsLength"]["permissible_values"]) == ["m", "cm", "mm"]
+        assert schema["enums"]["UnitsLength"]["description"]
+        
+        # Anonymous enumerations are named after their attribute
+        assert list(schema["enums"]["OrderEnum"]["permissible_values"]) == ["XYZ", "XZY"]
+        
+        # Classes reference the enums by range instead of inlining their values
+        assert schema["classes"]["Stage"]["slot_usage"]["attr_xunit"] == {"range": "UnitsLength"}
+        assert schema["classes"]["Plane"]["slot_usage"]["attr_positionxunit"] == {"range": "UnitsLength"}
+        assert schema["classes"]["Plane"]["slot_usage"]["attr_order"] == {"range": "OrderEnum"}
+        assert schema["slots"]["attr_xunit"]["range"] == "string"
+        assert all("enum_values" not in slot for slot in schema["slots"].values())
+    
+    def test_shared_attribute_enums_are_per_class(self, tmp_path):
+        """Test that classes sharing an attribute name keep their own enumerations"""
+        xsd_path = tmp_path / "instruments.xsd"
+        xsd_path.write_text(INSTRUMENTS_XSD)
+        
+        schema = generate_linkml_schema(str(xsd_path))
+        
+        assert schema["slots"]["attr_type"]["range"] == "string"
+        assert schema["classes"]["Microscope"]["slot_usage"]["attr_type"] == {"range": "MicroscopeType"}
+        assert schema["classes"]["Laser"]["slot_usage"]["attr_type"] == {"range": "LaserType"}
+        assert list(schema["enums"]["MicroscopeType"]["permissible_values"]) == ["Upright", "Inverted"]
+        assert list(schema["enums"]["LaserType"]["permissible_values"]) == ["Gas", "Dye"]
+        
+        # A different anonymous enumeration of an attribute name already used is named after its class
+        assert schema["classes"]["Arc"]["slot_usage"]["attr_type"] == {"range": "TypeEnum"}
+        assert schema["classes"]["Filament"]["slot_usage"]["attr_type"] == {"range": "FilamentTypeEnum"}
+        assert list(schema["enums"]["TypeEnum"]["permissible_values"]) == ["Hg", "Xe"]
+        assert list(schema["enums"]["FilamentTypeEnum"]["permissible_values"]) == ["Halogen"]
+    
+    def test_generate_linkml_schema_facets(self, typed_xsd_path):
+        """Test that slots get ranges and constraints from resolved simple types"""
+        schema = generate_linkml_schema(typed_xsd_path)
+        slots = schema["slots"]
+        usage = schema["classes"]["Stage"]["slot_usage"]
+        
+        assert slots["attr_sizec"]["range"] == "integer"
+        assert usage["attr_sizec"] == {"minimum_value": 1}
+        assert slots["attr_transmittance"]["range"] == "float"
+        assert usage["attr_transmittance"]["maximum_value"] == 1.0
+        assert usage["attr_id"] == {"pattern": "^(?=(?:(urn:lsid:\\S+)|(\\S+:\\S+))$)(?:Stage:\\S+)$"}
+        assert usage["attr_sha1"] == {"pattern": "^[\\s\\S]{40,40}$"}
+        assert usage["attr_bins"] == {"maximum_value": 255}
+        assert usage["attr_physicalsizex"] == {"minimum_value": 0.0}
+        assert usage["attr_indexes"] == {"multivalued": True, "minimum_value": 1}
+        assert slots["attr_indexes"]["range"] == "integer"
+        assert all(slots[slot_name]["range"] != "object" for slot_name in schema["classes"]["Stage"]["slots"])
+        # The shared slots carry no class-specific facets
+        assert all("pattern" not in slot and "minimum_value" not in slot and "multivalued" not in slot
+                   for slot in slots.values())
+    
+    def test_shared_attribute_facets_are_per_class(self, tmp_path):
+        """Test that classes sharing an attribute name keep their own patterns and bounds"""
+        xsd_path = tmp_path / "instruments.xsd"
+        xsd_path.write_text(INSTRUMENTS_XSD)
+        
+        schema = generate_linkml_schema(str(xsd_path))
+        
+        assert "pattern" not in schema["slots"]["attr_id"]
+        assert schema["classes"]["Microscope"]["slot_usage"]["attr_id"] == {"pattern": "^(?:Instrument:\\S+)$"}
+        assert schema["classes"]["Laser"]["slot_usage"]["attr_id"] == {"pattern": "^(?:LightSource:\\S+)$"}
+        assert schema["classes"]["Microscope"]["slot_usage"]["attr_magnification"] == {"minimum_value": 1}
+        assert "attr_magnification" not in schema["classes"]["Laser"]["slot_usage"]
+    
     @pytest.mark.skip(reason="This test uses the full OME XSD and might be slow")
     def test_generate_linkml_schema_ome(self, ome_xsd_path, temp_output_file):
         """Test generating a LinkML schema from the OME XSD file"""
@@ -0,0 +1,156 @@
+import os
+import pytest
+import xml.etree.ElementTree as ElementTree
+from unittest.mock import patch
+from src import id_index as src_id_index
+from src.id_index import IdIndex, build_id_index, get_index_path, load_id_index
+
+
+DOCUMENT = """<?xml version="1.0" encoding="UTF-8"?>
+<OME xmlns="http://www.openmicroscopy.org/Schemas/OME/2016-06"
+     xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance"
+     xmlns:SA="http://www.openmicroscopy.org/Schemas/SA/2016-06" Creator="Zellkern µm">
+  <Dataset ID="Dataset:0" Name="Größe">
+    <ImageRef ID="Image:1"/>
+  </Dataset>
+  <Image ID="Image:0" Name="first">
+    <Description>Tiefe &lt; 5 µm</Description>
+    <Pixels ID="Pixels:0" SizeZ="2">
+      <Channel ID="Channel:0:0"/>
+      <Plane TheZ="0"/>
+      <Plane TheZ="1"/>
+    </Pixels>
+  </Image>
+  <Image ID="Image:1" Name="second">
+    <Pixels ID="Pixels:1" SizeZ="1"><Channel ID="Channel:1:0"/><Plane TheZ="0"/></Pixels>
+  </Image>
+  <SA:StructuredAnnotations>
+    <SA:XMLAnnotation ID="Annotation:0" xsi:type="SA:XMLAnnotation"><SA:Value><Note>n</Note></SA:Value></SA:XMLAnnotation>
+  </SA:StructuredAnnotations>
+</OME>
+"""
+
+IDS = ["Dataset:0", "Image:0", "Pixels:0", "Channel:0:0", "Image:1", "Pixels:1", "Channel:1:0", "Annotation:0"]
+
+
+@pytest.fixture
+def document(tmp_path):
+    """Returns the path of the test document"""
+    xml_file = tmp_path / "image.ome"
+    xml_file.write_text(DOCUMENT, encoding="utf-8")
+    return str(xml_file)
+
+
+class TestIdIndex:
+    """Tests for the byte-offset ID index"""
+
+    def test_offsets(self, document):
+        """Test that the start tag of every element with an ID is indexed by byte offset, references excepted"""
+        index = build_id_index(document)
+
+        assert list(index["offsets"]) == IDS
+        with open(document, "rb") as f:
+            data = f.read()
+        assert data[index["offsets"]["Image:1"]:].startswith(b'<Image ID="Image:1"')
+        assert data[index["offsets"]["Annotation:0"]:].startswith(b'<SA:XMLAnnotation ID="Annotation:0"')
+        assert index["namespaces"] == [[index["offsets"]["Dataset:0"], {
+            "": "http://www.openmicroscopy.org/Schemas/OME/2016-06",
+            "xsi": "http://www.w3.org/2001/XMLSchema-instance",
+            "SA": "http://www.openmicroscopy.org/Schemas/SA/2016-06",
+        }]]
+        assert index["encoding"] == "UTF-8"
+
+    def test_subtrees_match_full_parse(self, document):
+        """Test that every element parsed on its own equals the element of a full parse"""
+        root = ElementTree.parse(document).getroot()
+        with IdIndex.open(document) as index:
+            for element_id in IDS:
+                expected = next(elem for elem in root.iter() if elem.get("ID") == element_id
+                                and not elem.tag.endswith("Ref"))
+                # The text after an element belongs to its parent, which is not parsed
+                expected.tail = None
+                assert ElementTree.tostring(index.get(element_id)) == ElementTree.tostring(expected)
+            with pytest.raises(KeyError):
+                index.get("Image:2")
+
+    def test_settings_references_are_not_indexed(self, tmp_path, caplog):
+        """Test that settings and other elements whose ID points at another element are not indexed"""
+        xml_file = tmp_path / "instrument.ome"
+        xml_file.write_text(
+            '<OME xmlns="http://www.openmicroscopy.org/Schemas/OME/2016-06">'
+            '<Instrument ID="Instrument:0"><Laser ID="LightSource:0"><Pump ID="LightSource:1"/></Laser>'
+            '<Arc ID="LightSource:1"/><Detector ID="Detector:0"/><Objective ID="Objective:0"/></Instrument>'
+            '<ExperimenterGroup ID="ExperimenterGroup:0"><Leader ID="Experimenter:0"/></ExperimenterGroup>'
+            '<Experimenter ID="Experimenter:0"/>'
+            '<Image ID="Image:0"><ObjectiveSettings ID="Objective:0"/><Pixels ID="Pixels:0">'
+            '<Channel ID="Channel:0:0"><LightSourceSettings ID="LightSource:0"/>'
+            '<DetectorSettings ID="Detector:0"/></Channel></Pixels></Image></OME>'
+        )
+
+        with caplog.at_level("WARNING"):
+            with IdIndex.open(str(xml_file)) as index:
+                assert index.get("LightSource:0").tag.endswith("}Laser")
+                assert index.get("Detector:0").tag.endswith("}Detector")
+                assert index.get("Objective:0").tag.endswith("}Objective")
+                assert index.get("Experimenter:0").tag.endswith("}Experimenter")
+                assert len(index) == 10
+        assert "repeat an ID" not in caplog.text
+
+    def test_namespaces_in_scope(self, tmp_path):
+        """Test that declarations made below the root, and rebound prefixes, apply where they are in scope"""
+        xml_file = tmp_path / "scoped.xml"
+        xml_file.write_text(
+            '<root xmlns="urn:a">'
+            '<x:item xmlns:x="urn:x1" ID="first"><x:value/></x:item>'
+            '<x:item xmlns:x="urn:x2" ID="second"><x:value/></x:item>'
+            '<item xmlns="urn:b" ID="third"/>'
+            '<item ID="fourth"/>'
+            '</root>'
+        )
+        root = ElementTree.parse(str(xml_file)).getroot()
+
+        with IdIndex.open(str(xml_file)) as index:
+            assert len(index.namespaces) == 4
+            for element in root:
+                assert ElementTree.tostring(index.get(element.get("ID"))) == ElementTree.tostring(element)
+
+    def test_only_the_subtree_is_parsed(self, tmp_path, document):
+        """Test that an element is returned without parsing the rest of a document, even a truncated one"""
+        truncated = tmp_path / "truncated.ome"
+        truncated.write_bytes(DOCUMENT.encode()[:DOCUMENT.encode().index(b'<Image ID="Image:1"')])
+
+        with IdIndex(str(truncated), build_id_index(document)) as index:
+            assert index.get("Pixels:0").get("SizeZ") == "2"
+            with pytest.raises(ElementTree.ParseError):
+                index.get("Annotation:0")
+
+    def test_index_is_persisted(self, document):
+        """Test that the index is written next to the document and reused while the document is unchanged"""
+        IdIndex.open(document).close()
+        assert os.path.exists(get_index_path(document))
+
+        with patch.object(src_id_index, "build_id_index", side_effect=AssertionError("rebuilt")):
+            with IdIndex.open(document) as index:
+                assert len(index) == 8
+                assert index.get("Channel:1:0").get("ID") == "Channel:1:0"
+
+    def test_stale_index_is_rebuilt(self, document):
+        """Test that an index is rebuilt once the document changes"""
+        IdIndex.open(document).close()
+        with open(document, "w", encoding="utf-8") as f:
+            f.write(DOCUMENT.replace('Name="first"', 'Name="renamed first image"'))
+
+        with pytest.raises(ValueError, match="is stale"):
+            load_id_index(get_index_path(document), document)
+        with IdIndex.open(document) as index:
+            assert index.get("Image:1").get("Name") == "second"
+        assert load_id_index(get_index_path(document), document)["offsets"] == index.offsets
+
+    def test_corrupt_index_is_rebuilt(self, document):
+        """Test that an unreadable index file is replaced"""
+        with open(get_index_path(document), "wb") as f:
+            f.write(b"not an index")
+
+        with IdIndex.open(document) as index:
+            assert "Pixels:1" in index
+        assert load_id_index(get_index_path(document))["offsets"] == index.offsets
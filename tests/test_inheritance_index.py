@@ -0,0 +1,107 @@
+import pytest
+import xmlschema
+from src.inheritance_index import InheritanceIndex
+from src.generator import generate_linkml_schema
+
+INHERITANCE_XSD = """<?xml version="1.0" encoding="UTF-8"?>
+<xs:schema xmlns:xs="http://www.w3.org/2001/XMLSchema"
+           xmlns:t="http://www.example.org/inheritance"
+           targetNamespace="http://www.example.org/inheritance"
+           elementFormDefault="qualified">
+  <xs:complexType name="ManufacturerSpec">
+    <xs:attribute name="Manufacturer" type="xs:string"/>
+  </xs:complexType>
+  <xs:complexType name="LightSource">
+    <xs:complexContent>
+      <xs:extension base="t:ManufacturerSpec">
+        <xs:attribute name="Power" type="xs:float"/>
+      </xs:extension>
+    </xs:complexContent>
+  </xs:complexType>
+  <xs:element name="Laser">
+    <xs:complexType>
+      <xs:complexContent>
+        <xs:extension base="t:LightSource">
+          <xs:attribute name="Wavelength" type="xs:float"/>
+        </xs:extension>
+      </xs:complexContent>
+    </xs:complexType>
+  </xs:element>
+  <xs:element name="LightSourceGroup" type="t:LightSource"/>
+</xs:schema>
+"""
+
+@pytest.fixture
+def inheritance_xsd_path(tmp_path):
+    """Returns the path to a small XSD with a three-level hierarchy"""
+    path = tmp_path / "inheritance.xsd"
+    path.write_text(INHERITANCE_XSD)
+    return str(path)
+
+class TestInheritanceIndex:
+    """Tests for the precomputed inheritance index"""
+
+    def test_topological_order_is_independent_of_input_order(self):
+        """Test that parents always precede children, regardless of dict order"""
+        parents = {"Leaf": "Middle", "Middle": "Base", "Base": None, "Other": None}
+        forward = InheritanceIndex(parents)
+        backward = InheritanceIndex(dict(reversed(list(parents.items()))))
+
+        assert forward.order == backward.order
+        assert forward.order.index("Base") < forward.order.index("Middle") < forward.order.index("Leaf")
+
+    def test_ancestors_and_effective_members(self):
+        """Test ancestors and flattened slots/attributes"""
+        index = InheritanceIndex(
+            {"Base": None, "Middle": "Base", "Leaf": "Middle"},
+            slots={"Base": ["attr_id"], "Middle": ["attr_name", "attr_id"], "Leaf": ["attr_size"]},
+            attributes={"Base": {"ID": "attr_id"}, "Leaf": {"Size": "attr_size"}}
+        )
+
+        assert index.ancestors("Leaf") == ["Middle", "Base"]
+        assert index.ancestors("Base") == []
+        assert index.effective_slots("Leaf") == ["attr_id", "attr_name", "attr_size"]
+        assert index.effective_attributes("Leaf") == {"ID": "attr_id", "Size": "attr_size"}
+
+    def test_missing_parents_and_cycles(self):
+        """Test detection of undefined parents and inheritance cycles"""
+        index = InheritanceIndex({"A": "B", "B": "A", "C": "Undefined"})
+
+        assert index.missing_parents == {"C": "Undefined"}
+        assert index.cycles
+        assert set(index.order) == {"A", "B", "C"}
+        assert "A" not in index.ancestors("A")
+        assert index.effective_slots("A") == []
+
+    def test_from_xsd(self, inheritance_xsd_path):
+        """Test building the index from an XSD"""
+        index = InheritanceIndex.from_xsd(xmlschema.XMLSchema(inheritance_xsd_path))
+
+        assert index.parent("LightSource") == "ManufacturerSpec"
+        assert index.parent("Laser") == "LightSource"
+        assert index.parent("LightSourceGroup") == "LightSource"
+        assert index.ancestors("Laser") == ["LightSource", "ManufacturerSpec"]
+
+    def test_from_linkml(self):
+        """Test building the index from a LinkML schema"""
+        index = InheritanceIndex.from_linkml({
+            "classes": {
+                "Child": {"is_a": "Parent", "slots": ["attr_b"]},
+                "Parent": {"slots": ["attr_a"]}
+            }
+        })
+
+        assert index.order == ["Parent", "Child"]
+        assert index.effective_slots("Child") == ["attr_a", "attr_b"]
+
+    def test_generator_sets_is_a(self, inheritance_xsd_path):
+        """Test that the generator emits is_a and flattened slots"""
+        schema = generate_linkml_schema(inheritance_xsd_path)
+        classes = schema["classes"]
+
+        assert classes["LightSource"]["is_a"] == "ManufacturerSpec"
+        assert classes["Laser"]["is_a"] == "LightSource"
+        assert classes["LightSourceGroup"]["is_a"] == "LightSource"
+        assert "attr_wavelength" in classes["Laser"]["slots"]
+        assert "attr_power" in classes["Laser"]["slots"]
+        assert list(classes).index("LightSource") < list(classes).index("Laser")
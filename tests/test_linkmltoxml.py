@@ -0,0 +1,110 @@
+import io
+import json
+import datetime
+import pytest
+import yaml
+import xml.etree.ElementTree as ElementTree
+from src.xmltolinkml import iter_instance_records
+from src.linkmltoxml import OME_NAMESPACE, OmeXmlWriter, write_instance, write_instance_file
+
+
+RECORDS = [
+    {
+        "@type": "Image", "attr_id": "Image:0", "attr_name": 'Cells & "nuclei" <1>',
+        "AcquisitionDate": "2020-01-01T00:00:00",
+        "Description": "A test image",
+        "Pixels": [{
+            "@type": "Pixels", "attr_id": "Pixels:0", "attr_sizez": 2, "attr_bigendian": False,
+            "MetadataOnly": [{"@type": "MetadataOnly"}],
+            "Plane": [
+                {"@type": "Plane", "attr_thez": 0, "attr_deltat": 0.5},
+                {"@type": "Plane", "attr_thez": 1, "attr_deltat": "n/a"},
+            ],
+        }],
+    },
+    {
+        "@type": "ROI", "attr_id": "ROI:0",
+        "Union": [{
+            "@type": "Union",
+            "Label": [{"@type": "Label", "attr_id": "Shape:0", "attr_x": 1.5, "value": "Text & more"}],
+        }],
+    },
+]
+
+
+class TestOmeXmlWriter:
+    """Tests for writing LinkML instances as OME-XML"""
+
+    def test_round_trip(self, mapping):
+        """Test that converting the written document gives back the records"""
+        stream = io.BytesIO()
+        writer = write_instance(RECORDS, stream, mapping, root_attributes={"Creator": "test"})
+
+        assert (writer.records, writer.elements) == (2, 11)
+        root = ElementTree.fromstring(stream.getvalue())
+        assert root.tag == f"{{{OME_NAMESPACE}}}OME"
+        assert root.attrib == {"Creator": "test"}
+        assert list(iter_instance_records(io.BytesIO(stream.getvalue()), mapping)) == RECORDS
+
+    def test_attributes_and_text(self, mapping):
+        """Test that slots become attributes and text is written, escaped where needed"""
+        stream = io.StringIO()
+        write_instance(RECORDS, stream, mapping, namespace=None)
+        document = stream.getvalue()
+
+        assert document.startswith('<?xml version="1.0" encoding="UTF-8"?>\n<OME>\n')
+        assert '<Image ID="Image:0" Name=\'Cells &amp; "nuclei" &lt;1&gt;\'>' in document
+        assert '<Pixels ID="Pixels:0" SizeZ="2" BigEndian="false"><MetadataOnly/>' in document
+        assert '<Plane TheZ="1" DeltaT="n/a"/>' in document
+        assert '<Label ID="Shape:0" X="1.5">Text &amp; more</Label>' in document
+        assert document.endswith("</ROI>\n</OME>\n")
+
+    def test_unmapped_slots_and_untyped_records(self, mapping, caplog):
+        """Test that slots without an XML attribute are skipped and records must name their class"""
+        stream = io.StringIO()
+        with OmeXmlWriter(stream, mapping) as writer:
+            writer.write({"@type": "Plane", "attr_thez": 3, "attr_custom": 1})
+            writer.write({"@type": "Plane", "attr_thez": 4, "attr_custom": 2})
+            with pytest.raises(ValueError, match="Record 3 has no @type"):
+                writer.write({"attr_id": "Image:1"})
+
+        assert '<Plane TheZ="3"/>\n<Plane TheZ="4"/>' in stream.getvalue()
+        assert caplog.text.count("Skipping Plane.attr_custom") == 1
+
+    def test_scalar_text_children(self, mapping):
+        """Test that non-string values of text-only children are written as text"""
+        stream = io.StringIO()
+        with OmeXmlWriter(stream, mapping, namespace=None) as writer:
+            writer.write({"@type": "Image", "AcquisitionDate": datetime.datetime(2020, 1, 1, 12, 30),
+                          "Count": 3, "Flag": [True, 1.5]})
+
+        assert ('<Image><AcquisitionDate>2020-01-01T12:30:00</AcquisitionDate><Count>3</Count>'
+                '<Flag>true</Flag><Flag>1.5</Flag></Image>') in stream.getvalue()
+
+    @pytest.mark.parametrize("input_format", ["jsonl", "yaml"])
+    def test_write_instance_file(self, tmp_path, mapping, input_format):
+        """Test that JSON Lines and YAML record files are written as one document"""
+        records_file = tmp_path / f"records.{input_format}"
+        if input_format == "yaml":
+            records_file.write_text(yaml.safe_dump_all(RECORDS, explicit_start=True))
+        else:
+            records_file.write_text("".join(json.dumps(record) + "\n" for record in RECORDS))
+        output_file = tmp_path / "image.ome"
+
+        assert write_instance_file([str(records_file)] * 2, str(output_file), mapping, input_format) == 4
+
+        with open(output_file, "rb") as f:
+            assert list(iter_instance_records(f, mapping)) == RECORDS * 2
+        assert not (tmp_path / "image.ome.tmp").exists()
+
+    def test_failed_write_leaves_no_document(self, tmp_path, mapping):
+        """Test that a document is not left behind when a record cannot be written"""
+        records_file = tmp_path / "records.jsonl"
+        records_file.write_text(json.dumps(RECORDS[0]) + "\n" + '{"attr_id": "ROI:1"}\n')
+        output_file = tmp_path / "image.ome"
+
+        with pytest.raises(ValueError):
+            write_instance_file([str(records_file)], str(output_file), mapping)
+
+        assert not output_file.exists()
+        assert not (tmp_path / "image.ome.tmp").exists()
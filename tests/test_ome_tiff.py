@@ -0,0 +1,173 @@
+import io
+import os
+import struct
+import pytest
+import xmlschema
+from src.ome_tiff import TiffFormatError, read_image_description, extract_ome_xml_files, find_tiff_files
+from src.validate_instance import validate_instance_file, find_instance_files
+from src.xmltolinkml import InstanceMapping, convert_instance_file
+
+
+OME_XML = ('<?xml version="1.0" encoding="UTF-8"?>\n'
+           '<OME xmlns="http://www.example.org/ome">\n'
+           '  <Image ID="Image:0" Name="Zellkern µm"/>\n'
+           '</OME>\n')
+
+OME_XSD = """<?xml version="1.0" encoding="UTF-8"?>
+<xs:schema xmlns:xs="http://www.w3.org/2001/XMLSchema"
+           targetNamespace="http://www.example.org/ome" elementFormDefault="qualified">
+  <xs:element name="OME">
+    <xs:complexType>
+      <xs:sequence>
+        <xs:element name="Image" maxOccurs="unbounded">
+          <xs:complexType>
+            <xs:attribute name="ID" type="xs:string" use="required"/>
+            <xs:attribute name="Name" type="xs:string"/>
+          </xs:complexType>
+        </xs:element>
+      </xs:sequence>
+    </xs:complexType>
+  </xs:element>
+</xs:schema>
+"""
+
+
+def write_tiff(path, description=None, bigtiff=False, byte_order="<", pixel_bytes=64, pixel_gap=0):
+    """
+    Write a one-strip grayscale TIFF: header, pixel data, description, then the first IFD.
+
+    pixel_gap leaves a hole of that many bytes before the description, so
+    multi-gigabyte files can be made as sparse files.
+    """
+    header_size, value_size = (16, 8) if bigtiff else (8, 4)
+    pixels_offset = header_size
+    description_bytes = description.encode() + b"\0" if description is not None else b""
+    if len(description_bytes) <= value_size:
+        # Short values are stored in the IFD entry itself
+        description_value, description_bytes = description_bytes.ljust(value_size, b"\0"), b""
+    description_offset = pixels_offset + pixel_bytes + pixel_gap
+    ifd_offset = description_offset + len(description_bytes)
+    ifd_offset += ifd_offset % 2
+
+    value_format = "Q" if bigtiff else "I"
+    entries = [(256, 4, 1, 8), (257, 4, 1, pixel_bytes // 8), (258, 3, 1, 8), (273, 4, 1, pixels_offset),
+               (279, 4, 1, pixel_bytes)]
+    if description is not None:
+        entries.append((270, 2, len(description.encode()) + 1,
+                        description_offset if description_bytes else description_value))
+    entries.sort()
+
+    with open(path, "wb") as f:
+        if bigtiff:
+            f.write(struct.pack(byte_order + "2sHHHQ", b"II" if byte_order == "<" else b"MM", 43, 8, 0, ifd_offset))
+        else:
+            f.write(struct.pack(byte_order + "2sHI", b"II" if byte_order == "<" else b"MM", 42, ifd_offset))
+        f.write(b"\x7f" * pixel_bytes)
+        f.seek(description_offset)
+        f.write(description_bytes)
+        f.seek(ifd_offset)
+        f.write(struct.pack(byte_order + ("Q" if bigtiff else "H"), len(entries)))
+        for tag, field_type, count, value in entries:
+            if isinstance(value, bytes):
+                f.write(struct.pack(byte_order + "HH" + value_format, tag, field_type, count) + value)
+            elif field_type == 3 and not bigtiff:
+                # SHORT values are left-justified in the value field
+                f.write(struct.pack(byte_order + "HHIHH", tag, field_type, count, value, 0))
+            elif field_type == 3:
+                f.write(struct.pack(byte_order + "HHQHHI", tag, field_type, count, value, 0, 0))
+            else:
+                f.write(struct.pack(byte_order + "HH" + value_format * 2, tag, field_type, count, value))
+        f.write(struct.pack(byte_order + value_format, 0))
+    return str(path)
+
+
+class TestReadImageDescription:
+    """Tests for reading the ImageDescription of TIFF and BigTIFF files"""
+
+    @pytest.mark.parametrize("bigtiff", [False, True])
+    @pytest.mark.parametrize("byte_order", ["<", ">"])
+    def test_description(self, tmp_path, bigtiff, byte_order):
+        """Test that the description is read from little- and big-endian TIFF and BigTIFF files"""
+        tiff_file = write_tiff(tmp_path / "image.ome.tif", OME_XML, bigtiff, byte_order)
+        assert read_image_description(tiff_file) == OME_XML.encode()
+
+    @pytest.mark.parametrize("bigtiff", [False, True])
+    def test_short_description_in_entry(self, tmp_path, bigtiff):
+        """Test that a description short enough to be stored in its IFD entry is read from there"""
+        tiff_file = write_tiff(tmp_path / "image.tif", "ab", bigtiff)
+        assert read_image_description(tiff_file) == b"ab"
+
+    def test_multi_gigabyte_bigtiff(self, tmp_path):
+        """Test that a 5 GB BigTIFF is read without reading its pixel data"""
+        tiff_file = write_tiff(tmp_path / "large.ome.btf", OME_XML, bigtiff=True, pixel_gap=5 * 2 ** 30)
+        assert os.path.getsize(tiff_file) > 5 * 2 ** 30
+        assert read_image_description(tiff_file) == OME_XML.encode()
+
+    def test_missing_description(self, tmp_path):
+        """Test that a TIFF without a description has None"""
+        assert read_image_description(write_tiff(tmp_path / "plain.tif")) is None
+
+    @pytest.mark.parametrize("content, message", [
+        (b"", "is empty"),
+        (b"<OME/>\n", "too short"),
+        (b"GIF89a\0\0\0\0", "not a TIFF file"),
+        (b"II*\0\xff\xff\0\0", "beyond the end of the file"),
+        (b"II*\0\x08\0\0\0\x09\0", "truncated"),
+        (b"II+\0\x04\0\0\0\x10\0\0\0\0\0\0\0", "invalid BigTIFF header"),
+    ])
+    def test_damaged_files(self, tmp_path, content, message):
+        """Test that files that are not TIFF files or have a damaged first IFD raise TiffFormatError"""
+        tiff_file = tmp_path / "damaged.tif"
+        tiff_file.write_bytes(content)
+        with pytest.raises(TiffFormatError, match=message):
+            read_image_description(str(tiff_file))
+
+
+class TestOmeTiffFiles:
+    """Tests for extracting, validating and converting the OME-XML of OME-TIFF files"""
+
+    def write_store(self, tmp_path):
+        """Write a directory tree of OME-TIFF files, one of them without a description"""
+        (tmp_path / "store" / "plate1").mkdir(parents=True)
+        (tmp_path / "store" / "plate2").mkdir()
+        for i in range(4):
+            write_tiff(tmp_path / "store" / "plate1" / f"well{i}.ome.tif", OME_XML.replace("Image:0", f"Image:{i}"))
+            write_tiff(tmp_path / "store" / "plate2" / f"well{i}.ome.btf", OME_XML, bigtiff=True, byte_order=">")
+        write_tiff(tmp_path / "store" / "plate2" / "thumbnail.tif")
+        (tmp_path / "store" / "plate2" / "notes.txt").write_text("not an image")
+        return str(tmp_path / "store")
+
+    @pytest.mark.parametrize("jobs", [1, 2])
+    def test_extract_ome_xml_files(self, tmp_path, jobs):
+        """Test that every TIFF of a directory tree is extracted, serially or in a pool"""
+        store = self.write_store(tmp_path)
+        output_dir = tmp_path / "xml"
+
+        results = extract_ome_xml_files([store], str(output_dir), jobs)
+
+        assert list(results) == [tiff_file for tiff_file, _ in find_tiff_files([store])]
+        assert len(results) == 9
+        assert results[f"{store}/plate2/thumbnail.tif"] == (0, f"{store}/plate2/thumbnail.tif has no ImageDescription")
+        assert (output_dir / "plate1" / "well3.ome.xml").read_text() == OME_XML.replace("Image:0", "Image:3")
+        assert (output_dir / "plate2" / "well0.ome.xml").read_bytes() == OME_XML.encode()
+        assert not (output_dir / "plate2" / "thumbnail.xml").exists()
+
+    def test_validate_and_convert(self, tmp_path):
+        """Test that validation and conversion read the OME-XML of TIFF files found in directories"""
+        store = self.write_store(tmp_path)
+        xsd_path = tmp_path / "ome.xsd"
+        xsd_path.write_text(OME_XSD)
+        schema = xmlschema.XMLSchema(str(xsd_path))
+
+        instance_files = find_instance_files([store])
+
+        assert len(instance_files) == 9
+        assert validate_instance_file(f"{store}/plate2/well1.ome.btf", schema) == (True, [])
+        assert validate_instance_file(f"{store}/plate2/thumbnail.tif", schema) == (
+            False, [f"{store}/plate2/thumbnail.tif has no ImageDescription"]
+        )
+        mapping = InstanceMapping({"classes": {"Image": {"attributes": {"ID": "attr_id", "Name": "attr_name"}}},
+                                   "slots": {"attr_id": {"range": "string"}, "attr_name": {"range": "string"}}})
+        stream = io.StringIO()
+        assert convert_instance_file(f"{store}/plate1/well2.ome.tif", mapping, stream) == 1
+        assert stream.getvalue() == '{"@type":"Image","attr_id":"Image:2","attr_name":"Zellkern µm"}\n'
@@ -0,0 +1,86 @@
+import os
+import pytest
+from unittest.mock import patch
+from src import pipeline
+from src import validate_schema as src_validate_schema
+
+
+class TestPipeline:
+    """Tests for the in-process generate -> validate pipeline"""
+
+    @pytest.mark.parametrize("partition", [True, False])
+    def test_pipeline_matches_directory_validation(self, typed_xsd_path, tmp_path, partition):
+        """Test that validating in-memory schemas gives the same results as validating the files"""
+        output_dir = tmp_path / "schemas"
+        output_path = str(output_dir) if partition else str(output_dir / "ome.yaml")
+
+        with patch.object(src_validate_schema, "JsonSchemaValidator", None):
+            results = pipeline.generate_and_validate(typed_xsd_path, output_path, partition=partition, jobs=2)
+            from_disk = src_validate_schema.validate_schema_directory(str(output_dir))
+
+        assert results
+        assert list(results) == sorted(results)
+        assert results == from_disk
+        assert all(os.path.exists(file_path) for file_path in results)
+
+    def test_pipeline_report(self, typed_xsd_path, tmp_path):
+        """Test that the pipeline writes the same report as a separate validation run"""
+        output_dir = tmp_path / "schemas"
+        report_file = tmp_path / "report.md"
+
+        with patch.object(src_validate_schema, "JsonSchemaValidator", None):
+            results = pipeline.generate_and_validate(typed_xsd_path, str(output_dir), jobs=1,
+                                                     report_file=str(report_file))
+
+        with patch("builtins.print"):
+            assert report_file.read_text() == src_validate_schema.generate_validation_report(results)
+
+
+class TestInMemoryValidation:
+    """Tests for validating schema dictionaries without a YAML round trip"""
+
+    def test_validate_schema_dict_matches_file(self, typed_xsd_path, tmp_path):
+        """Test that a generated dict validates exactly like its YAML file"""
+        from src.generator import generate_linkml_schema
+        output_file = str(tmp_path / "ome.yaml")
+        schema = generate_linkml_schema(typed_xsd_path, output_file)
+        schema["slots"]["attr_broken"] = {"range": "UndefinedType"}
+        schema["classes"]["Stage"]["slots"].append("attr_missing")
+
+        with patch.object(src_validate_schema, "JsonSchemaValidator", None):
+            in_memory = src_validate_schema.validate_schema_dict(schema, name=output_file)
+            import yaml
+            with open(output_file, "w") as f:
+                yaml.dump(schema, f, sort_keys=False)
+            from_file = src_validate_schema.validate_schema_file(output_file)
+
+        assert in_memory == from_file
+        assert in_memory[0] is False
+        assert "Slot attr_broken references undefined range UndefinedType" in in_memory[1]
+        assert "Class Stage references undefined slot attr_missing" in in_memory[1]
+
+    def test_validate_schema_dicts(self):
+        """Test batch validation of schema dictionaries"""
+        schemas = {
+            "valid": {"id": "https://w3id.org/ome/valid", "name": "valid"},
+            "invalid": {"classes": {"A": {"is_a": "Missing"}}},
+            "empty": None,
+            "list": ["not", "a", "mapping"],
+        }
+
+        # Only the structural checks: the metamodel check depends on the installed linkml-runtime
+        with patch.object(src_validate_schema, "_run_linkml_validator", return_value=[]):
+            serial = src_validate_schema.validate_schema_dicts(schemas)
+            parallel = src_validate_schema.validate_schema_dicts(schemas, jobs=2)
+
+        assert serial == parallel
+        assert list(serial) == list(schemas)
+        assert serial["valid"] == (True, [])
+        assert serial["invalid"] == (False, [
+            "Missing 'id' field in schema: invalid",
+            "Missing 'name' field in schema: invalid",
+            "Class A references undefined parent class Missing",
+        ])
+        assert serial["empty"] == (False, ["Invalid or empty YAML: empty"])
+        assert serial["list"] == (False, ["Schema in list is not a mapping"])
+        assert schemas["invalid"] == {"classes": {"A": {"is_a": "Missing"}}}
@@ -0,0 +1,105 @@
+import os
+import pytest
+import yaml
+from src.schema_bundle import (
+    write_schema_bundle,
+    load_schema_bundle,
+    load_schema,
+    build_ancestor_index,
+    build_class_slot_index,
+)
+from src.generator import generate_linkml_schema
+
+BUNDLE_XSD = """<?xml version="1.0" encoding="UTF-8"?>
+<xs:schema xmlns:xs="http://www.w3.org/2001/XMLSchema"
+           targetNamespace="http://www.example.org/bundle"
+           xmlns="http://www.example.org/bundle"
+           elementFormDefault="qualified">
+  <xs:element name="Sample">
+    <xs:complexType>
+      <xs:attribute name="ID" type="xs:string" use="required"/>
+      <xs:attribute name="Count" type="xs:int"/>
+    </xs:complexType>
+  </xs:element>
+</xs:schema>
+"""
+
+@pytest.fixture
+def linkml_schema():
+    """Returns a small LinkML schema dictionary with inheritance"""
+    return {
+        "id": "https://w3id.org/linkml/test",
+        "name": "test",
+        "classes": {
+            "Base": {"slots": ["attr_id"]},
+            "Middle": {"is_a": "Base", "slots": ["attr_id", "attr_name"]},
+            "Leaf": {"is_a": "Middle", "slots": []}
+        },
+        "slots": {
+            "attr_id": {"range": "string"},
+            "attr_name": {"range": "string"}
+        }
+    }
+
+class TestSchemaBundle:
+    """Tests for compiled schema bundles"""
+
+    def test_indexes(self, linkml_schema):
+        """Test the class -> slots and ancestor indexes"""
+        assert build_class_slot_index(linkml_schema)["Middle"] == ["attr_id", "attr_name"]
+
+        ancestors = build_ancestor_index(linkml_schema)
+        assert ancestors["Leaf"] == ["Middle", "Base"]
+        assert ancestors["Base"] == []
+
+    def test_round_trip(self, linkml_schema, tmp_path):
+        """Test writing and loading a bundle"""
+        yaml_path = tmp_path / "test.yaml"
+        yaml_path.write_text(yaml.dump(linkml_schema))
+        bundle_path = str(tmp_path / "test.bundle")
+
+        write_schema_bundle(linkml_schema, [str(yaml_path)], bundle_path)
+        bundle = load_schema_bundle(bundle_path)
+
+        assert bundle["schema"] == linkml_schema
+        assert bundle["class_slots"]["Base"] == ["attr_id"]
+        assert bundle["ancestors"]["Leaf"] == ["Middle", "Base"]
+
+    def test_stale_bundle_rejected(self, linkml_schema, tmp_path):
+        """Test that a bundle is rejected once its YAML changes"""
+        yaml_path = tmp_path / "test.yaml"
+        yaml_path.write_text(yaml.dump(linkml_schema))
+        bundle_path = str(tmp_path / "test.bundle")
+        write_schema_bundle(linkml_schema, [str(yaml_path)], bundle_path)
+
+        yaml_path.write_text(yaml.dump({"name": "changed"}))
+
+        with pytest.raises(ValueError, match="stale"):
+            load_schema_bundle(bundle_path)
+
+        # Without verification the bundle still loads
+        assert load_schema_bundle(bundle_path, verify=False)["schema"] == linkml_schema
+
+        # load_schema falls back to the YAML
+        assert load_schema(str(yaml_path)) == {"name": "changed"}
+
+    def test_invalid_bundle(self, tmp_path):
+        """Test that a file without the bundle header is rejected"""
+        bundle_path = tmp_path / "bogus.bundle"
+        bundle_path.write_bytes(b"not a bundle")
+
+        with pytest.raises(ValueError):
+            load_schema_bundle(str(bundle_path))
+
+    def test_generate_with_bundle(self, tmp_path):
+        """Test that the generator writes a bundle matching its YAML output"""
+        xsd_path = tmp_path / "bundle.xsd"
+        xsd_path.write_text(BUNDLE_XSD)
+        output_path = str(tmp_path / "bundle.yaml")
+
+        schema = generate_linkml_schema(str(xsd_path), output_path, bundle=True)
+
+        bundle_path = str(tmp_path / "bundle.bundle")
+        assert os.path.exists(bundle_path)
+        assert load_schema_bundle(bundle_path)["schema"] == schema
+        assert load_schema(output_path) == schema
@@ -0,0 +1,96 @@
+import yaml
+from src.schema_index import SchemaCollectionIndex, structural_hash
+
+
+def write_schema(directory, name, schema):
+    """Write a schema dictionary as YAML and return its path"""
+    path = directory / f"{name}.yaml"
+    path.write_text(yaml.dump(schema, sort_keys=False))
+    return str(path)
+
+
+COMMON_SLOT = {"description": "Identifier", "range": "string"}
+
+
+class TestSchemaCollectionIndex:
+    """Tests for the global class/slot index of a schema directory"""
+
+    def test_structural_hash_ignores_key_order(self):
+        """Test that key order does not change the structural hash"""
+        assert structural_hash({"a": 1, "b": [1, 2]}) == structural_hash({"b": [1, 2], "a": 1})
+        assert structural_hash({"a": 1}) != structural_hash({"a": 2})
+
+    def test_identical_definitions_are_shared(self, tmp_path):
+        """Test that copies of a definition collapse to one distinct entry"""
+        paths = [
+            write_schema(tmp_path, name, {
+                "id": f"https://w3id.org/ome/{name}",
+                "name": name,
+                "classes": {name: {"slots": ["attr_id"]}},
+                "slots": {"attr_id": dict(COMMON_SLOT)}
+            })
+            for name in ["Image", "Pixels", "Plane"]
+        ]
+        index, parse_errors = SchemaCollectionIndex.from_files(paths)
+
+        assert parse_errors == {}
+        assert list(index.definitions["slots"]["attr_id"].values()) == [paths]
+        assert index.statistics() == {"files": 3, "definitions": 6, "distinct": 2, "conflicts": 0}
+        assert index.conflicts() == {}
+
+    def test_conflicts_and_imports(self, tmp_path):
+        """Test conflict detection and local import resolution"""
+        core = write_schema(tmp_path, "core", {
+            "id": "https://w3id.org/ome/core", "name": "core",
+            "slots": {"attr_id": dict(COMMON_SLOT)}
+        })
+        image = write_schema(tmp_path, "Image", {
+            "id": "https://w3id.org/ome/Image", "name": "Image",
+            "imports": ["linkml:types", "core", "missing"],
+            "classes": {"Image": {"slots": ["attr_id"]}},
+            "slots": {"attr_id": {"range": "integer"}}
+        })
+        broken = tmp_path / "broken.yaml"
+        broken.write_text("classes: [unclosed\n")
+
+        index, parse_errors = SchemaCollectionIndex.from_files([core, image, str(broken)])
+
+        assert list(parse_errors) == [str(broken)]
+        assert index.imports[image] == [core]
+        assert index.dangling_imports == {image: ["missing"]}
+        assert "attr_id" in index.scope(image)["slots"]
+        assert index.conflicts() == {
+            image: [f"Slot attr_id has 2 different definitions: in {core}; in {image}"],
+        }
+
+    def test_conflicts_are_reported_once_per_name(self, tmp_path):
+        """Test that a name with several variants gives one message, on a file not using the common one"""
+        paths = [
+            write_schema(tmp_path, f"schema{i}", {
+                "id": f"https://w3id.org/ome/schema{i}", "name": f"schema{i}",
+                "slots": {"attr_id": {"range": ["string", "integer", "string", "float", "string"][i]}}
+            })
+            for i in range(5)
+        ]
+
+        index, _ = SchemaCollectionIndex.from_files(paths)
+
+        assert index.conflicts() == {
+            paths[1]: [f"Slot attr_id has 3 different definitions: in {paths[0]} and 2 other files; "
+                       f"in {paths[1]}; in {paths[3]}"],
+        }
+        assert index.statistics()["conflicts"] == 1
+
+    def test_distinct_definitions_per_section(self, tmp_path):
+        """Test that equal definitions in different sections are distinct definitions"""
+        path = write_schema(tmp_path, "schema", {
+            "id": "https://w3id.org/ome/schema", "name": "schema",
+            "classes": {"Image": {"description": "An image"}},
+            "slots": {"attr_image": {"description": "An image"}}
+        })
+
+        index, _ = SchemaCollectionIndex.from_files([path])
+
+        assert set(index.distinct) == {("classes", structural_hash({"description": "An image"})),
+                                       ("slots", structural_hash({"description": "An image"}))}
+        assert index.statistics()["distinct"] == 2
@@ -0,0 +1,171 @@
+import pytest
+import yaml
+from unittest.mock import patch
+from src.compact_yaml import dump_compact
+from src.schema_stream import load_schema_skeleton, UnsupportedYAMLFeature
+from src import validate_schema as src_validate_schema
+
+
+LONG_DESCRIPTION = "A description that is long enough to be written once and aliased. " * 3
+
+INVALID_SCHEMA = {
+    "id": "https://w3id.org/ome/test",
+    "description": LONG_DESCRIPTION,
+    "classes": {
+        "Image": {"description": LONG_DESCRIPTION, "is_a": "Base", "slots": ["attr_id", "attr_missing"]},
+        "Base": {"description": LONG_DESCRIPTION, "slots": ["attr_id", "attr_missing"]},
+        "Loop": {"is_a": "Loop"},
+        "Text": "not a dictionary",
+        "Listed": {"slots": "attr_id"},
+    },
+    "slots": {
+        "attr_id": {"description": LONG_DESCRIPTION, "range": "string"},
+        "attr_ref": {"range": "Undefined"},
+        "attr_bad": ["not", "a", "dictionary"],
+    },
+    "types": {"Custom": {"base": "str", "description": LONG_DESCRIPTION}},
+}
+
+
+class TestSchemaSkeleton:
+    """Tests for the event-streaming schema skeleton loader"""
+
+    def test_skeleton_keeps_only_names_and_references(self):
+        """Test that descriptions and other fields are left out"""
+        skeleton = load_schema_skeleton(yaml.dump(INVALID_SCHEMA, sort_keys=False))
+
+        assert skeleton == {
+            "id": None,
+            "description": None,
+            "classes": {
+                "Image": {"is_a": "Base", "slots": ["attr_id", "attr_missing"]},
+                "Base": {"slots": ["attr_id", "attr_missing"]},
+                "Loop": {"is_a": "Loop"},
+                "Text": None,
+                "Listed": {"slots": "attr_id"},
+            },
+            "slots": {
+                "attr_id": {"range": "string"},
+                "attr_ref": {"range": "Undefined"},
+                "attr_bad": None,
+            },
+            "types": {"Custom": None},
+        }
+
+    def test_aliases_are_expanded(self):
+        """Test that aliased definitions and slot lists are read where they are used"""
+        document = (
+            "classes:\n"
+            "  A: &cls\n"
+            "    is_a: B\n"
+            "    slots: &slots [x, y]\n"
+            "  B: {slots: *slots, attributes: {a: &slot {range: A}}}\n"
+            "  C: *cls\n"
+            "slots:\n"
+            "  x: *slot\n"
+        )
+        assert load_schema_skeleton(document) == {
+            "classes": {
+                "A": {"is_a": "B", "slots": ["x", "y"]},
+                "B": {"slots": ["x", "y"]},
+                "C": {"is_a": "B", "slots": ["x", "y"]},
+            },
+            "slots": {"x": {"range": "A"}},
+        }
+
+    @pytest.mark.parametrize("document", [
+        "a: [1",
+        "a: *missing",
+        "a: &x 1\nb: &x 2",
+        "a: 1\n---\nb: 2",
+        "a: !!timestamp nope",
+    ])
+    def test_errors_match_safe_load(self, document):
+        """Test that invalid YAML fails with the same error as yaml.safe_load"""
+        with pytest.raises(Exception) as expected:
+            yaml.safe_load(document)
+        with pytest.raises(type(expected.value)) as actual:
+            load_schema_skeleton(document)
+        assert str(actual.value) == str(expected.value)
+
+    @pytest.mark.parametrize("document", ["", "~", "just text", "[1, 2]"])
+    def test_non_mapping_documents(self, document):
+        """Test that empty and non-mapping documents keep their type"""
+        loaded = yaml.safe_load(document)
+        skeleton = load_schema_skeleton(document)
+        assert type(skeleton) is type(loaded)
+        assert bool(skeleton) == bool(loaded)
+
+    @pytest.mark.parametrize("document", [
+        "base: &b {range: string}\nslots:\n  s:\n    <<: *b\n",
+        "? [a, b]\n: c\n",
+        "a: &a [*a]\n",
+        "a: !!set {x: null}\n",
+    ])
+    def test_unsupported_features(self, document):
+        """Test that documents the skeleton cannot reproduce are refused"""
+        with pytest.raises(UnsupportedYAMLFeature):
+            load_schema_skeleton(document)
+
+
+class TestStreamingValidation:
+    """Tests for stream_validate_schema_file"""
+
+    @pytest.mark.parametrize("compact", [False, True])
+    def test_same_errors_as_validate_schema_file(self, tmp_path, compact):
+        """Test that streaming validation reports exactly the errors of full validation"""
+        schema_file = tmp_path / "schema.yaml"
+        with open(schema_file, "w") as f:
+            if compact:
+                dump_compact(INVALID_SCHEMA, f)
+            else:
+                yaml.dump(INVALID_SCHEMA, f, sort_keys=False)
+        if compact:
+            assert "*id" in schema_file.read_text()
+
+        with patch.object(src_validate_schema, "JsonSchemaValidator", None):
+            expected = src_validate_schema.validate_schema_file(str(schema_file))
+            actual = src_validate_schema.stream_validate_schema_file(str(schema_file))
+
+        assert actual == expected
+        assert actual[0] is False
+        assert f"Missing 'name' field in schema: {schema_file}" in actual[1]
+        assert "Class Loop is part of an inheritance cycle" in actual[1]
+        assert "Slots in class Listed should be a list" in actual[1]
+        assert "Slot attr_ref references undefined range Undefined" in actual[1]
+
+    def test_max_errors(self, tmp_path):
+        """Test that the error budget applies to streaming validation"""
+        schema_file = tmp_path / "schema.yaml"
+        schema_file.write_text(yaml.dump(INVALID_SCHEMA, sort_keys=False))
+
+        with patch.object(src_validate_schema, "JsonSchemaValidator", None):
+            expected = src_validate_schema.validate_schema_file(str(schema_file), max_errors=2)
+            actual = src_validate_schema.stream_validate_schema_file(str(schema_file), max_errors=2)
+
+        assert actual == expected
+        assert len(actual[1]) == 2
+
+    def test_falls_back_for_merge_keys(self, tmp_path):
+        """Test that files with merge keys are validated by loading them in full"""
+        schema_file = tmp_path / "schema.yaml"
+        schema_file.write_text(
+            "id: x\nname: y\nbase: &b {range: Undefined}\nslots:\n  s:\n    <<: *b\n"
+        )
+
+        with patch.object(src_validate_schema, "JsonSchemaValidator", None):
+            result = src_validate_schema.stream_validate_schema_file(str(schema_file))
+
+        assert result == (False, ["Slot s references undefined range Undefined"])
+
+    def test_syntax_errors_and_missing_files(self, tmp_path):
+        """Test that syntax errors and missing files are reported as by validate_schema_file"""
+        broken = tmp_path / "broken.yaml"
+        broken.write_text("classes: [unclosed\n")
+        empty = tmp_path / "empty.yaml"
+        empty.write_text("")
+        missing = str(tmp_path / "missing.yaml")
+
+        for schema_file in [str(broken), str(empty), missing]:
+            assert (src_validate_schema.stream_validate_schema_file(schema_file)
+                    == src_validate_schema.validate_schema_file(schema_file))
@@ -1,5 +1,6 @@
 import os
 import sys
+import json
 import pytest
 from unittest.mock import patch, MagicMock, mock_open
 
@@ -32,7 +33,7 @@ sys.modules['linkml.utils.validate_yaml'] = MockValidateYaml()
 
 # Import the module after mocking
 import validate_schema
-from validate_schema import validate_schema_file, validate_schema_directory, generate_validation_report
+from validate_schema import validate_schema_file, validate_schema_directory, validate_schema_collection, generate_validation_report
 
 # Override the imported modules with our mocks for consistent testing
 validate_schema.yaml_loader = yaml_loader_mock
@@ -115,8 +116,10 @@ slots:
             assert is_valid is True
             assert len(errors) == 0
             
-            # Verify that our mocks were called correctly
-            assert yaml_loader_mock.load.called
+            # Verify that the file was parsed exactly once
+            assert mock_yaml_load.call_count == 1
+            assert not any(call.args and call.args[0] == str(valid_schema)
+                           for call in yaml_loader_mock.load.call_args_list)
     
     def test_validate_schema_file_invalid(self, tmp_path):
         """Test validation of an invalid schema file."""
@@ -166,6 +169,53 @@ classes:
             name_error = any("Missing 'name'" in error for error in errors)
             assert id_error and name_error
             
+    def test_validate_schema_file_enum_range(self, tmp_path):
+        """Test that slots may use a named enum as their range."""
+        enum_schema = tmp_path / "enum_schema.yaml"
+        mock_schema = {
+            'id': 'https://w3id.org/linkml/tests/enum',
+            'name': 'enum_schema',
+            'classes': {'Plane': {'slots': ['attr_positionxunit']}},
+            'slots': {'attr_positionxunit': {'range': 'UnitsLength'}},
+            'enums': {'UnitsLength': {'permissible_values': {'m': {}, 'cm': {}}}}
+        }
+        yaml_loader_mock.load.return_value = mock_schema
+
+        with patch('os.path.exists', return_value=True), \
+             patch('yaml.safe_load', return_value=mock_schema), \
+             patch('builtins.open', mock_open(read_data="")), \
+             patch('validate_schema.JsonSchemaValidator', return_value=json_validator_mock.return_value):
+
+            is_valid, errors = validate_schema_file(str(enum_schema))
+
+            assert is_valid is True
+            assert errors == []
+
+    def test_validate_schema_file_inheritance(self, tmp_path):
+        """Test that undefined parents and inheritance cycles are reported."""
+        cyclic_schema = tmp_path / "cyclic_schema.yaml"
+        mock_schema = {
+            'id': 'https://w3id.org/linkml/tests/cyclic',
+            'name': 'cyclic_schema',
+            'classes': {
+                'Laser': {'is_a': 'LightSource'},
+                'LightSource': {'is_a': 'Laser'},
+                'Arc': {'is_a': 'UndefinedSource'}
+            }
+        }
+        yaml_loader_mock.load.return_value = mock_schema
+
+        with patch('os.path.exists', return_value=True), \
+             patch('yaml.safe_load', return_value=mock_schema), \
+             patch('builtins.open', mock_open(read_data="")), \
+             patch('validate_schema.JsonSchemaValidator', return_value=json_validator_mock.return_value):
+
+            is_valid, errors = validate_schema_file(str(cyclic_schema))
+
+            assert is_valid is False
+            assert "Class Arc references undefined parent class UndefinedSource" in errors
+            assert any("inheritance cycle" in error for error in errors)
+
     def test_validate_schema_file_not_found(self):
         """Test validation of a non-existent file."""
         with patch('os.path.exists', return_value=False):
@@ -224,6 +274,229 @@ classes:
             assert results[str(valid_schema)][0] is True
             assert results[str(invalid_schema)][0] is False
     
+    def test_validate_schema_directory_parallel(self, tmp_path):
+        """Test that parallel directory validation matches the serial run."""
+        schema_dir = tmp_path / "schemas"
+        schema_dir.mkdir()
+        for name in ["Image", "Pixels", "Plane", "Channel"]:
+            (schema_dir / f"{name}.yaml").write_text(
+                f"id: https://w3id.org/ome/{name}\nname: {name}\n"
+                f"classes:\n  {name}:\n    slots:\n      - attr_{name.lower()}\n"
+            )
+        (schema_dir / "broken.yaml").write_text("classes: [unclosed\n")
+        with patch('validate_schema.JsonSchemaValidator', None):
+            serial = validate_schema_directory(str(schema_dir), jobs=1)
+            parallel = validate_schema_directory(str(schema_dir), jobs=3)
+
+        assert list(parallel) == list(serial) == sorted(serial)
+        assert parallel == serial
+        assert serial[str(schema_dir / "broken.yaml")][0] is False
+        assert serial[str(schema_dir / "Image.yaml")] == (
+            False, ["Class Image references undefined slot attr_image"]
+        )
+
+        with patch('builtins.open', mock_open()):
+            assert generate_validation_report(parallel) == generate_validation_report(serial)
+
+    def test_validate_schema_directory_cache(self, tmp_path):
+        """Test that unchanged files are answered from the validation cache."""
+        schema_dir = tmp_path / "schemas"
+        schema_dir.mkdir()
+        for name in ["Image", "Pixels"]:
+            (schema_dir / f"{name}.yaml").write_text(f"id: https://w3id.org/ome/{name}\nname: {name}\n")
+        cache_file = str(tmp_path / "cache.json")
+
+        with patch('validate_schema.JsonSchemaValidator', None):
+            first_cache = validate_schema.ValidationCache(cache_file)
+            first = validate_schema_directory(str(schema_dir), cache=first_cache)
+            assert first_cache.hits == 0
+
+            # Change one file; only the other one may come from the cache
+            (schema_dir / "Pixels.yaml").write_text("name: Pixels\n")
+            second_cache = validate_schema.ValidationCache(cache_file)
+            with patch('validate_schema.validate_schema_file',
+                       wraps=validate_schema.validate_schema_file) as mock_validate:
+                second = validate_schema_directory(str(schema_dir), cache=second_cache)
+
+        assert second_cache.hits == 1
+        assert [call.args[0] for call in mock_validate.call_args_list] == [str(schema_dir / "Pixels.yaml")]
+        assert second[str(schema_dir / "Image.yaml")] == first[str(schema_dir / "Image.yaml")] == (True, [])
+        assert second[str(schema_dir / "Pixels.yaml")][0] is False
+
+        # The result of the earlier Pixels.yaml is replaced, not kept next to the new one
+        with open(cache_file) as f:
+            entries = json.load(f)["entries"]
+        assert sorted(entry[2] for entry in entries.values()) == [
+            str(schema_dir / "Image.yaml"), str(schema_dir / "Pixels.yaml")
+        ]
+
+        with patch('builtins.open', mock_open()):
+            report_text = generate_validation_report(second, cached_count=second_cache.hits)
+        assert "Results from cache: 1" in report_text
+
+    def test_validate_schema_collection(self, tmp_path):
+        """Test cross-file validation against the global index."""
+        schema_dir = tmp_path / "schemas"
+        schema_dir.mkdir()
+        (schema_dir / "core.yaml").write_text(
+            "id: https://w3id.org/ome/core\nname: core\n"
+            "slots:\n  attr_id:\n    range: string\n"
+        )
+        (schema_dir / "Image.yaml").write_text(
+            "id: https://w3id.org/ome/Image\nname: Image\nimports:\n  - core\n"
+            "classes:\n  Image:\n    slots:\n      - attr_id\n"
+        )
+        (schema_dir / "Pixels.yaml").write_text(
+            "id: https://w3id.org/ome/Pixels\nname: Pixels\nimports:\n  - Channel\n"
+            "classes:\n  Pixels:\n    slots:\n      - attr_id\n"
+            "slots:\n  attr_id:\n    range: integer\n"
+        )
+
+        with patch('validate_schema.JsonSchemaValidator', None):
+            per_file = validate_schema_directory(str(schema_dir))
+            cross_file = validate_schema_collection(str(schema_dir))
+
+        core, image, pixels = (str(schema_dir / f"{name}.yaml") for name in ["core", "Image", "Pixels"])
+        assert list(cross_file) == list(per_file)
+
+        # The import makes core's slot visible to Image
+        assert per_file[image] == (False, ["Class Image references undefined slot attr_id"])
+        assert cross_file[image] == (True, [])
+
+        assert cross_file[pixels] == (False, [
+            f"Import Channel in {pixels} does not resolve to a schema file in {schema_dir}",
+        ])
+        # The conflict is reported once, on the file indexed after the first variant
+        assert cross_file[core] == (False, [
+            f"Slot attr_id has 2 different definitions: in {pixels}; in {core}"
+        ])
+
+    def test_validate_schema_collection_checks_definitions_once(self, tmp_path):
+        """Test that shared definitions are checked against the metamodel once for the whole collection."""
+        from src.validator_pool import ValidatorPool
+        metamodel = tmp_path / "meta.schema.json"
+        metamodel.write_text(json.dumps({
+            "type": "object",
+            "required": ["id", "name"],
+            "properties": {
+                "classes": {"type": "object"},
+                "slots": {"type": "object", "additionalProperties": {
+                    "type": "object", "properties": {"multivalued": {"type": "boolean"}}
+                }},
+            },
+        }))
+        schema_dir = tmp_path / "schemas"
+        schema_dir.mkdir()
+        for name in ["Image", "Pixels", "Plane"]:
+            header = f"id: https://w3id.org/ome/{name}\n" + (f"name: {name}\n" if name != "Plane" else "")
+            (schema_dir / f"{name}.yaml").write_text(
+                header + f"classes:\n  {name}:\n    slots:\n      - attr_id\n"
+                "slots:\n  attr_id:\n    range: string\n    multivalued: maybe\n"
+            )
+        pool = ValidatorPool(str(metamodel))
+
+        with patch('validate_schema.get_validator_pool', return_value=pool), \
+             patch.object(pool, "definition_errors", wraps=pool.definition_errors) as mock_definition:
+            per_file = validate_schema_directory(str(schema_dir))
+            cross_file = validate_schema_collection(str(schema_dir))
+
+        # The classes are copies of one class body, and the slot is shared
+        assert mock_definition.call_count == 2
+        assert cross_file == per_file
+        plane = str(schema_dir / "Plane.yaml")
+        assert cross_file[plane] == (False, [
+            f"Missing 'name' field in schema: {plane}",
+            "LinkML validation error at <root>: 'name' is a required property",
+            "LinkML validation error at slots/attr_id/multivalued: 'maybe' is not of type 'boolean'",
+        ])
+
+    def test_streaming_markdown_matches_report(self, tmp_path):
+        """Test that the streamed Markdown report equals generate_validation_report."""
+        schema_dir = tmp_path / "schemas"
+        schema_dir.mkdir()
+        (schema_dir / "Image.yaml").write_text("id: https://w3id.org/ome/Image\nname: Image\n")
+        (schema_dir / "Pixels.yaml").write_text("name: Pixels\n")
+        streamed = tmp_path / "streamed.md"
+        writer = validate_schema.MarkdownReportWriter(str(streamed), validate_schema.linkml_imports_ok)
+        seen = []
+
+        def on_result(file_path, is_valid, errors):
+            seen.append(file_path)
+            writer.write_result(file_path, is_valid, errors)
+
+        with patch('validate_schema.JsonSchemaValidator', None):
+            results = validate_schema_directory(str(schema_dir), jobs=2, on_result=on_result)
+        writer.close()
+
+        assert seen == list(results)
+        with patch('builtins.print'):
+            assert streamed.read_text() == generate_validation_report(results)
+
+    def test_validate_schema_directory_fail_fast_and_max_errors(self, tmp_path):
+        """Test that --fail-fast and --max-errors stop the run early."""
+        schema_dir = tmp_path / "schemas"
+        schema_dir.mkdir()
+        (schema_dir / "a_valid.yaml").write_text("id: https://w3id.org/ome/a\nname: a\n")
+        (schema_dir / "b_invalid.yaml").write_text(
+            "classes:\n  B:\n    slots:\n      - attr_x\n      - attr_y\n      - attr_z\n"
+        )
+        (schema_dir / "c_invalid.yaml").write_text("title: c\n")
+
+        with patch('validate_schema.JsonSchemaValidator', None), \
+             patch('validate_schema.validate_schema_file',
+                   wraps=validate_schema.validate_schema_file) as mock_validate:
+            fail_fast = validate_schema_directory(str(schema_dir), fail_fast=True)
+            assert mock_validate.call_count == 2
+
+            capped = validate_schema_directory(str(schema_dir), max_errors=3)
+            per_file = validate_schema_file(str(schema_dir / "b_invalid.yaml"), max_errors=2)
+
+        assert list(fail_fast) == [str(schema_dir / "a_valid.yaml"), str(schema_dir / "b_invalid.yaml")]
+        assert fail_fast[str(schema_dir / "b_invalid.yaml")][0] is False
+
+        # b has five errors; the run keeps three of them and stops before c
+        assert list(capped) == list(fail_fast)
+        assert capped[str(schema_dir / "b_invalid.yaml")] == (False, [
+            f"Missing 'id' field in schema: {schema_dir / 'b_invalid.yaml'}",
+            f"Missing 'name' field in schema: {schema_dir / 'b_invalid.yaml'}",
+            "Class B references undefined slot attr_x",
+        ])
+        assert per_file == (False, capped[str(schema_dir / "b_invalid.yaml")][1][:2])
+
+    def test_truncated_results_are_not_cached(self, tmp_path):
+        """Test that results cut short by --max-errors are not cached."""
+        schema_dir = tmp_path / "schemas"
+        schema_dir.mkdir()
+        (schema_dir / "invalid.yaml").write_text("title: invalid\n")
+        cache = validate_schema.ValidationCache(str(tmp_path / "cache.json"))
+
+        with patch('validate_schema.JsonSchemaValidator', None):
+            capped = validate_schema_directory(str(schema_dir), cache=cache, max_errors=1)
+            full = validate_schema_directory(str(schema_dir), cache=cache)
+
+        assert len(capped[str(schema_dir / "invalid.yaml")][1]) == 1
+        assert len(full[str(schema_dir / "invalid.yaml")][1]) == 2
+        assert cache.hits == 0
+
+    def test_metamodel_check_without_json_schema_validator(self, tmp_path, caplog):
+        """Test that the metamodel check runs without JsonSchemaValidator and logs when skipped."""
+        schema_file = tmp_path / "schema.yaml"
+        schema_file.write_text("id: https://w3id.org/ome/a\nname: a\n")
+        pool = MagicMock()
+        pool.metamodel_errors.return_value = ["LinkML validation error at <root>: 'x' is invalid"]
+
+        with patch('validate_schema.JsonSchemaValidator', None), \
+             patch('validate_schema.get_validator_pool', return_value=pool):
+            assert validate_schema_file(str(schema_file)) == (
+                False, ["LinkML validation error at <root>: 'x' is invalid"]
+            )
+
+            pool.metamodel_errors.return_value = None
+            with caplog.at_level("INFO"):
+                assert validate_schema_file(str(schema_file)) == (True, [])
+
+        assert f"LinkML metamodel check skipped for {schema_file}" in caplog.text
+
     def test_generate_validation_report(self, tmp_path):
         """Test generation of a validation report."""
         # Mock validation results
@@ -0,0 +1,276 @@
+import io
+import sys
+import pytest
+import tracemalloc
+import xmlschema
+import xml.etree.ElementTree as ElementTree
+from unittest.mock import patch
+from src import validate_instance as src_validate_instance
+from src.validate_instance import (
+    iterparse_with_lines, iter_instance_errors, validate_instance_file, validate_instance_files,
+    format_throughput, find_instance_files, main
+)
+
+
+IMAGES_XSD = """<?xml version="1.0" encoding="UTF-8"?>
+<xs:schema xmlns:xs="http://www.w3.org/2001/XMLSchema"
+           xmlns:i="http://www.example.org/images"
+           targetNamespace="http://www.example.org/images"
+           elementFormDefault="qualified">
+  <xs:element name="Root">
+    <xs:complexType>
+      <xs:sequence>
+        <xs:element name="Image" maxOccurs="unbounded">
+          <xs:complexType>
+            <xs:sequence>
+              <xs:element name="Pixels">
+                <xs:complexType>
+                  <xs:sequence>
+                    <xs:element name="MetadataOnly" minOccurs="0"/>
+                    <xs:element name="Plane" minOccurs="0" maxOccurs="unbounded">
+                      <xs:complexType>
+                        <xs:attribute name="TheZ" type="xs:nonNegativeInteger" use="required"/>
+                      </xs:complexType>
+                    </xs:element>
+                  </xs:sequence>
+                  <xs:attribute name="SizeZ" type="xs:positiveInteger" use="required"/>
+                </xs:complexType>
+              </xs:element>
+            </xs:sequence>
+            <xs:attribute name="ID" type="xs:string" use="required"/>
+          </xs:complexType>
+        </xs:element>
+      </xs:sequence>
+    </xs:complexType>
+  </xs:element>
+</xs:schema>
+"""
+
+
+def write_instance(path, images=2, planes=3, bad_plane=None, extra=""):
+    """Write an instance document with one Image per line block and one Plane per line"""
+    lines = ['<?xml version="1.0" encoding="UTF-8"?>', '<Root xmlns="http://www.example.org/images">']
+    for i in range(images):
+        lines.append(f'  <Image ID="Image:{i}">')
+        lines.append(f'    <Pixels SizeZ="{planes}">{extra if i == 0 else ""}')
+        for z in range(planes):
+            value = "x" if (i, z) == bad_plane else z
+            lines.append(f'      <Plane TheZ="{value}"/>')
+        lines.append('    </Pixels>')
+        lines.append('  </Image>')
+    lines.append('</Root>')
+    path.write_text("\n".join(lines) + "\n")
+    return str(path)
+
+
+@pytest.fixture
+def images_schema(tmp_path):
+    """Returns the schema of the test instance documents"""
+    xsd_path = tmp_path / "images.xsd"
+    xsd_path.write_text(IMAGES_XSD)
+    return xmlschema.XMLSchema(str(xsd_path))
+
+
+class TestIterparseWithLines:
+    """Tests for the line-recording iterparse"""
+
+    def test_same_events_as_elementtree(self):
+        """Test that the events, tags, attributes and namespaces match ElementTree.iterparse"""
+        document = (b'<?xml version="1.0"?>\n<a xmlns="urn:a" xmlns:b="urn:b">\n'
+                    b'  <b:c b:x="1" y="2">text</b:c>\n  <d/>\n</a>\n')
+        events = ('start-ns', 'end-ns', 'start', 'end')
+
+        def summary(event, node):
+            if event in ('start', 'end'):
+                return event, node.tag, dict(node.attrib), node.text
+            return event, node
+
+        expected = [summary(*item) for item in ElementTree.iterparse(io.BytesIO(document), events)]
+        actual = list(iterparse_with_lines(io.BytesIO(document), events))
+
+        assert [summary(*item) for item in actual] == expected
+        assert [node.sourceline for event, node in actual if event == 'start'] == [2, 3, 4]
+
+    def test_syntax_error(self):
+        """Test that malformed XML raises a ParseError with its position"""
+        with pytest.raises(ElementTree.ParseError) as error:
+            list(iterparse_with_lines(io.BytesIO(b"<a>\n<b>\n</a>")))
+        assert error.value.position == (3, 2)
+        assert "line 3" in str(error.value)
+
+
+class TestValidateInstanceFile:
+    """Tests for streaming OME-XML instance validation"""
+
+    def test_valid_document(self, tmp_path, images_schema):
+        """Test that a valid document has no errors"""
+        instance = write_instance(tmp_path / "valid.xml")
+        assert validate_instance_file(instance, images_schema) == (True, [])
+
+    def test_errors_have_line_numbers(self, tmp_path, images_schema):
+        """Test that errors deep inside a subtree and in a content model report their lines"""
+        instance = write_instance(tmp_path / "invalid.xml", bad_plane=(1, 2), extra="<Unexpected/>")
+
+        is_valid, errors = validate_instance_file(instance, images_schema)
+
+        assert is_valid is False
+        assert len(errors) == 2
+        # The Pixels of the first Image (line 4) has an unexpected child
+        assert errors[0].startswith("line 4: ")
+        assert "Unexpected" in errors[0]
+        # The third Plane of the second Image is on line 14
+        assert errors[1].startswith("line 14: ")
+        assert "TheZ='x'" in errors[1]
+        assert "/Root/Image[2]/Pixels/Plane[3]" in errors[1]
+
+    @pytest.mark.parametrize("lazy_depth", [1, 2])
+    def test_same_errors_as_full_validation(self, tmp_path, images_schema, lazy_depth):
+        """Test that lazy validation finds the errors of whole-document validation"""
+        instance = write_instance(tmp_path / "invalid.xml", images=3, bad_plane=(2, 0))
+
+        is_valid, errors = validate_instance_file(instance, images_schema, lazy_depth=lazy_depth)
+
+        expected = [error.reason for error in images_schema.iter_errors(instance)]
+        assert is_valid is False
+        assert len(errors) == len(expected) == 1
+        assert expected[0] in errors[0]
+
+    def test_max_errors(self, tmp_path, images_schema):
+        """Test that validation stops after max_errors errors"""
+        instance = write_instance(tmp_path / "invalid.xml", images=1, planes=5)
+        with open(instance) as f:
+            content = f.read().replace('TheZ="', 'TheZ="x')
+        with open(instance, "w") as f:
+            f.write(content)
+
+        assert len(validate_instance_file(instance, images_schema)[1]) == 5
+        assert len(validate_instance_file(instance, images_schema, max_errors=2)[1]) == 2
+
+    def test_syntax_errors_and_missing_files(self, tmp_path, images_schema):
+        """Test that malformed and missing documents are reported as errors"""
+        broken = tmp_path / "broken.xml"
+        broken.write_text('<Root xmlns="http://www.example.org/images">\n<Image>\n</Root>\n')
+        missing = str(tmp_path / "missing.xml")
+
+        assert validate_instance_file(str(broken), images_schema) == (
+            False, [f"XML syntax error in {broken}: mismatched tag: line 3, column 2"]
+        )
+        assert validate_instance_file(missing, images_schema) == (False, [f"File not found: {missing}"])
+
+    def test_many_planes_memory_is_flat(self, tmp_path, images_schema):
+        """Test that the Planes of a Pixels are not held until the Image is validated"""
+        instance = write_instance(tmp_path / "planes.xml", images=1, planes=20_000, bad_plane=(0, 15_000))
+
+        # A small read buffer, so that few Planes are built ahead of the validation
+        with patch.object(src_validate_instance, "READ_SIZE", 4096):
+            tracemalloc.start()
+            try:
+                errors = list(iter_instance_errors(instance, images_schema))
+                peak = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+
+        assert len(errors) == 1
+        assert errors[0].startswith("line 15005: ")
+        assert "/Root/Image/Pixels/Plane[15001]" in errors[0]
+        # The element tree of the document alone takes about 10 MB
+        assert peak < 2 * 2 ** 20
+
+    def test_content_model_checked_around_dropped_planes(self, tmp_path, images_schema):
+        """Test that children out of order are still found after a run of dropped Planes"""
+        instance = write_instance(tmp_path / "invalid.xml", images=1, planes=50)
+        with open(instance) as f:
+            content = f.read().replace("    </Pixels>", "      <MetadataOnly/>\n    </Pixels>")
+        with open(instance, "w") as f:
+            f.write(content)
+
+        is_valid, errors = validate_instance_file(instance, images_schema)
+
+        assert is_valid is False
+        assert len(errors) == 1
+        assert errors[0].startswith("line 4: ")
+        assert "MetadataOnly" in errors[0]
+
+    def test_validator_errors_are_reported_per_file(self, tmp_path, images_schema):
+        """Test that an exception inside xmlschema fails the document instead of the run"""
+        instance = write_instance(tmp_path / "valid.xml")
+        with patch.object(images_schema, "iter_errors", side_effect=KeyError("ChannelIDKey")):
+            assert validate_instance_file(instance, images_schema) == (
+                False, [f"Unexpected error validating {instance}: KeyError: 'ChannelIDKey'"]
+            )
+
+    def test_lazy_depth_is_restricted(self, tmp_path, capsys):
+        """Test that the CLI rejects lazy depths xmlschema cannot validate"""
+        with patch.object(sys, "argv", ["validate_instance", "--lazy-depth", "3", str(tmp_path)]):
+            with pytest.raises(SystemExit) as exit_info:
+                main()
+        assert exit_info.value.code == 2
+        assert "invalid choice: 3" in capsys.readouterr().err
+
+    def test_validate_instance_files(self, tmp_path, images_schema, caplog):
+        """Test that several documents are validated and the throughput is logged"""
+        valid = write_instance(tmp_path / "valid.xml")
+        invalid = write_instance(tmp_path / "invalid.xml", bad_plane=(0, 0))
+
+        with caplog.at_level("INFO"):
+            results = validate_instance_files([valid, invalid], images_schema)
+
+        assert list(results) == [valid, invalid]
+        assert results[valid] == (True, [])
+        assert results[invalid][0] is False
+        assert "Validated 2 documents" in caplog.text
+        assert "documents/s" in caplog.text
+
+    def test_format_throughput(self):
+        """Test the throughput summary"""
+        summary = format_throughput(10, 5_000_000, 2.0, peak_rss=64 * 2 ** 20)
+        assert summary == ("Validated 10 documents (5.0 MB) in 2.00s: 5.0 documents/s, 2.5 MB/s, "
+                           "peak RSS 64 MB")
+        assert "peak RSS" not in format_throughput(1, 0, 0.0)
+        assert format_throughput(1, 0, 1.0, 2 ** 20, 3 * 2 ** 20).endswith("peak RSS 1 MB (workers 3 MB)")
+
+
+class TestBatchValidation:
+    """Tests for validating many instance documents in a process pool"""
+
+    def write_store(self, tmp_path):
+        """Write a directory tree of documents, one of them invalid"""
+        (tmp_path / "store" / "a").mkdir(parents=True)
+        (tmp_path / "store" / "b").mkdir()
+        for i in range(6):
+            write_instance(tmp_path / "store" / "a" / f"image{i}.ome")
+            write_instance(tmp_path / "store" / "b" / f"image{i}.ome.xml", bad_plane=(0, 1) if i == 3 else None)
+        (tmp_path / "store" / "b" / "notes.txt").write_text("not a document")
+        return str(tmp_path / "store")
+
+    def test_find_instance_files(self, tmp_path):
+        """Test that directories are searched recursively and files are kept as given"""
+        store = self.write_store(tmp_path)
+        extra = str(tmp_path / "extra.txt")
+
+        instance_files = find_instance_files([store, extra])
+
+        assert len(instance_files) == 13
+        assert instance_files[0] == f"{store}/a/image0.ome"
+        assert instance_files[-2] == f"{store}/b/image5.ome.xml"
+        assert instance_files[-1] == extra
+
+    @pytest.mark.parametrize("start_method", ["fork", "spawn"])
+    def test_pool_matches_serial_run(self, tmp_path, images_schema, start_method):
+        """Test that a pool, forked or given a pickled schema, reports what a serial run reports"""
+        instance_files = find_instance_files([self.write_store(tmp_path)])
+        serial = validate_instance_files(instance_files, images_schema)
+
+        streamed = []
+        with patch.object(src_validate_instance.multiprocessing, "get_all_start_methods",
+                          return_value=[start_method]):
+            parallel = validate_instance_files(instance_files, images_schema, jobs=2,
+                                               on_result=lambda *result: streamed.append(result))
+
+        assert parallel == serial
+        assert list(parallel) == instance_files
+        assert [file_path for file_path, _, _ in streamed] == instance_files
+        assert [file_path for file_path, (is_valid, _) in parallel.items() if not is_valid] == [
+            instance_files[9]
+        ]
+        assert src_validate_instance._worker_schema is None
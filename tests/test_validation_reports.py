@@ -0,0 +1,84 @@
+import json
+import xml.etree.ElementTree as ET
+from src.validation_reports import JsonLinesReportWriter, JUnitReportWriter, MarkdownReportWriter
+
+RESULTS = [
+    ("/schemas/Image.yaml", True, []),
+    ("/schemas/Pixels.yaml", False, ["Class Pixels references undefined slot attr_sizex", "Missing 'id' <field>"]),
+    ("/schemas/Plane.yaml", True, []),
+]
+
+
+class TestValidationReports:
+    """Tests for the streaming validation report writers"""
+
+    def test_jsonl_streams_records(self, tmp_path):
+        """Test that JSON Lines records are on disk before the report is closed"""
+        report = tmp_path / "report.jsonl"
+        writer = JsonLinesReportWriter(str(report))
+        writer.write_result(*RESULTS[0])
+
+        assert json.loads(report.read_text()) == {
+            "type": "result", "file": "/schemas/Image.yaml", "valid": True, "errors": []
+        }
+
+        for result in RESULTS[1:]:
+            writer.write_result(*result)
+        writer.close(cached_count=1)
+
+        records = [json.loads(line) for line in report.read_text().splitlines()]
+        assert [record["file"] for record in records[:-1]] == [result[0] for result in RESULTS]
+        assert records[-1] == {"type": "summary", "total": 3, "valid": 2, "invalid": 1, "cached": 1}
+
+    def test_junit_report(self, tmp_path):
+        """Test the JUnit XML report and its suite counts"""
+        report = tmp_path / "report.xml"
+        with JUnitReportWriter(str(report)) as writer:
+            for result in RESULTS:
+                writer.write_result(*result)
+
+        suite = ET.parse(str(report)).getroot().find("testsuite")
+        assert suite.get("tests") == "3"
+        assert suite.get("failures") == "1"
+        cases = suite.findall("testcase")
+        assert [case.get("name") for case in cases] == ["Image.yaml", "Pixels.yaml", "Plane.yaml"]
+        failure = cases[1].find("failure")
+        assert failure.get("message") == "2 validation errors"
+        assert failure.text.splitlines() == RESULTS[1][2]
+
+    def test_junit_report_parses_before_close(self, tmp_path):
+        """Test that an unclosed JUnit report is well-formed and counts what was written"""
+        report = tmp_path / "report.xml"
+        writer = JUnitReportWriter(str(report))
+        for result in RESULTS[:2]:
+            writer.write_result(*result)
+
+        suite = ET.parse(str(report)).getroot().find("testsuite")
+        assert suite.get("tests") == "2"
+        assert suite.get("failures") == "1"
+        assert [case.get("name") for case in suite.findall("testcase")] == ["Image.yaml", "Pixels.yaml"]
+
+        writer.write_result(*RESULTS[2])
+        writer.close()
+
+        suite = ET.parse(str(report)).getroot().find("testsuite")
+        assert suite.get("tests") == "3"
+        assert len(suite.findall("testcase")) == 3
+
+    def test_markdown_streams_to_partial_file(self, tmp_path):
+        """Test that Markdown sections stream to a partial file until close"""
+        report = tmp_path / "report.md"
+        writer = MarkdownReportWriter(str(report))
+        for result in RESULTS:
+            writer.write_result(*result)
+
+        assert not report.exists()
+        assert "### Pixels.yaml" in (tmp_path / "report.md.partial").read_text()
+
+        writer.close()
+
+        text = report.read_text()
+        assert not (tmp_path / "report.md.partial").exists()
+        assert text.startswith("# LinkML Schema Validation Report")
+        assert "- Invalid schemas: 1" in text
+        assert text.index("## Summary") < text.index("### Pixels.yaml")
@@ -0,0 +1,102 @@
+import json
+import pytest
+from unittest.mock import patch
+from src import validator_pool
+from src.validator_pool import StructuralRules, ValidatorPool, get_validator_pool
+
+
+@pytest.fixture
+def metamodel_path(tmp_path):
+    """Returns the path to a small metamodel JSON Schema"""
+    path = tmp_path / "meta.schema.json"
+    path.write_text(json.dumps({
+        "$schema": "http://json-schema.org/draft-07/schema#",
+        "type": "object",
+        "required": ["id", "name"],
+        "properties": {
+            "name": {"type": "string"},
+            "classes": {"type": "object"}
+        }
+    }))
+    return str(path)
+
+
+class TestValidatorPool:
+    """Tests for the process-wide validator pool"""
+
+    def test_structural_rules_range_names(self):
+        """Test that range names combine builtin ranges with the scope"""
+        rules = StructuralRules()
+        names = rules.range_names({"classes": {"Image"}, "slots": {"attr_id"}, "enums": {"UnitsLength"}})
+
+        assert {"string", "Image", "UnitsLength"} <= names
+        assert "attr_id" not in names
+
+    def test_metamodel_validator_compiled_once(self, metamodel_path):
+        """Test that the metamodel validator is compiled once and reused"""
+        pool = ValidatorPool(metamodel_path)
+
+        with patch.object(validator_pool, "compile_metamodel_validator",
+                          wraps=validator_pool.compile_metamodel_validator) as mock_compile:
+            for _ in range(5):
+                assert pool.metamodel_errors({"id": "x", "name": "x"}) == []
+
+        assert mock_compile.call_count == 1
+        assert pool.compile_count == 1
+
+    def test_metamodel_errors(self, metamodel_path):
+        """Test the messages reported for metamodel violations"""
+        pool = ValidatorPool(metamodel_path)
+
+        errors = pool.metamodel_errors({"name": "x", "classes": ["Image"]})
+
+        assert errors == [
+            "LinkML validation error at <root>: 'id' is a required property",
+            "LinkML validation error at classes: ['Image'] is not of type 'object'",
+        ]
+
+    def test_long_metamodel_errors_are_truncated(self, metamodel_path):
+        """Test that messages embedding a large instance keep their start"""
+        pool = ValidatorPool(metamodel_path)
+
+        errors = pool.metamodel_errors({"id": "x", "name": "x", "classes": [f"Class{i}" for i in range(100)]})
+
+        assert len(errors) == 1
+        assert errors[0].startswith("LinkML validation error at classes: ['Class0', 'Class1'")
+        assert errors[0].endswith("...")
+
+    def test_metamodel_errors_in_alternatives(self, tmp_path):
+        """Test that anyOf errors report the alternative matching the instance's type"""
+        optional_slot = {"anyOf": [
+            {"type": "object", "properties": {
+                "multivalued": {"type": ["boolean", "null"]},
+                "range": {"anyOf": [{"type": "string"}, {"type": "null"}]}
+            }},
+            {"type": "null"}
+        ]}
+        path = tmp_path / "meta.schema.json"
+        path.write_text(json.dumps({
+            "$schema": "http://json-schema.org/draft-07/schema#",
+            "type": "object",
+            "properties": {"slots": {"type": "object", "additionalProperties": optional_slot}}
+        }))
+        pool = ValidatorPool(str(path))
+
+        errors = pool.metamodel_errors({"slots": {"a": {"multivalued": "x"}, "b": 5, "c": {"range": 5}}})
+
+        assert errors == [
+            "LinkML validation error at slots/a/multivalued: 'x' is not of type 'boolean', 'null'",
+            "LinkML validation error at slots/b: value is not of type 'object', 'null'",
+            "LinkML validation error at slots/c/range: value is not of type 'string', 'null'",
+        ]
+
+    def test_missing_metamodel(self, tmp_path):
+        """Test that a pool without a metamodel reports no metamodel checks"""
+        pool = ValidatorPool(str(tmp_path / "missing.json"))
+
+        assert pool.metamodel_validator is None
+        assert pool.metamodel_errors({"id": "x"}) is None
+
+    def test_get_validator_pool_is_shared(self):
+        """Test that the pool is created once per process"""
+        assert get_validator_pool() is get_validator_pool()
@@ -0,0 +1,134 @@
+import io
+import json
+import pytest
+import yaml
+import xml.etree.ElementTree as ElementTree
+from unittest.mock import patch
+from src.generator import generate_linkml_schema
+from src.xmltolinkml import InstanceMapping, iter_instance_records, convert_instance_file, convert_instance_files
+
+
+DOCUMENT = """<?xml version="1.0" encoding="UTF-8"?>
+<OME xmlns="http://www.openmicroscopy.org/Schemas/OME/2016-06"
+     xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" Creator="test">
+  <Image ID="Image:0" Name="first">
+    <AcquisitionDate>2020-01-01T00:00:00</AcquisitionDate>
+    <Description>A test image</Description>
+    <Pixels ID="Pixels:0" SizeZ="2" BigEndian="false">
+      <MetadataOnly/>
+      <Plane TheZ="0" DeltaT="0.5"/>
+      <Plane TheZ="1" DeltaT="n/a"/>
+    </Pixels>
+  </Image>
+  <ROI ID="ROI:0">
+    <Union>
+      <Label ID="Shape:0" X="1.5" Custom="kept">Text of the label</Label>
+    </Union>
+  </ROI>
+</OME>
+"""
+
+
+class TestInstanceConversion:
+    """Tests for OME-XML to LinkML instance conversion"""
+
+    def test_records(self, mapping):
+        """Test that every child of the root becomes one typed record"""
+        records = list(iter_instance_records(io.BytesIO(DOCUMENT.encode()), mapping))
+
+        assert records == [
+            {
+                "@type": "Image", "attr_id": "Image:0", "attr_name": "first",
+                "AcquisitionDate": "2020-01-01T00:00:00",
+                "Description": "A test image",
+                "Pixels": [{
+                    "@type": "Pixels", "attr_id": "Pixels:0", "attr_sizez": 2, "attr_bigendian": False,
+                    "MetadataOnly": [{"@type": "MetadataOnly"}],
+                    "Plane": [
+                        {"@type": "Plane", "attr_thez": 0, "attr_deltat": 0.5},
+                        {"@type": "Plane", "attr_thez": 1, "attr_deltat": "n/a"},
+                    ],
+                }],
+            },
+            {
+                "@type": "ROI", "attr_id": "ROI:0",
+                "Union": [{
+                    "@type": "Union",
+                    "Label": [{"@type": "Label", "attr_id": "Shape:0", "attr_x": 1.5, "attr_custom": "kept",
+                               "value": "Text of the label"}],
+                }],
+            },
+        ]
+
+    def test_record_elements(self, mapping):
+        """Test that only the selected record elements are converted"""
+        records = list(iter_instance_records(io.BytesIO(DOCUMENT.encode()), mapping, ["ROI"]))
+        assert [record["@type"] for record in records] == ["ROI"]
+
+    def test_records_are_dropped_once_converted(self, mapping):
+        """Test that converted records do not stay attached to the root"""
+        document = "<OME>" + "<Image ID='Image:1'><Pixels SizeZ='1'/></Image>" * 50 + "</OME>"
+        roots = []
+        original_iterparse = ElementTree.iterparse
+
+        def iterparse(source, events):
+            for event, elem in original_iterparse(source, events):
+                if not roots:
+                    roots.append(elem)
+                yield event, elem
+
+        with patch("src.xmltolinkml.ElementTree.iterparse", iterparse):
+            records = iter_instance_records(io.BytesIO(document.encode()), mapping)
+            assert sum(1 for _ in records) == 50
+        assert len(roots[0]) == 0
+
+    @pytest.mark.parametrize("output_format", ["jsonl", "yaml"])
+    def test_convert_instance_file(self, tmp_path, mapping, output_format):
+        """Test that records are written as JSON lines or YAML documents"""
+        instance_file = tmp_path / "image.ome"
+        instance_file.write_text(DOCUMENT)
+        stream = io.StringIO()
+
+        assert convert_instance_file(str(instance_file), mapping, stream, output_format=output_format) == 2
+
+        if output_format == "jsonl":
+            records = [json.loads(line) for line in stream.getvalue().splitlines()]
+        else:
+            records = list(yaml.safe_load_all(stream.getvalue()))
+        assert records == list(iter_instance_records(str(instance_file), mapping))
+
+    def test_convert_instance_files_skips_broken_documents(self, tmp_path, mapping, caplog):
+        """Test that unreadable documents are logged and the others converted"""
+        good = tmp_path / "good.ome"
+        good.write_text(DOCUMENT)
+        broken = tmp_path / "broken.ome"
+        broken.write_text("<OME><Image></OME>")
+        stream = io.StringIO()
+
+        with caplog.at_level("INFO"):
+            counts = convert_instance_files([str(good), str(broken)], mapping, stream)
+
+        assert counts == {str(good): 2}
+        assert len(stream.getvalue().splitlines()) == 2
+        assert "Cannot convert" in caplog.text
+        assert "records/s" in caplog.text
+
+    def test_mapping_refuses_partitioned_directory(self, typed_xsd_path, tmp_path):
+        """Test that a partitioned directory is refused instead of losing slot ranges"""
+        generate_linkml_schema(typed_xsd_path, str(tmp_path / "partitions"), partition=True)
+
+        with pytest.raises(ValueError, match="single-file schema"):
+            InstanceMapping.load(str(tmp_path / "partitions"))
+
+    def test_mapping_from_generated_schema(self, typed_xsd_path, tmp_path):
+        """Test that the slots and value types come from a schema written by the generator"""
+        schema_path = tmp_path / "typed.yaml"
+        generate_linkml_schema(typed_xsd_path, str(schema_path))
+        mapping = InstanceMapping.load(str(schema_path))
+        document = ('<t:Root xmlns:t="http://www.example.org/typed">'
+                    '<t:Stage ID="Stage:1" X="2.5" SizeC="3" XUnit="mm"/></t:Root>')
+
+        records = list(iter_instance_records(io.BytesIO(document.encode()), mapping))
+
+        assert records == [{"@type": "Stage", "attr_id": "Stage:1", "attr_x": 2.5, "attr_sizec": 3,
+                            "attr_xunit": "mm"}]
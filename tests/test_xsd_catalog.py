@@ -0,0 +1,133 @@
+import os
+import json
+import pytest
+from src.download_xsd import mirror_xsd
+from src.xsd_catalog import SchemaCatalog, SchemaResolutionError, load_xsd, load_catalog, CATALOG_FILE
+from src.generator import generate_linkml_schema
+
+
+ROOT_XSD = """<?xml version="1.0" encoding="UTF-8"?>
+<xs:schema xmlns:xs="http://www.w3.org/2001/XMLSchema"
+           xmlns:o="http://www.example.org/other"
+           targetNamespace="http://www.example.org/root"
+           elementFormDefault="qualified">
+  <xs:import namespace="http://www.example.org/other" schemaLocation="{other_url}"/>
+  <xs:element name="Root">
+    <xs:complexType>
+      <xs:sequence>
+        <xs:element ref="o:Other"/>
+      </xs:sequence>
+    </xs:complexType>
+  </xs:element>
+</xs:schema>
+"""
+
+OTHER_XSD = """<?xml version="1.0" encoding="UTF-8"?>
+<xs:schema xmlns:xs="http://www.w3.org/2001/XMLSchema"
+           targetNamespace="http://www.example.org/other"
+           elementFormDefault="qualified">
+  <xs:element name="Other" type="xs:string"/>
+</xs:schema>
+"""
+
+
+@pytest.fixture
+def remote_import(xsd_server, tmp_path):
+    """A local XSD importing a schema served over HTTP; returns (xsd_path, other_url)"""
+    (xsd_server.root / "other.xsd").write_text(OTHER_XSD)
+    other_url = xsd_server.url("other.xsd")
+    xsd_path = tmp_path / "root.xsd"
+    xsd_path.write_text(ROOT_XSD.format(other_url=other_url))
+    return str(xsd_path), other_url
+
+
+class TestSchemaCatalog:
+    """Tests for resolving schema locations through an offline catalog"""
+
+    def test_save_and_load(self, tmp_path):
+        """Test that the catalog stores paths relative to itself"""
+        local = tmp_path / "mirror" / "example.org" / "a.xsd"
+        catalog = SchemaCatalog({"http://example.org/a.xsd#frag": str(local)})
+        catalog_file = str(tmp_path / "mirror" / CATALOG_FILE)
+        os.makedirs(os.path.dirname(catalog_file))
+        catalog.save(catalog_file)
+
+        with open(catalog_file) as f:
+            assert json.load(f) == {"version": 1, "entries": {"http://example.org/a.xsd": "example.org/a.xsd"}}
+        loaded = SchemaCatalog.load(str(tmp_path / "mirror"), strict=True)
+        assert loaded.strict
+        assert loaded.resolve("http://example.org/a.xsd") == str(local)
+        assert loaded.resolve("http://example.org/b.xsd") == "http://example.org/b.xsd"
+        assert loaded.resolve("/local/file.xsd") == "/local/file.xsd"
+        assert loaded.misses == ["http://example.org/b.xsd"]
+
+    def test_load_catalog(self, tmp_path):
+        """Test the command-line catalog selection"""
+        assert load_catalog(None) is None
+        assert load_catalog(None, offline=True).strict
+
+    def test_mirror_catalog_resolves_offline(self, xsd_server, remote_import):
+        """Test that a mirror's catalog lets the original XSD parse without network access"""
+        xsd_path, other_url = remote_import
+        mirror_dir = os.path.join(os.path.dirname(xsd_path), "mirror")
+        local_paths = mirror_xsd(other_url, mirror_dir)
+        xsd_server.shutdown()
+
+        catalog = load_catalog(mirror_dir, offline=True)
+        assert catalog.entries == local_paths
+        schema = load_xsd(xsd_path, catalog)
+
+        assert "{http://www.example.org/other}Other" in schema.maps.elements
+        assert catalog.misses == []
+
+    def test_strict_catalog_refuses_network(self, xsd_server, remote_import):
+        """Test that a strict catalog fails instead of fetching an unknown location"""
+        xsd_path, other_url = remote_import
+
+        with pytest.raises(SchemaResolutionError, match="other.xsd"):
+            load_xsd(xsd_path, SchemaCatalog(strict=True))
+        assert xsd_server.requests == []
+
+        # Without strict mode the location is fetched
+        load_xsd(xsd_path, SchemaCatalog())
+        assert xsd_server.requests == ["/other.xsd"]
+
+    def test_strict_catalog_fails_on_unused_import(self, tmp_path):
+        """Test that a missing import fails a strict parse even if no component of it is referenced"""
+        xsd_path = tmp_path / "unused.xsd"
+        xsd_path.write_text(
+            '<xs:schema xmlns:xs="http://www.w3.org/2001/XMLSchema" targetNamespace="urn:unused">'
+            '<xs:import namespace="urn:other" schemaLocation="http://example.invalid/other.xsd"/>'
+            '<xs:element name="Root" type="xs:string"/></xs:schema>'
+        )
+
+        with pytest.raises(SchemaResolutionError, match="http://example.invalid/other.xsd"):
+            load_xsd(str(xsd_path), load_catalog(None, offline=True))
+
+    def test_bundled_schemas_resolve_offline(self, tmp_path, caplog):
+        """Test that an import of xml.xsd resolves to xmlschema's copy in strict mode, without a warning"""
+        xsd_path = tmp_path / "lang.xsd"
+        xsd_path.write_text(
+            '<xs:schema xmlns:xs="http://www.w3.org/2001/XMLSchema" targetNamespace="urn:lang">'
+            '<xs:import namespace="http://www.w3.org/XML/1998/namespace" '
+            'schemaLocation="http://www.w3.org/2001/xml.xsd"/>'
+            '<xs:element name="Text"><xs:complexType>'
+            '<xs:attribute xmlns:xml="http://www.w3.org/XML/1998/namespace" ref="xml:lang"/>'
+            '</xs:complexType></xs:element></xs:schema>'
+        )
+        catalog = SchemaCatalog(strict=True)
+
+        with caplog.at_level("WARNING"):
+            schema = load_xsd(str(xsd_path), catalog)
+
+        assert "{http://www.w3.org/XML/1998/namespace}lang" in schema.elements["Text"].attributes
+        assert catalog.misses == []
+        assert "not in the offline catalog" not in caplog.text
+
+    def test_generator_uses_catalog(self, typed_xsd_path, tmp_path):
+        """Test that the generator parses the XSD through the catalog"""
+        catalog = SchemaCatalog(strict=True)
+        schema = generate_linkml_schema(typed_xsd_path, str(tmp_path / "out.yaml"), catalog=catalog)
+
+        assert "Stage" in schema["classes"]
+        assert catalog.misses == []
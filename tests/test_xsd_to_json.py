@@ -1,8 +1,9 @@
 import os
 import json
+import re
 import pytest
 import xmlschema
-from src.xsdtojson import xsd_to_json_schema
+from src.xsdtojson import xsd_to_json_schema, build_type_index
 import tempfile
 import sys
 from unittest.mock import patch, MagicMock
@@ -68,6 +69,57 @@ class TestXsdToJson:
         parsed_schema = json.loads(json_str)
         assert parsed_schema == json_schema
 
+    def test_xsd_to_json_schema_shared_enums(self, typed_xsd_path):
+        """Test that named enumerations are defined once and referenced"""
+        json_schema = xsd_to_json_schema(typed_xsd_path)
+        
+        # The named simple type is registered once in the definitions
+        assert json_schema["definitions"]["UnitsLength"]["enum"] == ["m", "cm", "mm"]
+        
+        # Attributes reference it instead of repeating the values
+        stage = json_schema["properties"]["Stage"]["properties"]
+        assert stage["@XUnit"]["$ref"] == "#/definitions/UnitsLength"
+        assert stage["@YUnit"]["$ref"] == "#/definitions/UnitsLength"
+        assert "enum" not in stage["@XUnit"]
+        
+        # Anonymous enumerations stay inline
+        plane = json_schema["properties"]["Plane"]["properties"]
+        assert plane["@Order"]["enum"] == ["XYZ", "XZY"]
+
+    def test_build_type_index(self, typed_xsd_path):
+        """Test resolving simple types through their derivation chains"""
+        type_index = build_type_index(xmlschema.XMLSchema(typed_xsd_path))
+        ns = "{http://www.example.org/typed}"
+        
+        assert type_index[f"{ns}PositiveInt"] == {"type": "integer", "minimum": 1}
+        assert type_index[f"{ns}PercentFraction"] == {"type": "number", "minimum": 0.0, "maximum": 1.0}
+        assert type_index[f"{ns}Hex40"] == {"type": "string", "minLength": 40, "maxLength": 40}
+        assert type_index[f"{ns}PositiveFloat"] == {"type": "number", "exclusiveMinimum": 0.0}
+        assert type_index[f"{ns}UnitsLength"]["enum"] == ["m", "cm", "mm"]
+        assert type_index[f"{ns}IndexList"] == {"type": "array", "items": {"type": "integer", "minimum": 1}}
+        
+        # A derived pattern is required on top of its base type's pattern
+        stage_id = re.compile(type_index[f"{ns}StageID"]["pattern"])
+        assert stage_id.match("Stage:0")
+        assert not stage_id.match("Stage:")
+        assert not stage_id.match("urn:lsid:x")
+        
+        # Built-in types are indexed too
+        assert type_index["{http://www.w3.org/2001/XMLSchema}int"] == {"type": "integer"}
+    
+    def test_xsd_to_json_schema_resolved_attributes(self, typed_xsd_path):
+        """Test that attributes carry the resolved type and facets"""
+        json_schema = xsd_to_json_schema(typed_xsd_path)
+        stage = json_schema["properties"]["Stage"]["properties"]
+        
+        assert stage["@SizeC"] == {"type": "integer", "minimum": 1}
+        assert stage["@Transmittance"]["type"] == "number"
+        assert stage["@Transmittance"]["maximum"] == 1.0
+        assert stage["@X"] == {"type": "number"}
+        
+        # The result stays JSON serializable
+        assert json.loads(json.dumps(json_schema)) == json_schema
+
     @patch('argparse.ArgumentParser.parse_args')
     @patch('builtins.print')
     def test_main_without_output(self, mock_print, mock_args, sample_xsd_path):